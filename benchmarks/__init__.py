@@ -0,0 +1,6 @@
+# benchmarks/
+# Micro and workload benchmarks for the ELAN interpreter:
+#   python -m benchmarks                        run everything, print a table
+#   python -m benchmarks -k loop --repeat 20    only names containing "loop"
+#   python -m benchmarks --save base.json       record a baseline
+#   python -m benchmarks --compare base.json    exit 1 on a regression
@@ -0,0 +1,142 @@
+# benchmarks/cases.py
+# The benchmark workloads. Each setup builds its inputs once and returns
+# the callable that is timed.
+
+import os
+
+from benchmarks.harness import benchmark
+from language.executor import Executor
+from language.logic import InferenceEngine
+from language.memory import Memory
+from language.parser import parse_line, parse_source
+from language.resolve import resolve_expr
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+def _example(name):
+    with open(os.path.join(EXAMPLES, name), encoding="utf-8") as f:
+        return f.read()
+
+def _program(source, engine):
+    # Define the functions once; the returned callable runs the last
+    # statement (the call being measured) against that state. Every run
+    # gets a fresh budget, and a run cut short by a limit raises
+    # BudgetExceeded instead of being timed as if it had finished.
+    nodes = parse_source(source, strict=True)
+    executor = Executor(memory=Memory(), engine=engine)
+    executor.run(nodes[:-1])
+    last = nodes[-1:]
+    if engine == "compiled":
+        body = executor.compile(last)
+        def run():
+            executor.reset_budget()
+            body()
+        return run
+    def run():
+        executor.run(last)
+        if executor.budget.exceeded is not None:
+            raise executor.budget.exceeded
+    return run
+
+LOOP = """
+define loop(n) as:
+    remember acc 0
+    while n > 0 as:
+        remember acc acc + n * 2
+        remember n n - 1
+    end while
+    return acc
+end define
+remember r loop(2000)
+"""
+
+FIB = """
+define fib(n) as:
+    if n < 2 as:
+        return n
+    end if
+    return fib(n - 1) + fib(n - 2)
+end define
+remember r fib(15)
+"""
+
+FFT_CALL = """
+remember data zeros(256)
+remember data[1] 1
+remember r fft(data)
+"""
+
+# --- Parsing ---
+
+@benchmark("parse_line")
+def parse_line_case():
+    lines = ["remember x 1 + 2 * y", "say fib(n - 1) + fib(n - 2)", "remember v[i] v[i] * 2"] * 50
+    return lambda: [parse_line(line) for line in lines]
+
+@benchmark("parse_file.fft")
+def parse_file_case():
+    source = _example("test_fft.elan")
+    return lambda: parse_source(source, strict=True)
+
+# --- Evaluation ---
+
+@benchmark("eval_value.expr")
+def eval_expr_case():
+    executor = Executor(memory=Memory())
+    executor.memory.define("x", 3)
+    executor.memory.define("y", 4)
+    expr = resolve_expr(['+', ['*', 'x', 'x'], ['-', ['*', 'y', 2], ['/', 'x', 'y']]])
+    eval_value = executor._eval_value
+    return lambda: [eval_value(expr) for _ in range(2000)]
+
+@benchmark("scope.recall_deep")
+def scope_case():
+    memory = Memory()
+    memory.define("g", 1)
+    for i in range(50):
+        memory.push_frame()
+        memory.define(f"v{i}", i)
+    recall = memory.recall
+    return lambda: [recall("g") for _ in range(2000)]
+
+@benchmark("loop.tree")
+def loop_tree_case():
+    return _program(LOOP, "tree")
+
+@benchmark("loop.compiled")
+def loop_compiled_case():
+    return _program(LOOP, "compiled")
+
+@benchmark("recursion.fib.tree")
+def fib_tree_case():
+    return _program(FIB, "tree")
+
+@benchmark("recursion.fib.compiled")
+def fib_compiled_case():
+    return _program(FIB, "compiled")
+
+# --- Logic ---
+
+@benchmark("logic.explain_20k")
+def explain_case():
+    engine = InferenceEngine()
+    for i in range(20000):
+        engine.add_rule(f"p{i} -> p{i + 1}")
+    engine.add_belief("p0")
+    queries = [f"p{i}" for i in range(0, 20000, 97)] + ["missing"]
+    return lambda: [engine.explain(q) for q in queries[:50]]
+
+# --- Vectors and FFT ---
+
+@benchmark("vector_math.example")
+def vector_case():
+    nodes = parse_source(_example("test_vector_math.elan"), strict=True)
+    return lambda: Executor(memory=Memory()).run(nodes)
+
+@benchmark("fft.256.tree")
+def fft_tree_case():
+    return _program(_example("test_fft.elan") + FFT_CALL, "tree")
+
+@benchmark("fft.256.compiled")
+def fft_compiled_case():
+    return _program(_example("test_fft.elan") + FFT_CALL, "compiled")
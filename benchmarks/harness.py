@@ -0,0 +1,134 @@
+# benchmarks/harness.py
+# Each benchmark is a setup function returning a zero-argument callable;
+# only the callable is timed. Results are summarised over repetitions after
+# warmup and can be saved to, or compared against, a JSON baseline.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from language.budget import BudgetExceeded
+from language.config import interpreter_version
+
+BENCHMARKS = {}  # name -> setup function
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def measure(setup, warmup=2, repeat=10):
+    with contextlib.redirect_stdout(io.StringIO()):  # ELAN 'say' output
+        run = setup()
+        for _ in range(warmup):
+            run()
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "max": max(samples),
+    }
+
+def run_all(pattern=None, warmup=2, repeat=10, report=None):
+    import benchmarks.cases  # registers the benchmarks
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            results[name] = measure(setup, warmup=warmup, repeat=repeat)
+        except BudgetExceeded as e:
+            # A run limit (settings.limits) stopped the workload: no timing
+            print(f"[ERROR] {name}: {e}")
+            continue
+        if report is not None:
+            report(name, results[name])
+    return results
+
+def compare(results, baseline, threshold=0.10, stat="median"):
+    # (name, baseline, current, ratio) for every benchmark slower than
+    # baseline * (1 + threshold); benchmarks missing on either side are skipped
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base.get(stat):
+            continue
+        ratio = current[stat] / base[stat]
+        if ratio > 1 + threshold:
+            regressions.append((name, base[stat], current[stat], ratio))
+    return regressions
+
+def save_baseline(path, results):
+    payload = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "interpreter_version": interpreter_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _ms(seconds):
+    return f"{seconds * 1e3:10.3f}"
+
+def _print_row(name, stats):
+    print(f"{name:<28} {_ms(stats['min'])} {_ms(stats['median'])} {_ms(stats['mean'])} {_ms(stats['stdev'])}")
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks", description="ELAN benchmarks")
+    arg_parser.add_argument("-k", dest="pattern", default=None, help="only benchmarks whose name contains this")
+    arg_parser.add_argument("--warmup", type=int, default=2)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--save", default=None, help="write results as a JSON baseline")
+    arg_parser.add_argument("--compare", default=None, help="JSON baseline to check against")
+    arg_parser.add_argument("--threshold", type=float, default=0.10,
+                            help="allowed slowdown as a fraction (0.10 = 10%%)")
+    arg_parser.add_argument("--stat", choices=["min", "median", "mean"], default="median")
+    arg_parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = arg_parser.parse_args(argv)
+
+    if args.list:
+        import benchmarks.cases
+        for name in BENCHMARKS:
+            print(name)
+        return
+
+    print(f"{'benchmark':<28} {'min ms':>10} {'median ms':>10} {'mean ms':>10} {'stdev ms':>10}")
+    results = run_all(args.pattern, warmup=args.warmup, repeat=args.repeat, report=_print_row)
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"[ERROR] No baseline at {args.compare}")
+            sys.exit(2)
+        regressions = compare(results, load_baseline(args.compare), args.threshold, args.stat)
+        for name, base, current, ratio in regressions:
+            print(f"[REGRESSION] {name}: {_ms(base).strip()} ms -> {_ms(current).strip()} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} ({args.stat}).")
@@ -0,0 +1,101 @@
+# interpreter/batch.py
+# Run many independent ELAN scripts over a process pool. Each worker loads
+# the parser once (in its initializer) and then serves many scripts.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from language.output import CaptureSink
+from language.parser import get_parser
+from interpreter.prelude import load_prelude, prelude_enabled
+from interpreter.runner import run_elan_script, run_elan_file
+
+_engine = "tree"
+
+def _init_worker(engine):
+    global _engine
+    _engine = engine
+    get_parser()  # warm the cached LALR tables once per process
+    if prelude_enabled():
+        load_prelude()
+
+def _run_one(script):
+    # script: a path to a .elan file, a source string, or a list of lines.
+    # Output is captured per script; "error" is set from an exception or
+    # from the [ERROR]/[EXCEPTION] lines the script emitted.
+    sink = CaptureSink()
+    if isinstance(script, str) and script.endswith(".elan") and "\n" not in script:
+        name, run = script, lambda: run_elan_file(script, print_outputs=False, engine=_engine, output=sink)
+    elif isinstance(script, str):
+        name, run = None, lambda: run_elan_script(script.splitlines(), print_outputs=False, engine=_engine,
+                                                  output=sink)
+    else:
+        name, run = None, lambda: run_elan_script(script, print_outputs=False, engine=_engine, output=sink)
+
+    stdout = io.StringIO()
+    outputs, error = {}, None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(stdout):
+            outputs = run()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    if error is None:
+        errors = sink.lines(("error",))
+        if errors:
+            error = "\n".join(errors)
+    return {
+        "script": name,
+        "outputs": outputs,
+        "error": error,
+        "elapsed": time.perf_counter() - start,
+        "stdout": sink.getvalue() + stdout.getvalue(),
+    }
+
+class BatchRunner:
+    # Keeps its worker pool warm across run() calls; use as a context manager
+    def __init__(self, workers=None, engine="tree"):
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                         initializer=_init_worker, initargs=(engine,))
+
+    def run(self, scripts, chunksize=None):
+        # Results come back in input order, one dict per script
+        scripts = list(scripts)
+        if chunksize is None:
+            chunksize = max(1, len(scripts) // (self.workers * 4))
+        return list(self._pool.map(_run_one, scripts, chunksize=chunksize))
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def run_batch(scripts, workers=None, chunksize=None, engine="tree"):
+    with BatchRunner(workers=workers, engine=engine) as runner:
+        return runner.run(scripts, chunksize=chunksize)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run ELAN scripts in parallel")
+    arg_parser.add_argument("scripts", nargs="+", help=".elan files")
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--chunksize", type=int, default=None)
+    arg_parser.add_argument("--engine", choices=["tree", "compiled"], default="tree")
+    args = arg_parser.parse_args(argv)
+
+    for result in run_batch(args.scripts, workers=args.workers,
+                            chunksize=args.chunksize, engine=args.engine):
+        print(json.dumps(result, default=str))
+
+if __name__ == "__main__":
+    main()
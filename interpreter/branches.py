@@ -0,0 +1,92 @@
+# interpreter/branches.py
+# Explore alternatives from one interpreter state: each branch runs its own
+# source on an Executor.fork() (copy-on-write, so creating a branch costs
+# the same however much state has accumulated) and reports its output, its
+# labelled outputs and the globals it was asked to collect. Branches run in
+# worker threads, or in worker processes that inherit the parent state
+# through POSIX fork instead of pickling it. merge_branches() copies chosen
+# results back into the parent.
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from language.parser import parse_source
+
+MODES = ("thread", "process")
+
+_parent = None  # executor inherited by forked worker processes
+
+def _init_worker(executor):
+    global _parent
+    _parent = executor
+
+def _run_branch(branch, name, nodes, collect):
+    start = time.perf_counter()
+    error = None
+    try:
+        branch.run(nodes)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "branch": name,
+        "output": branch.output.getvalue(),
+        "outputs": dict(branch.outputs),
+        "values": {key: branch.memory.recall(key) for key in collect},
+        "error": error,
+        "elapsed": time.perf_counter() - start,
+    }
+
+def _run_forked(name, nodes, collect):
+    return _run_branch(_parent.fork(), name, nodes, collect)
+
+def run_branches(executor, sources, mode="thread", workers=None, collect=()):
+    # sources: {name: source} or a list of sources (named by position).
+    # Results come back in input order, one dict per branch.
+    if mode not in MODES:
+        raise ValueError(f"Unknown branch mode '{mode}', expected one of {MODES}")
+    if not isinstance(sources, dict):
+        sources = {i: source for i, source in enumerate(sources)}
+    collect = tuple(collect)
+
+    results = {}
+    jobs = []
+    for name, source in sources.items():
+        try:
+            jobs.append((name, parse_source(source, strict=True)))
+        except Exception as e:
+            results[name] = {"branch": name, "output": "", "outputs": {}, "values": {},
+                             "error": f"Parse error: {e}", "elapsed": 0.0}
+
+    if jobs:
+        executor.flush()
+        if mode == "thread":
+            # Forks are taken here, in order: fork() freezes the parent's state
+            branches = [executor.fork() for _ in jobs]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_run_branch, branch, name, nodes, collect)
+                           for branch, (name, nodes) in zip(branches, jobs)]
+                for (name, _), future in zip(jobs, futures):
+                    results[name] = future.result()
+        else:
+            if "fork" not in multiprocessing.get_all_start_methods():
+                raise ValueError("Process branches need the 'fork' start method")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                                     initializer=_init_worker, initargs=(executor,)) as pool:
+                futures = [pool.submit(_run_forked, name, nodes, collect) for name, nodes in jobs]
+                for (name, _), future in zip(jobs, futures):
+                    results[name] = future.result()
+    return [results[name] for name in sources]
+
+def merge_branches(executor, results, values=True, outputs=True):
+    # Copy branch results into the parent, in order (later branches win)
+    for result in results:
+        if result.get("error"):
+            continue
+        if outputs:
+            executor.outputs.update(result["outputs"])
+        if values:
+            for key, value in result["values"].items():
+                if value is not None:
+                    executor.memory.define_global(key, value)
+    return executor
@@ -1,35 +1,65 @@
 # interpreter/main.py
 
-from language.parser import parse_line
-from language.executor import Executor
-from language.memory import Memory
+import argparse
+import sys
 
-def main():
-    memory = Memory()
-    executor = Executor(memory=memory)
+from language.parser import parse_source, block_depth
+from interpreter.prelude import new_executor
+from interpreter.runner import stream_elan
 
-    print("ELAN REPL - enter single-line statements. Multi-line blocks not supported here.")
+def main(engine="tree"):
+    executor = new_executor(engine)
+    report = lambda message: executor.emit(f"[ERROR] {message}", "error")
+
+    print("ELAN REPL - blocks (if/while/define) continue until their 'end' line.")
     while True:
         try:
             line = input(">>> ")
             if not line.strip():
                 continue
 
-            node = parse_line(line)
-            if not node:
-                print("[ERROR] Could not parse line.")
+            lines = [line]
+            depth = block_depth(line)
+            while depth > 0:
+                line = input("... ")
+                lines.append(line)
+                depth += block_depth(line)
+
+            nodes = parse_source("\n".join(lines), report=report)
+            if not nodes:
+                executor.emit("[ERROR] Could not parse line.", "error")
+                executor.flush()
                 continue
 
-            result = executor.execute(node)
+            result = executor.run(nodes)
 
             # Note: return values outside function calls are ignored by design
             # You can modify here to print returned results if desired.
 
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\nExiting ELAN REPL.")
             break
         except Exception as e:
             print(f"[ERROR] Exception: {e}")
 
+def run_stream(path, engine="tree"):
+    # Execute a script (or stdin with "-") statement by statement as it is read
+    source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for kind, text in stream_elan(source, engine=engine):
+            print(text, flush=True)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
 if __name__ == "__main__":
-    main()
+    arg_parser = argparse.ArgumentParser(description="ELAN REPL")
+    arg_parser.add_argument("script", nargs="?", default=None,
+                            help="stream-execute this script ('-' for stdin) instead of starting the REPL")
+    arg_parser.add_argument("--engine", choices=["tree", "compiled"], default="tree",
+                            help="tree-walking interpreter or closure-compiled engine")
+    args = arg_parser.parse_args()
+    if args.script:
+        run_stream(args.script, engine=args.engine)
+    else:
+        main(engine=args.engine)
@@ -0,0 +1,152 @@
+# interpreter/prelude.py
+# Frozen prelude image. The build step runs the prelude sources listed in
+# settings.prelude once and saves the resulting macros, globals and
+# self-model as a snapshot (language/snapshot.py). new_executor() loads the
+# image once per process, reading it through mmap, and hands every
+# interpreter a copy-on-write fork of that one copy, so starting with the
+# prelude costs about as much as a bare start; worker processes forked
+# after the load share it as well. The image is rebuilt when a source, the
+# interpreter version, the grammar or the parsed node format changes.
+#
+#   python -m interpreter.prelude                 build from settings.prelude
+#   python -m interpreter.prelude a.elan b.elan   build from these files
+
+import argparse
+import hashlib
+import os
+import threading
+
+from language.config import CONFIG_PATH, load_config
+from language.executor import Executor
+from language.memory import Memory
+from language.output import CaptureSink, NullSink, make_sink
+from language.parser import CACHE_DIR, grammar_version, parse_source
+from language.program_cache import CACHE_FORMAT
+from language.snapshot import SnapshotError, capture, read_snapshot, write_snapshot
+
+ROOT = os.path.dirname(CONFIG_PATH)
+
+_base = None  # process-wide executor holding the prelude state
+_lock = threading.Lock()
+
+def _settings():
+    return load_config().get("settings", {}).get("prelude", {})
+
+def prelude_enabled():
+    return bool(_settings().get("load", False))
+
+def prelude_sources():
+    return [os.path.join(ROOT, path) for path in _settings().get("sources", ["elan/prelude.elan"])]
+
+def image_path():
+    return _settings().get("image") or os.path.join(CACHE_DIR, "prelude.snap")
+
+def _digests(sources):
+    digests = {}
+    for path in sources:
+        try:
+            with open(path, "rb") as f:
+                digests[os.path.abspath(path)] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            digests[os.path.abspath(path)] = None
+    return digests
+
+def _build(sources):
+    # Run the sources in a fresh interpreter; report maps each source to
+    # its first error, or None. Sources that do not parse are skipped.
+    output = CaptureSink()
+    executor = Executor(Memory(), output=output)
+    report = {}
+    for source in sources:
+        try:
+            with open(source, encoding="utf-8") as f:
+                nodes = parse_source(f.read(), strict=True)
+        except Exception as e:
+            reason = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+            report[source] = f"not loaded: {reason}"
+            continue
+        executor.run(nodes)
+        errors = output.lines(("error", "warn"))
+        report[source] = errors[0] if errors else None
+        output.clear()
+    executor.set_output(NullSink())
+    return executor, report
+
+def _image_key(sources):
+    # Macro bodies in the image are parsed nodes, so the grammar and node
+    # format they were built with matter as much as the sources
+    return {"prelude": _digests(sources), "grammar": grammar_version(), "node_format": CACHE_FORMAT}
+
+def _save(executor, sources, path):
+    sections = capture(executor)
+    sections["meta"].update(_image_key(sources))  # for staleness checks
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_snapshot(path, sections)
+
+def build_image(sources=None, path=None):
+    sources = prelude_sources() if sources is None else sources
+    path = image_path() if path is None else path
+    executor, report = _build(sources)
+    _save(executor, sources, path)
+    return report
+
+def _fresh(path, sources):
+    try:
+        meta = read_snapshot(path, ["meta"])["meta"]
+    except (OSError, SnapshotError):
+        return False
+    return all(meta.get(name) == value for name, value in _image_key(sources).items())
+
+def load_prelude():
+    # The shared prelude executor, loaded (or built) on first use
+    global _base
+    with _lock:
+        if _base is None:
+            sources, path = prelude_sources(), image_path()
+            base = None
+            if _fresh(path, sources):
+                base = Executor(Memory(), output=NullSink())
+                try:
+                    base.restore(path)
+                except Exception:
+                    base = None  # unreadable image: rebuild it
+            if base is None:
+                base = _build(sources)[0]
+                try:
+                    _save(base, sources, path)
+                except OSError:
+                    pass  # unwritable cache: this process keeps its own build
+            base.fork()  # freeze its state so later forks share it as is
+            _base = base
+    return _base
+
+def new_executor(engine="tree", output=None, prelude=None):
+    # An interpreter that starts from the prelude when settings.prelude.load
+    # (or prelude=True) asks for it, else a bare one
+    if prelude is None:
+        prelude = prelude_enabled()
+    if not prelude:
+        return Executor(Memory(), engine=engine, output=output)
+    if output is None:
+        output = make_sink(load_config().get("settings", {}).get("output"))
+    return load_prelude().fork(output=output, engine=engine)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Build the ELAN prelude image")
+    arg_parser.add_argument("sources", nargs="*", help="prelude files (default: settings.prelude.sources)")
+    arg_parser.add_argument("--image", default=None, help="image path (default: settings.prelude.image)")
+    args = arg_parser.parse_args(argv)
+
+    path = args.image or image_path()
+    report = build_image(args.sources or None, path)
+    for source, error in report.items():
+        if error:
+            print(f"[WARN] {source}: {error}")
+        else:
+            print(f"[OK] {source}")
+    print(f"Prelude image written to {path} ({os.path.getsize(path)} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# interpreter/profile.py
+# Run an ELAN script with the profiler on and report where the time went:
+#   python -m interpreter.profile script.elan --top 15 --folded out.folded
+# The folded file feeds flamegraph.pl, speedscope or inferno directly.
+
+import argparse
+import sys
+
+from language.executor import Executor
+from language.memory import Memory
+from language.parser import parse_file
+
+def profile_file(path, engine="tree"):
+    nodes = parse_file(path, positions=True)
+    if nodes is None:
+        return None
+    executor = Executor(memory=Memory(), engine=engine)
+    profiler = executor.enable_profiling()
+    executor.run(nodes)
+    return profiler
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Profile an ELAN script")
+    arg_parser.add_argument("script")
+    arg_parser.add_argument("--engine", choices=["tree", "compiled"], default="tree")
+    arg_parser.add_argument("--top", type=int, default=10)
+    arg_parser.add_argument("--sort", choices=["exclusive", "inclusive", "calls", "allocs"], default="exclusive")
+    arg_parser.add_argument("--folded", default=None, help="write folded stacks to this file")
+    args = arg_parser.parse_args(argv)
+
+    profiler = profile_file(args.script, engine=args.engine)
+    if profiler is None:
+        sys.exit(1)
+    print(profiler.summary(top=args.top, sort=args.sort), file=sys.stderr)
+    if args.folded:
+        profiler.write_folded(args.folded)
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,126 @@
 # interpreter/runner.py
 
-from language.parser import parse_line
-from language.executor import Executor
-from language.memory import Memory
-
-def run_elan_script(script_lines, print_outputs=True):
-    memory = Memory()  # Fix: instantiate correctly
-    executor = Executor(memory=memory)
-
-    for line in script_lines:
-        node = parse_line(line)
-        if not node:
-            if print_outputs:
-                print(f"[ERROR] Failed to parse line: {line}")
-            continue
-        executor.execute(node)
+from language.parser import parse_line, parse_source, block_depth
+from language.output import CaptureSink
+from language.program_cache import load_program
+from language.resolve import Node
+from interpreter.prelude import new_executor
 
+def run_elan_script(script_lines, print_outputs=True, engine="tree", output=None):
+    # output: the sink to write to (default: settings.output)
+    executor = new_executor(engine, output=output)
+    _run_lines(executor, script_lines, print_outputs)
+    return _finish(executor, print_outputs)
+
+def run_elan_file(path, print_outputs=True, engine="tree", use_cache=True, cache_dir=None, output=None):
+    # With use_cache the parsed program is reused from a .elanc file
+    # (next to the script, or in cache_dir) as long as it is fresh
+    if use_cache:
+        try:
+            nodes = load_program(path, cache_dir=cache_dir)
+        except Exception:
+            nodes = None
+        if nodes is not None:
+            executor = new_executor(engine, output=output)
+            executor.run(nodes)
+            return _finish(executor, print_outputs)
+
+    with open(path, encoding="utf-8") as f:
+        return run_elan_script(f.read().splitlines(), print_outputs=print_outputs, engine=engine,
+                               output=output)
+
+def _run_lines(executor, script_lines, print_outputs):
+    script_lines = list(script_lines)
+    # Parse the whole script in one pass so multi-line blocks work; if that
+    # fails, fall back to line-by-line so the good lines still run
+    try:
+        nodes = parse_source("\n".join(script_lines), strict=True)
+    except Exception:
+        nodes = None
+
+    if nodes is not None:
+        executor.run(nodes)
+    else:
+        errors = []
+        def report(message):
+            errors.append(message)
+            executor.emit(f"[ERROR] {message}", "error")
+        for line in script_lines:
+            node = parse_line(line, report=report)
+            if node is None:
+                # Blank and comment-only lines come back as None without an error
+                if errors and print_outputs:
+                    executor.emit(f"[ERROR] Failed to parse line: {line}", "error")
+                errors.clear()
+                continue
+            executor.run([node])
+        executor.flush()
+
+def stream_elan(source, engine="tree", executor=None, positions=False):
+    # Run a script statement by statement as its lines arrive and yield
+    # (kind, text) for everything it prints. source is any iterable of lines
+    # (a file object, a generator, a list) or a string. Only the statement
+    # being read is held in memory, so input length does not matter.
+    if isinstance(source, str):
+        source = source.splitlines()
+    if executor is None:
+        executor = new_executor(engine)
+    sink = CaptureSink()
+    previous = executor.output
+    executor.set_output(sink)
+    try:
+        chunk = []
+        start = depth = 0
+        for number, line in enumerate(source, 1):
+            line = line.rstrip("\r\n")
+            if not chunk:
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                start = number
+            chunk.append(line)
+            depth += block_depth(line)
+            if depth > 0:
+                continue
+            _run_chunk(executor, chunk, start, positions)
+            chunk, depth = [], 0
+            yield from sink.records
+            sink.clear()
+
+        if chunk:
+            sink.emit(f"[ERROR] Unterminated block starting at line {start}: {chunk[0].strip()}", "error")
+            yield from sink.records
+            sink.clear()
+    finally:
+        # A caller's executor gets its own sink back, also when the
+        # stream is closed early
+        executor.set_output(previous)
+
+def _run_chunk(executor, chunk, start, positions):
+    try:
+        nodes = parse_source("\n".join(chunk), strict=True, positions=positions)
+    except Exception as e:
+        reason = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        executor.emit(f"[ERROR] Failed to parse line {start}: {chunk[0].strip()} ({reason})", "error")
+        return
+    if positions:
+        _shift_lines(nodes, start - 1)
+    executor.run(nodes)
+
+def _shift_lines(nodes, offset):
+    # Chunks are parsed on their own; make statement lines script-relative
+    for node in nodes:
+        if type(node) is Node:
+            node.line += offset
+        if isinstance(node, list):
+            _shift_lines(node, offset)
+
+def _finish(executor, print_outputs):
     if print_outputs:
         print("=== Final Outputs ===")
         for label, output in executor.outputs.items():
             print(f"{label}: {output}")
 
-    return executor.outputs
+    return dict(executor.outputs)
 
 # Example usage:
 # if __name__ == "__main__":
@@ -0,0 +1,52 @@
+# interpreter/score.py
+# Run ELAN scripts and check their expectations against their labelled
+# outputs in bulk, printing a table (default) or JSON:
+#   python -m interpreter.score a.elan b.elan --json --rtol 1e-6
+# Exits with status 1 when any expectation fails or is missing.
+
+import argparse
+import json
+import sys
+
+from language.output import NullSink
+from language.parser import parse_file
+from interpreter.prelude import new_executor
+
+def score_file(path, engine="tree", rtol=None, atol=None):
+    nodes = parse_file(path)
+    if nodes is None:
+        return None
+    executor = new_executor(engine, output=NullSink())
+    executor.run(nodes)
+    return executor.score(rtol, atol)
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Score ELAN expectations")
+    arg_parser.add_argument("scripts", nargs="+")
+    arg_parser.add_argument("--engine", choices=["tree", "compiled"], default="tree")
+    arg_parser.add_argument("--rtol", type=float, default=None, help="default: settings.scoring.rtol")
+    arg_parser.add_argument("--atol", type=float, default=None, help="default: settings.scoring.atol")
+    arg_parser.add_argument("--json", action="store_true", help="print one JSON report per script")
+    arg_parser.add_argument("--all", action="store_true", help="list passing labels too")
+    arg_parser.add_argument("--limit", type=int, default=50, help="rows per script (0: no limit)")
+    args = arg_parser.parse_args(argv)
+
+    limit = args.limit or None
+    ok = True
+    for path in args.scripts:
+        scores = score_file(path, engine=args.engine, rtol=args.rtol, atol=args.atol)
+        if scores is None:
+            ok = False
+            continue
+        ok = ok and scores.ok
+        if args.json:
+            report = scores.as_dict(failures_only=not args.all, limit=limit)
+            report["script"] = path
+            print(json.dumps(report, default=str))
+        else:
+            print(f"== {path} ==")
+            print(scores.table(failures_only=not args.all, limit=limit))
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# interpreter/server.py
+# Asyncio server hosting many isolated ELAN sessions over TCP or a Unix
+# socket. The protocol is line-delimited JSON:
+#   -> {"id": 1, "session": "agent-7", "source": "remember x 5\nsay x"}
+#   <- {"id": 1, "session": "agent-7", "output": "5\n", "outputs": {}, "error": null}
+#   -> {"id": 2, "session": "agent-7", "op": "close"}
+# Requests may be pipelined; each session runs its requests in order. A
+# request runs as a Task (language/budget.py) that pauses after every slice
+# of instructions, so a busy session yields to the others mid-statement, and
+# the safe_mode limits (instruction budget, deadline, memory) end runaway
+# programs. Each session captures its own output through a CaptureSink.
+
+import argparse
+import asyncio
+import json
+
+from language.output import CaptureSink
+from language.parser import get_parser, parse_source
+from interpreter.prelude import load_prelude, new_executor, prelude_enabled
+
+class Session:
+    def __init__(self, name, engine):
+        self.name = name
+        self.output = CaptureSink()
+        self.executor = new_executor(engine, output=self.output)  # own Memory and SelfModel
+        self.queue = asyncio.Queue()
+        self.task = None
+
+class ElanServer:
+    def __init__(self, engine="tree", budget=10000):
+        self.engine = engine
+        self.budget = budget  # instructions per slice before yielding
+        self.sessions = {}
+
+    def session(self, name):
+        session = self.sessions.get(name)
+        if session is None:
+            session = Session(name, self.engine)
+            session.task = asyncio.create_task(self._serve_session(session))
+            self.sessions[name] = session
+        return session
+
+    async def _serve_session(self, session):
+        while True:
+            request, reply = await session.queue.get()
+            if request.get("op") == "close":
+                await reply({"id": request.get("id"), "session": session.name, "error": None})
+                return
+            await reply(await self.execute(session, request))
+
+    async def execute(self, session, request):
+        response = {"id": request.get("id"), "session": session.name,
+                    "output": "", "outputs": {}, "error": None}
+        try:
+            nodes = parse_source(request.get("source", ""), strict=True)
+        except Exception as e:
+            response["error"] = f"Parse error: {e}"
+            return response
+
+        executor = session.executor
+        session.output.clear()
+        task = executor.start_task(nodes)
+        while task.step(self.budget) == "paused":
+            await asyncio.sleep(0)  # let other sessions run
+        if task.error is not None:
+            response["error"] = f"{type(task.error).__name__}: {task.error}"
+        elif executor.budget.exceeded is not None:
+            response["error"] = str(executor.budget.exceeded)
+        response["output"] = session.output.getvalue()
+        response["outputs"] = dict(executor.outputs)
+        return response
+
+    async def handle_client(self, reader, writer):
+        write_lock = asyncio.Lock()
+
+        async def reply(response):
+            async with write_lock:
+                try:
+                    writer.write((json.dumps(response, default=str) + "\n").encode("utf-8"))
+                    await writer.drain()
+                except ConnectionError:
+                    pass  # client went away; the session keeps its state
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    name = str(request["session"])
+                except (ValueError, KeyError, TypeError) as e:
+                    await reply({"id": None, "error": f"Bad request: {e}"})
+                    continue
+
+                if request.get("op") == "close" and name not in self.sessions:
+                    await reply({"id": request.get("id"), "session": name,
+                                 "error": "Unknown session"})
+                    continue
+                session = self.session(name)
+                if request.get("op") == "close":
+                    # Later requests for this name start a fresh session; this
+                    # one still finishes its queued work before closing
+                    del self.sessions[name]
+                await session.queue.put((request, reply))
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=7878, unix_path=None):
+        get_parser()  # load the grammar tables before accepting clients
+        if prelude_enabled():
+            load_prelude()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="ELAN multi-session server")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=7878)
+    arg_parser.add_argument("--unix", default=None, help="serve on a Unix socket path instead of TCP")
+    arg_parser.add_argument("--engine", choices=["tree", "compiled"], default="tree")
+    arg_parser.add_argument("--budget", type=int, default=10000, help="instructions per slice")
+    args = arg_parser.parse_args(argv)
+
+    server = ElanServer(engine=args.engine, budget=args.budget)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# --- language/budget.py ---
+# Run limits for safe_mode, read from settings.limits: an instruction budget
+# (statements executed), a deadline (seconds of running time), a memory
+# ceiling (resident size of the process) and the per-loop iteration cap.
+# Each run starts a fresh budget. The executor counts statements down in
+# Executor._fuel; only when that reaches zero does Budget.refuel() check the
+# limits and hand out the next batch, so the clock and memory are read once
+# every check_every statements and an unlimited run costs one decrement per
+# statement.
+#
+# A Task runs nodes on a thread of its own and pauses whenever its slice of
+# instructions is used up; step() resumes it for another slice. A scheduler
+# can so time-slice many programs on one worker without losing their place.
+
+import os
+import sys
+import threading
+import time
+
+UNLIMITED = sys.maxsize
+
+
+class BudgetExceeded(BaseException):
+    # Stops the whole run: not an Exception, so statement-level handlers
+    # let it through and it reaches Executor.run
+    def __init__(self, limit, message):
+        super().__init__(message)
+        self.limit = limit
+
+
+def _rss_mb():
+    # Resident size of this process; peak size where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class Budget:
+    def __init__(self, settings):
+        limits = settings.get("limits", {})
+        enforce = bool(settings.get("safe_mode", True))
+        self.instructions = limits.get("instructions") if enforce else None
+        self.deadline = limits.get("deadline") if enforce else None
+        self.memory_mb = limits.get("memory_mb") if enforce else None
+        self.loop_iterations = limits.get("loop_iterations", 10000) if enforce else None
+        self.check_every = max(1, limits.get("check_every", 1024))
+        self.task = None  # the Task running on this executor, if any
+        self.start()
+
+    def start(self):
+        # Reset for a new run; returns the executor's starting fuel
+        self.used = 0
+        self.elapsed = 0.0
+        self.exceeded = None
+        self._batch = 0
+        self._resumed = time.monotonic()
+        return 0  # the first statement calls refuel()
+
+    def running_time(self):
+        return self.elapsed + time.monotonic() - self._resumed
+
+    def refuel(self):
+        # The fuel for the statement about to run has run out: account the
+        # last batch, enforce the limits, pause for the scheduler if the
+        # slice is used up, and return the new fuel (this statement included)
+        self.used += self._batch
+        if self.instructions is not None and self.used >= self.instructions:
+            self._stop("instructions", f"Instruction budget of {self.instructions} exceeded")
+        if self.deadline is not None and self.running_time() > self.deadline:
+            self._stop("deadline", f"Deadline of {self.deadline}s exceeded after {self.used} instructions")
+        if self.memory_mb is not None:
+            rss = _rss_mb()
+            if rss > self.memory_mb:
+                self._stop("memory", f"Memory ceiling of {self.memory_mb} MB exceeded ({rss:.0f} MB in use)")
+
+        task = self.task
+        if task is not None and self.used >= task.pause_at:
+            self.elapsed += time.monotonic() - self._resumed  # paused time does not count
+            task._pause()
+            self._resumed = time.monotonic()
+
+        batch = UNLIMITED
+        if self.deadline is not None or self.memory_mb is not None:
+            batch = self.check_every
+        if self.instructions is not None:
+            batch = min(batch, self.instructions - self.used)
+        if task is not None:
+            batch = min(batch, task.pause_at - self.used)
+        self._batch = batch
+        return batch - 1
+
+    def _stop(self, limit, message):
+        self._batch = 0
+        self.exceeded = BudgetExceeded(limit, message)
+        raise self.exceeded
+
+
+class Task:
+    # Runs nodes on an executor in slices of instructions:
+    #   task = executor.start_task(nodes)
+    #   while task.step(10000) == "paused": ...  (run other tasks)
+    # step() blocks until the slice is used up or the program ends, and
+    # returns the state: "paused", "done", "stopped" (a limit was hit or the
+    # task was cancelled; the executor emitted why) or "failed".
+    def __init__(self, executor, nodes):
+        self.executor = executor
+        self.nodes = nodes
+        self.state = "ready"
+        self.error = None
+        self.pause_at = 0
+        self._turn = threading.Condition()
+        self._running = False
+        self._cancelled = False
+        self._thread = None
+
+    def step(self, instructions):
+        if self.state in ("done", "stopped", "failed"):
+            return self.state
+        budget = self.executor.budget
+        with self._turn:
+            if self._thread is None:
+                if budget.task is not None:
+                    raise RuntimeError("Another task is already running on this executor")
+                budget.task = self
+                self.pause_at = max(1, instructions)
+                self._thread = threading.Thread(target=self._main, name="elan-task", daemon=True)
+                self._running = True
+                self._thread.start()
+            else:
+                self.pause_at = budget.used + max(1, instructions)
+                self._running = True
+                self._turn.notify_all()
+            while self._running:
+                self._turn.wait()
+        return self.state
+
+    def run(self):
+        # Run to the end without pausing
+        return self.step(UNLIMITED)
+
+    def cancel(self):
+        # Stop a paused task; it unwinds on its own thread
+        if self.state == "paused":
+            self._cancelled = True
+            self.step(1)
+        elif self.state == "ready":
+            self.state = "stopped"
+        return self.state
+
+    def _pause(self):
+        # Called on the task thread from Budget.refuel()
+        with self._turn:
+            self.state = "paused"
+            self._running = False
+            self._turn.notify_all()
+            while not self._running:
+                self._turn.wait()
+            self.state = "running"
+        if self._cancelled:
+            self.executor.budget._stop("cancelled", "Task cancelled")
+
+    def _main(self):
+        executor = self.executor
+        state = "done"
+        try:
+            executor.run(self.nodes)
+            if executor.budget.exceeded is not None:
+                state = "stopped"
+        except BaseException as e:
+            self.error = e
+            state = "failed"
+        finally:
+            executor.budget.task = None
+        with self._turn:
+            self.state = state
+            self._running = False
+            self._turn.notify_all()
@@ -0,0 +1,612 @@
+# --- language/compiler.py ---
+# Closure compiler: turns parsed nodes into pre-bound Python callables once,
+# so running them again skips the command dispatch in Executor.execute.
+# Anything the compiler does not recognise falls back to the tree-walker,
+# which keeps the output and side effects identical between both engines.
+# Compiled statements return None or a signal (Return, TailCall, BREAK)
+# instead of raising, so returning from a function costs no exception.
+
+from language.executor import (ReturnException, BreakException, ExecutorError, LimitError,
+                               Return, TailCall, BREAK)
+from language.memory import FrameLayout, _UNSET
+from language.numeric import CONSTANTS, make_list, index_value, slice_value, set_index, snapshot
+from language.resolve import (Literal, VarRef, BinOp, UnaryOp, Call, ListExpr, Index, Slice,
+                              OPERATORS, UNARY_OPERATORS, resolve_expr, expr_reads)
+
+
+def _noop():
+    return None
+
+
+def _normalize_body(body):
+    # Same rule as the tree-walker: a list of nodes, or a single node
+    return body if isinstance(body, list) and isinstance(body[0], list) else [body]
+
+
+# Statements that read no variables; all but 'break' have side effects
+_FRAME_FREE = {"label_output", "break", "identity", "declare", "belief", "intent",
+               "goal", "reason", "evaluate", "adjust", "trace", "trace_step",
+               "describe_self", "ask_self"}
+
+# Statements with effects outside the function's own frame
+_EFFECTS = (_FRAME_FREE - {"break"}) | {"say", "expect", "remember_index"}
+
+
+def _expr_closed(token, bound, calls):
+    token = resolve_expr(token)
+    kind = type(token)
+    if kind is Literal:
+        return True
+    if kind is VarRef:
+        return token.name in bound
+    if kind is BinOp:
+        return _expr_closed(token.left, bound, calls) and _expr_closed(token.right, bound, calls)
+    if kind is UnaryOp:
+        return _expr_closed(token.operand, bound, calls)
+    if kind is Call:
+        calls.add(token.name)
+        return all(_expr_closed(a, bound, calls) for a in token.args)
+    if kind is ListExpr:
+        return all(_expr_closed(item, bound, calls) for item in token.items)
+    if kind is Index:
+        return _expr_closed(token.base, bound, calls) and _expr_closed(token.index, bound, calls)
+    if kind is Slice:
+        return all(part is None or _expr_closed(part, bound, calls)
+                   for part in (token.base, token.start, token.stop))
+    return False
+
+
+def _block_closed(stmts, bound, calls, effects):
+    # Names become bound in statement order; a branch's bindings stay inside it.
+    # Statements with outside effects are collected into 'effects'.
+    for stmt in stmts:
+        if not isinstance(stmt, list) or not stmt:
+            continue
+        cmd = stmt[0]
+        if cmd in _EFFECTS:
+            effects.add(cmd)
+        if cmd in _FRAME_FREE:
+            continue
+        if cmd in ("say", "return") and len(stmt) == 2:
+            ok = _expr_closed(stmt[1], bound, calls)
+        elif cmd == "expect" and len(stmt) == 3:
+            ok = _expr_closed(stmt[2], bound, calls)
+        elif cmd == "remember" and len(stmt) == 3:
+            ok = _expr_closed(stmt[2], bound, calls)
+            bound.add(stmt[1])
+        elif cmd == "remember_index" and len(stmt) == 4:
+            ok = stmt[1] in bound and all(_expr_closed(e, bound, calls) for e in stmt[2:])
+        elif cmd == "function_call" and len(stmt) == 3 and isinstance(stmt[2], list):
+            calls.add(stmt[1])
+            ok = all(_expr_closed(a, bound, calls) for a in stmt[2])
+        elif cmd == "if" and len(stmt) >= 3:
+            ok = _expr_closed(stmt[1], bound, calls) and all(
+                _block_closed(_normalize_body(block), set(bound), calls, effects) for block in stmt[2:4])
+        elif cmd == "while" and len(stmt) == 3:
+            ok = (_expr_closed(stmt[1], bound, calls)
+                  and _block_closed(_normalize_body(stmt[2]), set(bound), calls, effects))
+        else:
+            ok = False
+        if not ok:
+            return False
+    return True
+
+
+def _assigned_names(body):
+    # Names a function body binds with 'remember', in first-assignment order
+    names = []
+    for stmt in body if isinstance(body, list) else ():
+        if not isinstance(stmt, list) or not stmt:
+            continue
+        cmd = stmt[0]
+        if cmd == "remember" and len(stmt) == 3 and isinstance(stmt[1], str):
+            names.append(stmt[1])
+        elif cmd in ("if", "while"):
+            for block in stmt[2:4] if cmd == "if" else stmt[2:3]:
+                if isinstance(block, list) and block:
+                    names.extend(_assigned_names(_normalize_body(block)))
+    return names
+
+
+class Compiler:
+    def __init__(self, executor):
+        self.ex = executor
+        self.layout = None  # FrameLayout of the function body being compiled
+        self.facts = None  # id(statement) -> types proven before it (TypeEngine.analyze)
+        self.env = {}  # types proven before the statement being compiled
+        self.handlers = {
+            "return": self._return,
+            "break": self._break,
+            "if": self._if,
+            "while": self._while,
+            "function_def": self._function_def,
+            "function_call": self._function_call,
+            "say": self._say,
+            "remember": self._remember,
+            "remember_index": self._remember_index,
+            "recall": self._recall,
+            "label_output": self._label_output,
+            "expect": self._expect,
+            "identity": self._self_model("set_identity"),
+            "declare": self._self_model("add_declaration"),
+            "belief": self._self_model("add_belief"),
+            "intent": self._self_model("add_intent"),
+            "goal": self._self_model("add_goal"),
+            "reason": self._self_model("add_reason"),
+            "evaluate": self._self_model("add_evaluation"),
+            "adjust": self._self_model("add_adjustment"),
+            "trace": self._self_model("start_trace"),
+            "trace_step": self._self_model("add_trace_step"),
+            "describe_self": self._describe_self,
+            "ask_self": self._ask_self,
+            "remember_program": self._remember_program,
+            "end_program": self._end_program,
+        }
+        self._analysis = {}  # id(body) -> (body, closed, pure, calls)
+        # Commands the tree-walker only reaches after its 'collecting' check
+        for cmd in ("score_thoughts", "reflect_memory", "reflect_macro", "reflect_all"):
+            self.handlers[cmd] = self._delegate
+        for cmd in ("generate_macro", "rewrite_macro",
+                    "suggest_fix", "remember_fix", "apply_fix"):
+            self.handlers[cmd] = self._collectable
+        self.handlers["run_program"] = self._run_program
+
+    # --- Blocks and statements ---
+
+    def compile_block(self, nodes):
+        stmts = tuple(self.compile_statement(node) for node in nodes)
+
+        def run_block():
+            for stmt in stmts:
+                signal = stmt()
+                if signal is not None:
+                    return signal
+            return None
+        return run_block
+
+    def compile_program(self, nodes, layout=None, param_types=None):
+        # Entry point for a whole body: runs the static type pass first
+        facts = self.ex.type_engine.analyze(nodes, param_types)[0]
+        saved = self.layout, self.facts, self.env
+        self.layout, self.facts, self.env = layout, facts, {}
+        try:
+            return self.compile_block(nodes)
+        finally:
+            self.layout, self.facts, self.env = saved
+
+    def compile_function(self, params, body, param_types=None):
+        # Locals (params and remembered names) become slots of one FrameLayout.
+        # param_types (from a signature) may only be given when the caller
+        # has checked the arguments against it.
+        layout = FrameLayout(list(params) + _assigned_names(body))
+        return self.compile_program(body, layout, param_types), layout
+
+    def analyze(self, params, body):
+        # (closed, pure, calls): closed when the body reads only names bound
+        # in its own frame, pure when it is also free of outside effects;
+        # calls are the functions it may invoke
+        cached = self._analysis.get(id(body))
+        if cached is None or cached[0] is not body:
+            calls, effects = set(), set()
+            closed = _block_closed(_normalize_body(body) if body else [], set(params), calls, effects)
+            cached = (body, closed, closed and not effects, frozenset(calls))
+            self._analysis[id(body)] = cached
+        return cached[1:]
+
+    def _slot(self, name):
+        if self.layout is None:
+            return None
+        return self.layout.index.get(name)
+
+    def compile_statement(self, node):
+        if not node:
+            return _noop
+        cmd = node[0]
+        handler = self.handlers.get(cmd) if isinstance(cmd, str) else None
+        if handler is None:
+            return self._collectable(node)  # counted by ex.execute
+        saved = self.env
+        if self.facts is not None:
+            self.env = self.facts.get(id(node), {})
+        try:
+            fn = handler(node)
+        except Exception:
+            # Malformed node: let the tree-walker report it at run time
+            return self._delegate(node)
+        finally:
+            self.env = saved
+        if handler in (self._delegate, self._collectable):
+            # (delegated statements are counted and profiled by the executor itself)
+            return self._guard(fn, counted=False)
+        profiler = self.ex.profiler
+        if profiler is not None:
+            return profiler.wrap_statement(getattr(node, "line", 0), self._guard(fn))
+        return self._guard(fn)
+
+    def _guard(self, fn, counted=True):
+        ex = self.ex
+
+        def guarded():
+            if counted:
+                ex._fuel -= 1
+                if ex._fuel < 0:
+                    ex._refuel()
+            try:
+                return fn()
+            except ReturnException as ret:
+                # Raised by tree-walked statements (e.g. run_program lines)
+                if ex.call_depth == 0:
+                    ex.emit("[WARN] 'return' outside function ignored", "warn")
+                    return None
+                return ret.value if type(ret.value) is TailCall else Return(ret.value)
+            except BreakException:
+                return BREAK
+            except LimitError as e:
+                if ex.call_depth > 0:
+                    raise
+                ex.emit(f"[ERROR] {e}", "error")
+            except RecursionError:
+                if ex.call_depth > 0:
+                    raise LimitError(f"Python stack exhausted at call depth {ex.call_depth}") from None
+                ex.emit("[ERROR] Python stack exhausted", "error")
+            except ExecutorError as e:
+                ex.emit(f"[ERROR] {e}", "error")
+            except Exception as e:
+                ex.emit(f"[EXCEPTION] Unexpected error: {e}", "error")
+        return guarded
+
+    def _delegate(self, node):
+        execute = self.ex.execute
+
+        def run():
+            execute(node)
+        return run
+
+    def _collectable(self, node):
+        ex = self.ex
+        execute = ex.execute
+
+        def run():
+            if ex.collecting:
+                ex.collected_lines.append(node)
+            else:
+                execute(node)
+        return run
+
+    # --- Expressions ---
+
+    def compile_expr(self, token):
+        # Raw tokens are resolved here, so hand-built nodes compile the same way
+        token = resolve_expr(token)
+        kind = type(token)
+
+        if kind is Literal:
+            value = token.value
+            return lambda: value
+
+        if kind is VarRef:
+            name = token.name
+            recall = self.ex.memory.recall
+            slot = self._slot(name)
+            fallback = CONSTANTS.get(name, name)
+
+            if name in self.env:
+                # Proven bound in this frame: no unbound or None fallback
+                if slot is not None:
+                    stack = self.ex.memory.stack
+                    return lambda: stack[-1].values[slot]
+                return lambda: recall(name)
+
+            if slot is not None:
+                stack = self.ex.memory.stack
+
+                def read_slot():
+                    val = stack[-1].values[slot]
+                    if val is _UNSET:
+                        val = recall(name)
+                    return val if val is not None else fallback
+                return read_slot
+
+            def lookup():
+                val = recall(name)
+                return val if val is not None else fallback
+            return lookup
+
+        if kind is BinOp:
+            op = OPERATORS[token.op]
+            if self.ex.type_engine.infer_static(token, self.env)[0] is not None:
+                fused = self._fused_binop(op, token.left, token.right)
+                if fused is not None:
+                    return fused
+            left = self.compile_expr(token.left)
+            right = self.compile_expr(token.right)
+            return lambda: op(left(), right())
+
+        if kind is Call:
+            return self._call(token.name, token.args)
+
+        if kind is Index:
+            base = self.compile_expr(token.base)
+            index = self.compile_expr(token.index)
+            return lambda: index_value(base(), index())
+
+        if kind is ListExpr:
+            items = tuple(self.compile_expr(item) for item in token.items)
+            return lambda: make_list([item() for item in items])
+
+        if kind is UnaryOp:
+            op = UNARY_OPERATORS[token.op]
+            operand = self.compile_expr(token.operand)
+            return lambda: op(operand())
+
+        if kind is Slice:
+            base = self.compile_expr(token.base)
+            start = _noop if token.start is None else self.compile_expr(token.start)
+            stop = _noop if token.stop is None else self.compile_expr(token.stop)
+            return lambda: slice_value(base(), start(), stop())
+
+        return self._eval_fallback(token)
+
+    def _fused_binop(self, op, left, right):
+        # Numeric operands proven by the type pass: read slots and constants
+        # inline instead of through one closure per operand
+        left_slot, right_slot = self._proven_slot(left), self._proven_slot(right)
+        stack = self.ex.memory.stack
+        if left_slot is not None and type(right) is Literal:
+            c = right.value
+            return lambda: op(stack[-1].values[left_slot], c)
+        if type(left) is Literal and right_slot is not None:
+            c = left.value
+            return lambda: op(c, stack[-1].values[right_slot])
+        if left_slot is not None and right_slot is not None:
+            return lambda: op(stack[-1].values[left_slot], stack[-1].values[right_slot])
+        return None
+
+    def _proven_slot(self, token):
+        if type(token) is VarRef and token.name in self.env:
+            return self._slot(token.name)
+        return None
+
+    def _call(self, name, args):
+        arg_fns = tuple(self.compile_expr(a) for a in args)
+        arg_reads = tuple(expr_reads(resolve_expr(a)) for a in args)
+        invoke = self.ex._invoke
+        return lambda: invoke(name, args, arg_fns, arg_reads)
+
+    def _eval_fallback(self, token):
+        eval_value = self.ex._eval_value
+        return lambda: eval_value(token)
+
+    # --- Handlers: each returns an unguarded zero-argument callable ---
+
+    def _return(self, node):
+        ex = self.ex
+        token = resolve_expr(node[1])
+        value = self.compile_expr(token)
+
+        if type(token) is Call:
+            # Tail position: hand the call to the caller's trampoline
+            get_macro = ex.memory.get_macro
+            name = token.name
+            tail = TailCall(name, token.args,
+                            tuple(self.compile_expr(a) for a in token.args),
+                            tuple(expr_reads(resolve_expr(a)) for a in token.args))
+
+            def run_tail():
+                if ex.call_depth == 0:
+                    ex.emit("[WARN] 'return' outside function ignored", "warn")
+                    return None
+                if get_macro(name) is not None:
+                    return tail
+                return Return(value())
+            return run_tail
+
+        def run():
+            if ex.call_depth == 0:
+                ex.emit("[WARN] 'return' outside function ignored", "warn")
+                return None
+            return Return(value())
+        return run
+
+    def _break(self, node):
+        def run():
+            return BREAK
+        return run
+
+    def _if(self, node):
+        cond = self.compile_expr(node[1])
+        then_block = self.compile_block(_normalize_body(node[2]))
+        else_block = self.compile_block(_normalize_body(node[3])) if len(node) > 3 else _noop
+
+        def run():
+            if cond():
+                return then_block()
+            return else_block()
+        return run
+
+    def _while(self, node):
+        cond = self.compile_expr(node[1])
+        body = self.compile_block(_normalize_body(node[2]))
+        emit = self.ex.emit
+        budget = self.ex.budget
+
+        def run():
+            max_iterations = budget.loop_iterations
+            count = 0
+            while cond():
+                count += 1
+                if max_iterations is not None and count > max_iterations:
+                    emit("[WARN] Loop iteration limit reached", "warn")
+                    break
+                signal = body()
+                if signal is not None:
+                    if signal is BREAK:
+                        break
+                    return signal
+            return None
+        return run
+
+    def _function_def(self, node):
+        _, name, params, body = node
+        define_macro = self.ex.memory.define_macro
+        return lambda: define_macro(name, {"params": params, "body": body})
+
+    def _function_call(self, node):
+        call = self._call(node[1], node[2])
+
+        def run():
+            call()
+        return run
+
+    def _say(self, node):
+        ex = self.ex
+        value = self.compile_expr(node[1])
+
+        emit = ex.emit
+
+        def run():
+            val = value()
+            emit(val)
+            if ex.last_label:
+                ex.outputs[ex.last_label] = snapshot(val)
+                ex.last_label = None
+        return run
+
+    def _remember(self, node):
+        _, key, val = node
+        value = self.compile_expr(val)
+        define = self.ex.memory.define
+        infer_type = self.ex.type_engine.infer_type
+        slot = self._slot(key)
+        proven = self.ex.type_engine.infer_static(val, self.env)[0]
+
+        if proven is not None:
+            # The static type is what infer_type would record
+            inferred = self.ex.type_engine.inferred
+            if slot is not None:
+                stack = self.ex.memory.stack
+
+                def run_proven_slot():
+                    stack[-1].values[slot] = value()
+                    inferred[key] = proven
+                return run_proven_slot
+
+            def run_proven():
+                define(key, value())
+                inferred[key] = proven
+            return run_proven
+
+        if slot is not None:
+            stack = self.ex.memory.stack
+
+            def run_slot():
+                evaluated = value()
+                stack[-1].values[slot] = evaluated
+                infer_type(key, evaluated)
+            return run_slot
+
+        def run():
+            evaluated = value()
+            define(key, evaluated)
+            infer_type(key, evaluated)
+        return run
+
+    def _remember_index(self, node):
+        _, key, index, val = node
+        index = self.compile_expr(index)
+        value = self.compile_expr(val)
+        recall = self.ex.memory.recall
+
+        def run():
+            target = recall(key)
+            if target is None:
+                raise ExecutorError(f"Cannot assign to element of undefined '{key}'")
+            set_index(target, index(), value())
+        return run
+
+    def _recall(self, node):
+        name = node[1]
+        recall = self.ex.memory.recall
+        emit = self.ex.emit
+
+        def run():
+            emit(recall(name), "recall")
+        return run
+
+    def _label_output(self, node):
+        ex = self.ex
+        label = node[1]
+
+        def run():
+            ex.last_label = label
+        return run
+
+    def _expect(self, node):
+        label = node[1]
+        value = self.compile_expr(node[2])
+        expectations = self.ex.expectations
+
+        def run():
+            expectations[label] = snapshot(value())
+        return run
+
+    def _self_model(self, method):
+        def handler(node):
+            args = tuple(node[1:])
+            bound = getattr(self.ex.self_model, method)
+
+            def run():
+                bound(*args)
+            return run
+        return handler
+
+    def _describe_self(self, node):
+        describe = self.ex.self_model.describe
+        emit = self.ex.emit
+
+        def run():
+            for line in describe():
+                emit(line, "self")
+        return run
+
+    def _ask_self(self, node):
+        query = node[1]
+        ask_self = self.ex.self_model.ask_self
+        emit = self.ex.emit
+
+        def run():
+            for line in ask_self(query):
+                emit(line, "self")
+        return run
+
+    def _remember_program(self, node):
+        ex = self.ex
+        name = node[1]
+
+        def run():
+            ex.collecting = name
+            ex.collected_lines = []
+        return run
+
+    def _run_program(self, node):
+        ex = self.ex
+        label = node[1]
+
+        def run():
+            if ex.collecting:
+                ex.collected_lines.append(node)
+                return None
+            program = ex._compiled_program(label)
+            if program is not None:
+                return program()  # return and break signals reach the caller
+            return None
+        return run
+
+    def _end_program(self, node):
+        ex = self.ex
+
+        def run():
+            ex.programs[ex.collecting] = ex.collected_lines.copy()
+            ex.collecting = None
+            ex.collected_lines = []
+        return run
@@ -0,0 +1,22 @@
+# --- language/config.py ---
+# Access to elan_config.json at the repository root.
+
+import json
+import os
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "elan_config.json")
+
+_config = None
+
+def load_config():
+    global _config
+    if _config is None:
+        try:
+            with open(CONFIG_PATH, encoding="utf-8") as f:
+                _config = json.load(f)
+        except (OSError, ValueError):
+            _config = {}
+    return _config
+
+def interpreter_version():
+    return load_config().get("version", "unknown")
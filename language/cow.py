@@ -0,0 +1,164 @@
+# --- language/cow.py ---
+# Copy-on-write mapping for forking interpreter state. A CowDict keeps its
+# own writes in a private top dict over a tuple of frozen layers shared with
+# other forks; fork() freezes the current top (both sides then write to new
+# tops), so it costs the same however much state has accumulated. Deletes
+# leave tombstones. A value found in a shared layer is copied up into the
+# top on first read (through 'copy', for mutable values), so reads stay one
+# dict lookup and no fork can mutate another's objects.
+#
+# Copies keep aliasing intact: names that shared one object before a fork
+# still share one (copied) object on each side after it. Each side maps the
+# objects it copied to their copies; fork() freezes that map as a redirect
+# layer, so an object reached through an older layer is first taken to the
+# copy that replaced it.
+
+from collections.abc import MutableMapping
+
+MAX_LAYERS = 64  # deeper chains are flattened into one layer on fork
+
+
+class _Tombstone:
+    def __reduce__(self):
+        return "_DELETED"  # pickles by reference, so identity survives
+
+    def __repr__(self):
+        return "<deleted>"
+
+
+_DELETED = _Tombstone()
+_MISSING = object()
+
+
+class CowDict(MutableMapping):
+    __slots__ = ("_top", "_layers", "_absent", "_copy", "_copies", "_redirects")
+
+    def __init__(self, data=None, copy=None):
+        self._top = dict(data) if data else {}
+        self._layers = ()  # frozen dicts, newest first
+        self._absent = set()  # keys known to be missing from every layer
+        self._copy = copy
+        self._copies = {}  # id(original) -> (original, copy) made on this side
+        self._redirects = ()  # frozen _copies of earlier generations, oldest first
+
+    def get(self, key, default=None):
+        value = self._top.get(key, _MISSING)
+        if value is _MISSING:
+            if not self._layers:
+                return default
+            value = self._lookup(key)
+            if value is _MISSING:
+                return default
+        elif value is _DELETED:
+            return default
+        return value
+
+    def _lookup(self, key):
+        if key in self._absent:
+            return _MISSING
+        for layer in self._layers:
+            value = layer.get(key, _MISSING)
+            if value is not _MISSING:
+                if value is _DELETED:
+                    break
+                if self._copy is not None:
+                    value = self._copy_of(value)
+                self._top[key] = value
+                return value
+        self._absent.add(key)
+        return _MISSING
+
+    def _copy_of(self, value):
+        # One copy per shared object, so aliases stay aliases
+        for redirects in self._redirects:
+            entry = redirects.get(id(value))
+            if entry is not None:
+                value = entry[1]
+        entry = self._copies.get(id(value))
+        if entry is None:
+            copied = self._copy(value)
+            if copied is value:  # immutable
+                return value
+            entry = self._copies[id(value)] = (value, copied)  # keeps the id alive
+        return entry[1]
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._top[key] = value
+
+    def __delitem__(self, key):
+        if self.get(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+        if self._layers:
+            self._top[key] = _DELETED
+        else:
+            del self._top[key]
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def _merged(self):
+        merged = {}
+        for layer in reversed(self._layers):
+            merged.update(layer)
+        merged.update(self._top)
+        return merged
+
+    def __iter__(self):
+        if not self._layers:
+            return iter(self._top)
+        return (key for key, value in self._merged().items() if value is not _DELETED)
+
+    def __len__(self):
+        if not self._layers:
+            return len(self._top)
+        return sum(1 for value in self._merged().values() if value is not _DELETED)
+
+    def clear(self):
+        self._top = {}
+        self._layers = ()
+        self._absent = set()
+        self._copies = {}
+        self._redirects = ()
+
+    def fork(self):
+        # Both this mapping and the fork see the current contents; later
+        # writes on either side stay private to it
+        if self._top:
+            layers = (self._top,) + self._layers
+            if len(layers) > MAX_LAYERS:
+                layers = ({k: v for k, v in self._merged().items() if v is not _DELETED},)
+            self._layers = layers
+            self._top = {}
+            self._absent = set()
+        if self._copies:
+            redirects = self._redirects + (self._copies,)
+            if len(redirects) > MAX_LAYERS:
+                redirects = (_compose(redirects),)
+            self._redirects = redirects
+            self._copies = {}
+        child = CowDict(copy=self._copy)
+        child._layers = self._layers
+        child._redirects = self._redirects
+        return child
+
+    def __repr__(self):
+        return f"CowDict({dict(self.items())!r})"
+
+
+def _compose(redirects):
+    # One redirect layer equivalent to following the given ones in order
+    merged = {}
+    for layer in redirects:
+        for key, (original, target) in merged.items():
+            entry = layer.get(id(target))
+            if entry is not None:
+                merged[key] = (original, entry[1])
+        for key, entry in layer.items():
+            merged.setdefault(key, entry)
+    return merged
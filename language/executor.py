@@ -1,4 +1,19 @@
-﻿class ReturnException(Exception):
+﻿import sys
+
+from language.budget import Budget, BudgetExceeded
+from language.config import load_config
+from language.cow import CowDict
+from language.memo import MemoCache, memo_key
+from language.output import CaptureSink, make_sink
+from language.numeric import BUILTINS, PURE_BUILTINS, CONSTANTS, make_list, index_value, slice_value, set_index, snapshot
+from language.resolve import (Literal, VarRef, BinOp, UnaryOp, Call, ListExpr, Index, Slice,
+                              OPERATORS, UNARY_OPERATORS, resolve_expr, expr_reads)
+from language.self_core import SelfModel
+from language.typecheck import TypeEngine
+
+ENGINES = ("tree", "compiled")
+
+class ReturnException(Exception):
     def __init__(self, value):
         self.value = value
 
@@ -8,34 +23,210 @@ class BreakException(Exception):
 class ExecutorError(Exception):
     pass
 
+class LimitError(ExecutorError):
+    # A configured call limit was hit; unwinds to the top-level statement
+    pass
+
+# Signals returned by compiled statements instead of raising exceptions
+class Return:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+class TailCall:
+    # 'return f(args)': the caller's _invoke loop makes the call in its place
+    __slots__ = ("name", "args", "arg_fns", "arg_reads")
+
+    def __init__(self, name, args, arg_fns, arg_reads):
+        self.name = name
+        self.args = args
+        self.arg_fns = arg_fns
+        self.arg_reads = arg_reads
+
+BREAK = BreakException  # the class itself doubles as the break signal
+
+CLOSED, PURE = 0, 1  # properties from Compiler.analyze
+
+# Python frames one ELAN call may use, to size the interpreter's recursion limit
+_PY_FRAMES_PER_CALL = 40
+
+def _ensure_recursion_limit(max_call_depth):
+    needed = max_call_depth * _PY_FRAMES_PER_CALL + 1000
+    if sys.getrecursionlimit() < needed:
+        sys.setrecursionlimit(needed)
+
 class Executor:
-    def __init__(self, memory):
+    def __init__(self, memory, engine="tree", output=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
         self.memory = memory
+        self.engine = engine
         self.call_depth = 0
+        settings = load_config().get("settings", {})
+        self.max_call_depth = settings.get("max_call_depth", 64)
+        self.max_recursion = settings.get("max_recursion", 500)  # live frames of one function
+        self._active = {}  # function name -> live frames
+        self._facts = {}  # (CLOSED or PURE, function name) -> bool
+        self._facts_version = None
+        self.memo = MemoCache(settings.get("memo_capacity", 4096)) if settings.get("memoize") else None
+        _ensure_recursion_limit(self.max_call_depth)
+        self.budget = Budget(settings)  # safe_mode run limits
+        self._fuel = self.budget.start()  # statements left before the next limit check
         self.self_model = SelfModel()
         self.type_engine = TypeEngine()
 
-        self.programs = {}
+        self.programs = CowDict()
         self.collecting = None
         self.collected_lines = []
 
-        self.expectations = {}
+        self.expectations = CowDict()
         self.last_label = None
-        self.outputs = {}
+        self.outputs = CowDict()
+        self.scoring = settings.get("scoring", {})  # tolerances for score()
+
+        self.profiler = None
+        self.output = output if output is not None else make_sink(settings.get("output"))
+
+        self._compiler = None
+        self._compiled_macros = {}  # (name, typed) -> (macro dict, compiled body, frame layout, signature)
+        self._compiled_programs = {}  # label -> (stored lines, compiled block)
+
+    def compile(self, nodes):
+        # Pre-bind a list of nodes into one callable that can be run repeatedly
+        return self._get_compiler().compile_program(nodes)
+
+    def _get_compiler(self):
+        if self._compiler is None:
+            from language.compiler import Compiler
+            self._compiler = Compiler(self)
+        return self._compiler
+
+    def enable_profiling(self, profiler=None):
+        # Statements are profiled through an instance-level execute and, for
+        # the compiled engine, wrappers added at compile time
+        from language.profiler import Profiler
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.execute = self._profiled_execute
+        self._compiled_macros = {}
+        self._compiled_programs = {}
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = None
+        self.__dict__.pop("execute", None)
+        self._compiled_macros = {}
+        self._compiled_programs = {}
+
+    def _profiled_execute(self, node):
+        profiler = self.profiler
+        profiler.enter_line(getattr(node, "line", 0))
+        try:
+            return Executor.execute(self, node)
+        finally:
+            profiler.leave()
+
+    def emit(self, text, kind="say"):
+        self.output.emit(str(text), kind)
+
+    def set_output(self, sink):
+        self.output.flush()
+        self.output = sink
+
+    def flush(self):
+        self.output.flush()
+
+    def fork(self, output=None, engine=None):
+        # O(1) copy-on-write branch of memory, programs, self-model and types.
+        # The branch writes to its own sink (a CaptureSink by default) and
+        # shares nothing mutable with this executor.
+        if self.call_depth:
+            raise ExecutorError("Cannot fork while a function call is running")
+        branch = Executor(self.memory.fork(), engine or self.engine,
+                          output if output is not None else CaptureSink())
+        branch.self_model = self.self_model.fork()
+        branch.type_engine = self.type_engine.fork()
+        branch.programs = self.programs.fork()
+        branch.expectations = self.expectations.fork()
+        branch.outputs = self.outputs.fork()
+        branch.collecting = self.collecting
+        branch.collected_lines = list(self.collected_lines)
+        branch.last_label = self.last_label
+        return branch
+
+    def snapshot(self, path):
+        # Save memory, macros, self-model, types and programs for a warm start
+        from language.snapshot import capture, write_snapshot
+        return write_snapshot(path, capture(self))
+
+    def restore(self, path, sections=None):
+        # Load a snapshot written by snapshot(); sections limits what is read
+        from language.snapshot import apply, read_snapshot
+        apply(self, read_snapshot(path, sections))
+        # Everything derived from the old macros is stale
+        self._compiler = None
+        self._compiled_macros = {}
+        self._compiled_programs = {}
+        self._facts = {}
+        self._facts_version = None
+        if self.memo is not None:
+            self.memo.clear()
+
+    def reset_budget(self):
+        # A fresh instruction budget and deadline, as every run() starts with;
+        # for callers running compiled bodies directly
+        self._fuel = self.budget.start()
+
+    def run(self, nodes):
+        # Each run gets a fresh instruction budget and deadline
+        self.reset_budget()
+        try:
+            if self.engine == "compiled":
+                if self.compile(nodes)() is BREAK:
+                    raise BreakException()  # as the tree-walker does outside a loop
+            else:
+                for node in nodes:
+                    self.execute(node)
+        except BudgetExceeded as e:
+            self.emit(f"[ERROR] {e}", "error")
+        finally:
+            self.output.flush()
+
+    def score(self, rtol=None, atol=None):
+        # Check every expectation against the labelled outputs in one pass
+        from language.scoring import score
+        rtol = self.scoring.get("rtol", 1e-9) if rtol is None else rtol
+        atol = self.scoring.get("atol", 1e-12) if atol is None else atol
+        return score(self.expectations, self.outputs, rtol, atol)
+
+    def start_task(self, nodes):
+        # Run nodes in slices of instructions (see language/budget.py)
+        from language.budget import Task
+        return Task(self, nodes)
+
+    def _refuel(self):
+        self._fuel = self.budget.refuel()
 
     def execute(self, node):
         if not node:
             return None
 
+        self._fuel -= 1
+        if self._fuel < 0:
+            self._refuel()
         cmd = node[0]
 
         try:
             # Control flow with blocks and exceptions
             if cmd == "return":
                 if self.call_depth == 0:
-                    print("[WARN] 'return' outside function ignored")
+                    self.emit("[WARN] 'return' outside function ignored", "warn")
                     return None
-                val = self._eval_value(node[1])
+                token = node[1]
+                if type(token) is Call and self.memory.get_macro(token.name) is not None:
+                    # Tail call: made by the enclosing _invoke_macro loop
+                    raise ReturnException(TailCall(token.name, token.args, None, None))
+                val = self._eval_value(token)
                 raise ReturnException(val)
 
             elif cmd == "break":
@@ -55,13 +246,13 @@ class Executor:
             elif cmd == "while":
                 cond_expr = node[1]
                 body_expr = node[2]
-                max_iterations = 10000
+                max_iterations = self.budget.loop_iterations
                 count = 0
 
                 while self._eval_value(cond_expr):
                     count += 1
-                    if count > max_iterations:
-                        print("[WARN] Loop iteration limit reached")
+                    if max_iterations is not None and count > max_iterations:
+                        self.emit("[WARN] Loop iteration limit reached", "warn")
                         break
                     try:
                         for stmt in body_expr if isinstance(body_expr, list) and isinstance(body_expr[0], list) else [body_expr]:
@@ -79,9 +270,9 @@ class Executor:
             # I/O and variable commands (say, remember, recall)
             elif cmd == "say":
                 val = self._eval_value(node[1])
-                print(val)
+                self.emit(val)
                 if self.last_label:
-                    self.outputs[self.last_label] = val
+                    self.outputs[self.last_label] = snapshot(val)
                     self.last_label = None
 
             elif cmd == "remember":
@@ -90,9 +281,16 @@ class Executor:
                 self.memory.define(key, evaluated)
                 self.type_engine.infer_type(key, evaluated)
 
+            elif cmd == "remember_index":
+                _, key, index, val = node
+                target = self.memory.recall(key)
+                if target is None:
+                    raise ExecutorError(f"Cannot assign to element of undefined '{key}'")
+                set_index(target, self._eval_value(index), self._eval_value(val))
+
             elif cmd == "recall":
                 val = self.memory.recall(node[1])
-                print(val)
+                self.emit(val, "recall")
 
             elif cmd == "label_output":
                 self.last_label = node[1]
@@ -100,35 +298,36 @@ class Executor:
             elif cmd == "expect":
                 label = node[1]
                 val = self._eval_value(node[2])
-                self.expectations[label] = val
+                self.expectations[label] = snapshot(val)
 
             elif cmd == "score_thoughts":
-                print("=== Thought Evaluation ===")
-                for label, expected in self.expectations.items():
-                    actual = self.outputs.get(label)
-                    if actual == expected:
-                        print(f"{label}: expected {expected} → OK")
+                # One line per expectation, as before; score() decides pass
+                # or fail with the tolerances from settings.scoring
+                self.emit("=== Thought Evaluation ===", "score")
+                for row in self.score().rows():
+                    if row["status"] == "pass":
+                        self.emit(f"{row['label']}: expected {row['expected']} → OK", "score")
                     else:
-                        print(f"{label}: expected {expected} → FAIL (got {actual})")
+                        self.emit(f"{row['label']}: expected {row['expected']} → FAIL (got {row['actual']})", "score")
 
             # Reflection and other commands (stub or as before)
             elif cmd == "reflect_memory":
                 all_vars = self.memory.all()
                 for k, v in all_vars.items():
-                    print(f"{k} = {v}")
+                    self.emit(f"{k} = {v}", "reflect")
 
             elif cmd == "reflect_macro":
                 name = node[1]
                 macro = self.memory.get_macro(name)
                 if macro:
-                    print(f"{name}({', '.join(macro.get('params', []))}):")
+                    self.emit(f"{name}({', '.join(macro.get('params', []))}):", "reflect")
                     for step in macro.get("body", []):
-                        print("  " + str(step))
+                        self.emit("  " + str(step), "reflect")
 
             elif cmd == "reflect_all":
-                print("== Memory ==")
+                self.emit("== Memory ==", "reflect")
                 self.execute(["reflect_memory"])
-                print("== Macros ==")
+                self.emit("== Macros ==", "reflect")
                 for name in self.memory.macros:
                     self.execute(["reflect_macro", name])
 
@@ -140,10 +339,10 @@ class Executor:
                 self.self_model.add_belief(node[1])
             elif cmd == "describe_self":
                 for line in self.self_model.describe():
-                    print(line)
+                    self.emit(line, "self")
             elif cmd == "ask_self":
                 for line in self.self_model.ask_self(node[1]):
-                    print(line)
+                    self.emit(line, "self")
             elif cmd == "intent":
                 self.self_model.add_intent(node[1])
             elif cmd == "goal":
@@ -154,6 +353,10 @@ class Executor:
                 self.self_model.add_evaluation(node[1])
             elif cmd == "adjust":
                 self.self_model.add_adjustment(node[1])
+            elif cmd == "trace":
+                self.self_model.start_trace(node[1])
+            elif cmd == "trace_step":
+                self.self_model.add_trace_step(node[1], node[2])
 
             elif cmd == "remember_program":
                 self.collecting = node[1]
@@ -183,12 +386,12 @@ class Executor:
             # Fix/suggestion system (experimental)
             elif cmd == "rewrite_macro":
                 name = node[1]
-                print(f"Rewriting macro: {name}")
+                self.emit(f"Rewriting macro: {name}", "info")
                 self.memory.define_macro(name, {"params": [], "body": []})
 
             elif cmd == "suggest_fix":
                 macro = node[1]
-                print(f"Suggesting fix for macro '{macro}': (stub)")
+                self.emit(f"Suggesting fix for macro '{macro}': (stub)", "info")
 
             elif cmd == "remember_fix":
                 label = node[1]
@@ -199,16 +402,16 @@ class Executor:
                 label = node[1]
                 suggestion = self.memory.recall("fix_" + label)
                 if suggestion:
-                    print("Applying fix: " + suggestion)
+                    self.emit("Applying fix: " + suggestion, "info")
                 else:
-                    print("No fix found for " + label)
+                    self.emit("No fix found for " + label, "info")
 
             else:
                 raise ExecutorError(f"Unknown command: {cmd}")
 
         except ReturnException as ret:
             if self.call_depth == 0:
-                print("[WARN] 'return' outside function ignored")
+                self.emit("[WARN] 'return' outside function ignored", "warn")
                 return None
             else:
                 raise ret
@@ -216,13 +419,45 @@ class Executor:
         except BreakException:
             raise  # break handled only inside loops
 
+        except LimitError as e:
+            if self.call_depth > 0:
+                raise
+            self.emit(f"[ERROR] {e}", "error")
+
+        except RecursionError:
+            if self.call_depth > 0:
+                raise LimitError(f"Python stack exhausted at call depth {self.call_depth}") from None
+            self.emit("[ERROR] Python stack exhausted", "error")
+
         except ExecutorError as e:
-            print(f"[ERROR] {e}")
+            self.emit(f"[ERROR] {e}", "error")
 
         except Exception as e:
-            print(f"[EXCEPTION] Unexpected error: {e}")
+            self.emit(f"[EXCEPTION] Unexpected error: {e}", "error")
 
     def _eval_value(self, token):
+        # Nodes tagged by the resolution pass skip the literal guessing below
+        kind = type(token)
+        if kind is Literal:
+            return token.value
+        if kind is VarRef:
+            val = self.memory.recall(token.name)
+            return val if val is not None else CONSTANTS.get(token.name, token.name)
+        if kind is BinOp:
+            return OPERATORS[token.op](self._eval_value(token.left), self._eval_value(token.right))
+        if kind is Call:
+            return self._call_function(token.name, token.args)
+        if kind is Index:
+            return index_value(self._eval_value(token.base), self._eval_value(token.index))
+        if kind is ListExpr:
+            return make_list([self._eval_value(item) for item in token.items])
+        if kind is UnaryOp:
+            return UNARY_OPERATORS[token.op](self._eval_value(token.operand))
+        if kind is Slice:
+            start = None if token.start is None else self._eval_value(token.start)
+            stop = None if token.stop is None else self._eval_value(token.stop)
+            return slice_value(self._eval_value(token.base), start, stop)
+
         # Evaluate numeric literals, expressions, strings, or recall variables
         if isinstance(token, list):
             op = token[0]
@@ -234,7 +469,12 @@ class Executor:
                 return self._eval_value(token[1]) * self._eval_value(token[2])
             elif op == '/':
                 return self._eval_value(token[1]) / self._eval_value(token[2])
+            resolved = resolve_expr(token)
+            if resolved is not token:
+                return self._eval_value(resolved)
 
+        if isinstance(token, float) and not token.is_integer():
+            return token
         try:
             return int(token)
         except:
@@ -248,33 +488,220 @@ class Executor:
         if val is not None:
             return val
         else:
-            return token
+            return CONSTANTS.get(token, token) if isinstance(token, str) else token
 
     def _call_function(self, name, args):
+        return self._invoke(name, args)
+
+    def _invoke(self, name, args, arg_fns=None, arg_reads=None):
         macro = self.memory.get_macro(name)
         if macro is None:
-            print(f"[ERROR] Function '{name}' not defined.")
-            return None
-
-        params = macro.get("params", [])
-        body = macro.get("body", [])
-
-        if len(args) != len(params):
-            print(f"[ERROR] Function '{name}' expected {len(params)} args, got {len(args)}.")
+            builtin = BUILTINS.get(name)
+            if builtin is not None:
+                if arg_fns is not None:
+                    return builtin(*[a() for a in arg_fns])
+                return builtin(*[self._eval_value(a) for a in args])
+            self.emit(f"[ERROR] Function '{name}' not defined.", "error")
             return None
 
-        self.memory.push_frame()
-        for p, a in zip(params, args):
-            self.memory.define(p, self._eval_value(a))
+        if self.memo is not None and self._is_pure(name):
+            return self._invoke_memo(name, macro, args, arg_fns, arg_reads)
+        return self._invoke_macro(name, macro, args, arg_fns, arg_reads)
 
-        self.call_depth += 1
-        ret_val = None
+    def _invoke_memo(self, name, macro, args, arg_fns, arg_reads):
+        params = macro.get("params", [])
+        if arg_fns is None:
+            arg_reads = tuple(expr_reads(resolve_expr(a)) for a in args)
+        if len(args) != len(params) or not _args_independent(params, arg_reads):
+            return self._invoke_macro(name, macro, args, arg_fns, arg_reads)
+        if arg_fns is not None:
+            values = [a() for a in arg_fns]
+        else:
+            values = [self._eval_value(a) for a in args]
+
+        memo = self.memo
+        if memo.version != self.memory.macro_version:
+            memo.clear()  # a function was (re)defined or rewritten
+            memo.version = self.memory.macro_version
+        key = memo_key(name, values)
+        if key is not None:
+            result = memo.get(key, _MISS)
+            if result is not _MISS:
+                return snapshot(result)
+        result = self._invoke_macro(name, macro, args, arg_fns, arg_reads, values)
+        if key is not None and not isinstance(result, list):
+            # The cache keeps its own share: the result may be a live Vector
+            # of the caller's (an argument returned as is), and callers must
+            # not mutate the cached value either
+            result = snapshot(result)
+            memo.put(key, result)
+            return snapshot(result)
+        return result
+
+    def _invoke_macro(self, name, macro, args, arg_fns, arg_reads, values=None):
+        # Trampoline: a body ending in 'return f(...)' hands back a TailCall
+        # and the call is made here instead of one Python level deeper. The
+        # caller's frame is dropped when nothing can read it any more.
+        memory = self.memory
+        stack = memory.stack
+        compiled = self.engine == "compiled"
+        signatures = self.type_engine.signatures
+        profiler = self.profiler
+        profiled = False
+        frames = 0
+        entered = []
         try:
-            for stmt in body:
-                self.execute(stmt)
-        except ReturnException as ret:
-            ret_val = ret.value
+            while True:
+                params = macro.get("params", [])
+                body = macro.get("body", [])
+                if len(args) != len(params):
+                    self.emit(f"[ERROR] Function '{name}' expected {len(params)} args, got {len(args)}.", "error")
+                    return None
+
+                if compiled:
+                    run_body, layout = self._compiled_body(name, macro, params, body)
+                else:
+                    run_body, layout = None, None
+                if values is not None or (arg_fns is not None and _args_independent(params, arg_reads)):
+                    # No argument can observe the params bound before it, so the
+                    # caller's compiled (slot-reading) closures can run first
+                    if values is None:
+                        values = [a() for a in arg_fns]
+                    frame = memory.push_frame(layout)
+                    frames += 1
+                    for p, v in zip(params, values):
+                        frame[p] = v
+                    values = None
+                else:
+                    memory.push_frame(layout)
+                    frames += 1
+                    for p, a in zip(params, args):
+                        memory.define(p, self._eval_value(a))
+                if entered and self._frame_closed(name):
+                    del stack[-2]  # the tail-calling frame
+                    frames -= 1
+                    self._leave(entered.pop())
+                if name in signatures:
+                    frame = stack[-1]
+                    typed = self.type_engine.check_signature(name, params, [frame.get(p) for p in params])
+                    if typed and run_body is not None:
+                        run_body = self._compiled_body(name, macro, params, body, typed=True)[0]
+                self._check_limits(name)
+                self._enter(name)
+                entered.append(name)
+                if profiler is not None:
+                    if profiled:
+                        profiler.leave()  # the tail-calling function
+                    profiler.enter_function(name)
+                    profiled = True
+
+                if run_body is not None:
+                    signal = run_body()
+                    if signal is BREAK:
+                        raise BreakException()
+                else:
+                    signal = None
+                    try:
+                        for stmt in body:
+                            self.execute(stmt)
+                    except ReturnException as ret:
+                        signal = ret.value if type(ret.value) is TailCall else Return(ret.value)
+
+                if type(signal) is TailCall:
+                    name, args, arg_fns, arg_reads = signal.name, signal.args, signal.arg_fns, signal.arg_reads
+                    macro = memory.get_macro(name)
+                    if macro is None:
+                        return self._invoke(name, args, arg_fns, arg_reads)
+                    continue
+                return signal.value if signal is not None else None
         finally:
-            self.call_depth -= 1
-            self.memory.pop_frame()
-        return ret_val
+            if profiled:
+                profiler.leave()
+            for n in entered:
+                self._leave(n)
+            for _ in range(frames):
+                memory.pop_frame()
+
+    def _check_limits(self, name):
+        if self.call_depth >= self.max_call_depth:
+            raise LimitError(f"Maximum call depth {self.max_call_depth} exceeded calling '{name}'")
+        if self._active.get(name, 0) >= self.max_recursion:
+            raise LimitError(f"Maximum recursion depth {self.max_recursion} exceeded in '{name}'")
+
+    def _enter(self, name):
+        self.call_depth += 1
+        self._active[name] = self._active.get(name, 0) + 1
+
+    def _leave(self, name):
+        self.call_depth -= 1
+        self._active[name] -= 1
+
+    def _frame_closed(self, name):
+        # True when the function, and everything it calls, reads only names
+        # bound in its own frame, so the frames below it are unobservable
+        return self._holds(CLOSED, name)
+
+    def _is_pure(self, name):
+        # Closed and free of outside effects, transitively: safe to memoize
+        return self._holds(PURE, name)
+
+    def _holds(self, prop, name, seen=None):
+        if self._facts_version != self.memory.macro_version:
+            self._facts = {}
+            self._facts_version = self.memory.macro_version
+        cached = self._facts.get((prop, name))
+        if cached is not None:
+            return cached
+        macro = self.memory.get_macro(name)
+        if macro is None:
+            # Builtins touch no frames; only some are free of effects
+            return prop == CLOSED or name in PURE_BUILTINS
+        root = seen is None
+        seen = set() if root else seen
+        if name in seen:
+            return True  # assumed for cycles; only the root result is cached
+        seen.add(name)
+        analysis = self._get_compiler().analyze(macro.get("params", []), macro.get("body", []))
+        result = analysis[prop] and all(self._holds(prop, callee, seen) for callee in analysis[2])
+        if root or not result:
+            self._facts[(prop, name)] = result
+        return result
+
+    def _compiled_body(self, name, macro, params, body, typed=False):
+        # typed: specialized to the declared signature, which the caller checked
+        param_types = tuple(self.type_engine.signatures.get(name, ())) if typed else None
+        cached = self._compiled_macros.get((name, typed))
+        if cached is not None and cached[0] is macro and cached[3] == param_types:
+            return cached[1], cached[2]
+        types = None
+        if param_types:
+            types = {p: t for p, t in zip(params, param_types) if t not in (None, "unknown")}
+        run_body, layout = self._get_compiler().compile_function(params, body, types)
+        self._compiled_macros[(name, typed)] = (macro, run_body, layout, param_types)
+        return run_body, layout
+
+    def _compiled_program(self, label):
+        # Stored programs compile once; end_program stores a new list, so a
+        # re-recorded program is recompiled on its next run. Programs run in
+        # the caller's frame, so they are compiled without slots.
+        lines = self.programs.get(label)
+        if lines is None:
+            return None
+        cached = self._compiled_programs.get(label)
+        if cached is not None and cached[0] is lines:
+            return cached[1]
+        run = self._get_compiler().compile_program(lines)
+        self._compiled_programs[label] = (lines, run)
+        return run
+
+
+_MISS = object()
+
+def _args_independent(params, arg_reads):
+    # Arguments are bound one by one inside the new frame, so argument j sees
+    # params[:j]; pre-evaluating is only safe when it cannot read any of them
+    for j in range(1, len(arg_reads)):
+        reads = arg_reads[j]
+        if reads is None or not reads.isdisjoint(params[:j]):
+            return False
+    return True
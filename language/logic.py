@@ -1,29 +1,108 @@
 # --- language/logic.py ---
 # InferenceEngine with explain, forall, exists...
+# Rules are written "premise -> conclusion" (several premises joined with
+# " & ") and parsed once. Beliefs live in an insertion-ordered dict, rules
+# are indexed by premise, and every rule keeps a count of premises not yet
+# believed, so adding a belief or rule only touches the rules that mention
+# it (incremental forward chaining). A string without " -> " is kept in
+# rules, as it always was, but never fires.
+
+from collections import deque
+
+ASSERTED = None  # justification of a belief added directly
+
+
+class Rule:
+    __slots__ = ("premises", "conclusion", "source", "missing")
+
+    def __init__(self, premises, conclusion, source):
+        self.premises = premises
+        self.conclusion = conclusion
+        self.source = source
+        self.missing = len(premises)
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+def parse_rule(rule):
+    premise, sep, conclusion = rule.partition(" -> ")
+    if not sep:
+        raise ValueError(f"Rule must have the form 'premise -> conclusion': {rule!r}")
+    premises = tuple(dict.fromkeys(p.strip() for p in premise.split(" & ")))
+    return Rule(premises, conclusion.strip(), rule)
+
 
 class InferenceEngine:
     def __init__(self):
-        self.beliefs = []
+        self.beliefs = {}  # proposition -> Rule that derived it, or ASSERTED
         self.rules = []
+        self.by_premise = {}
 
     def add_belief(self, proposition):
-        self.beliefs.append(proposition)
+        if proposition in self.beliefs:
+            self.beliefs[proposition] = ASSERTED
+            return
+        self.beliefs[proposition] = ASSERTED
+        self._propagate([proposition])
 
     def add_rule(self, rule):
+        if isinstance(rule, str):
+            try:
+                rule = parse_rule(rule)
+            except ValueError:
+                self.rules.append(rule)  # malformed: stored, never applied
+                return
         self.rules.append(rule)
+        for premise in rule.premises:
+            self.by_premise.setdefault(premise, []).append(rule)
+        rule.missing = sum(1 for p in rule.premises if p not in self.beliefs)
+        if rule.missing == 0 and rule.conclusion not in self.beliefs:
+            self.beliefs[rule.conclusion] = rule
+            self._propagate([rule.conclusion])
+
+    def _propagate(self, new_facts):
+        # Each belief enters once, so each (rule, premise) pair is counted once
+        queue = deque(new_facts)
+        beliefs = self.beliefs
+        while queue:
+            fact = queue.popleft()
+            for rule in self.by_premise.get(fact, ()):
+                rule.missing -= 1
+                if rule.missing == 0 and rule.conclusion not in beliefs:
+                    beliefs[rule.conclusion] = rule
+                    queue.append(rule.conclusion)
+
+    def derived(self):
+        return [p for p, why in self.beliefs.items() if why is not ASSERTED]
 
     def explain(self, query):
-        if query in self.beliefs:
+        if query not in self.beliefs:
+            return f"No explanation found for '{query}'."
+        if self.beliefs[query] is ASSERTED:
             return f"Belief '{query}' is directly asserted."
-        for rule in self.rules:
-            if rule.endswith(" -> " + query):
-                premise = rule.split(" -> ")[0]
-                if premise in self.beliefs:
-                    return f"'{query}' is inferred from '{premise}' via rule."
-        return f"No explanation found for '{query}'."
+
+        # Walk the justifications breadth-first, explaining each step once
+        steps = []
+        seen = {query}
+        queue = deque([query])
+        while queue:
+            fact = queue.popleft()
+            rule = self.beliefs[fact]
+            if rule is ASSERTED:
+                continue
+            premises = "' and '".join(rule.premises)
+            steps.append(f"'{fact}' is inferred from '{premises}' via rule.")
+            for premise in rule.premises:
+                if premise not in seen:
+                    seen.add(premise)
+                    queue.append(premise)
+        return " ".join(steps)
 
     def forall(self, condition_fn):
         return all(condition_fn(b) for b in self.beliefs)
 
     def exists(self, condition_fn):
+        if isinstance(condition_fn, str):
+            return condition_fn in self.beliefs  # hashed lookup
         return any(condition_fn(b) for b in self.beliefs)
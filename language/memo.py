@@ -0,0 +1,61 @@
+# --- language/memo.py ---
+# LRU table of results for pure ELAN functions, keyed on the function name
+# and hashable forms of its argument values.
+
+from collections import OrderedDict
+
+from language.numeric import Vector
+
+
+def memo_key(name, values):
+    # None when an argument has no stable hashable form (e.g. a plain list)
+    parts = [name]
+    for value in values:
+        if isinstance(value, Vector):
+            data = value.data
+            if hasattr(data, "tobytes"):
+                parts.append((Vector, str(data.dtype), data.tobytes()))
+            else:
+                parts.append((Vector, tuple(data)))
+            continue
+        try:
+            hash(value)
+        except TypeError:
+            return None
+        parts.append((type(value), value))  # keeps 1 and 1.0 apart
+    return tuple(parts)
+
+
+class MemoCache:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.version = None  # Memory.macro_version the entries belong to
+
+    def get(self, key, default=None):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self.entries), "capacity": self.capacity}
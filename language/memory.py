@@ -1,12 +1,97 @@
+from language.cow import CowDict
+from language.numeric import Vector
+
+_UNSET = object()
+
+
+def _branch_copy(value):
+    # Mutable globals are copied when a fork first reads them, so in-place
+    # updates (remember_index) stay private to that fork
+    if isinstance(value, Vector):
+        return value.share()
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+class FrameLayout:
+    # Names of a function's locals, resolved once per function body to slot indices
+    __slots__ = ("names", "index")
+
+    def __init__(self, names):
+        self.names = tuple(dict.fromkeys(names))
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+
+class Frame:
+    # List-backed call frame; names outside the layout go to a lazily created dict
+    __slots__ = ("layout", "values", "extra")
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.values = [_UNSET] * len(layout.names)
+        self.extra = None
+
+    def get(self, key, default=None):
+        slot = self.layout.index.get(key)
+        if slot is not None:
+            value = self.values[slot]
+            return default if value is _UNSET else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        slot = self.layout.index.get(key)
+        if slot is not None:
+            self.values[slot] = value
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key, _UNSET) is not _UNSET
+
+    def keys(self):
+        names = [n for n, v in zip(self.layout.names, self.values) if v is not _UNSET]
+        if self.extra:
+            names.extend(self.extra)
+        return names
+
+
 class Memory:
     def __init__(self):
-        self.global_vars = {}
+        self.global_vars = CowDict(copy=_branch_copy)
         self.stack = []
-        self.macros = {}
-        self.tags = {}
+        self.macros = CowDict()
+        self.tags = CowDict()
+        self.macro_version = 0  # bumped whenever a macro is (re)defined
 
-    def push_frame(self):
-        self.stack.append({})
+    def fork(self):
+        # O(1) copy-on-write branch of globals, macros and tags
+        if self.stack:
+            raise RuntimeError("Cannot fork memory while a function call is running")
+        child = Memory.__new__(Memory)
+        child.global_vars = self.global_vars.fork()
+        child.stack = []
+        child.macros = self.macros.fork()
+        child.tags = self.tags.fork()
+        child.macro_version = self.macro_version
+        return child
+
+    def push_frame(self, layout=None):
+        frame = {} if layout is None else Frame(layout)
+        self.stack.append(frame)
+        return frame
 
     def pop_frame(self):
         if not self.stack:
@@ -24,12 +109,21 @@ class Memory:
 
     def recall(self, key):
         for frame in reversed(self.stack):
-            if key in frame:
-                return frame[key]
+            value = frame.get(key, _UNSET)
+            if value is not _UNSET:
+                return value
         return self.global_vars.get(key, None)
 
+    def recall_slot(self, slot, key):
+        # Indexed read from the current Frame; unbound slots fall back to recall
+        value = self.stack[-1].values[slot]
+        if value is _UNSET:
+            return self.recall(key)
+        return value
+
     def define_macro(self, name, macro_dict):
         self.macros[name] = macro_dict
+        self.macro_version += 1
 
     def get_macro(self, name):
         return self.macros.get(name, None)
@@ -45,3 +139,4 @@ class Memory:
         self.stack.clear()
         self.macros.clear()
         self.tags.clear()
+        self.macro_version += 1
@@ -0,0 +1,338 @@
+# --- language/numeric.py ---
+# Numeric values for the executor: Vector stores numbers contiguously in a
+# NumPy array (int64, float64 or complex128) so element-wise arithmetic,
+# vector_add, scalar_mul, dot and reductions are single vectorized calls.
+# Without NumPy the same type falls back to plain Python lists. NumPy is
+# imported when the first Vector is made, so programs without vectors (and
+# interpreter start-up) never pay for it.
+
+import cmath
+import math
+import operator
+
+np = None  # the numpy module once load_numpy() has run and found it
+_loaded = False
+
+
+def load_numpy():
+    global np, _loaded
+    if not _loaded:
+        try:
+            import numpy
+        except ImportError:  # pure-Python fallback
+            numpy = None
+        np = numpy
+        _loaded = True
+    return np
+
+NUMBER_TYPES = (int, float, complex)
+
+CONSTANTS = {
+    "pi": math.pi,
+}
+
+
+def _scalar(value):
+    # NumPy scalars back to plain Python numbers
+    return value.item() if hasattr(value, "item") else value
+
+
+def _is_number(value):
+    return isinstance(value, NUMBER_TYPES) and not isinstance(value, bool)
+
+
+class Vector:
+    # A growable array: 'buf' may have spare capacity past the first 'n'
+    # elements, so append is amortized O(1). Slices are views that share the
+    # buffer; both sides are then marked shared and copy before mutating.
+    __slots__ = ("buf", "n", "shared")
+
+    def __init__(self, data):
+        if not _loaded:
+            load_numpy()
+        self.buf = data  # numpy.ndarray, or a list without NumPy
+        self.n = len(data)
+        self.shared = False
+
+    def __setstate__(self, state):
+        # Unpickled Vectors (snapshots, program caches, worker results)
+        # skip __init__, but their buffers need NumPy loaded here too
+        if not _loaded:
+            load_numpy()
+        for name, value in state[1].items():
+            setattr(self, name, value)
+
+    @property
+    def data(self):
+        if np is not None and self.n != len(self.buf):
+            return self.buf[:self.n]
+        return self.buf
+
+    # --- Sequence protocol ---
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            view = Vector(self.data[index])
+            if np is not None:
+                self.shared = view.shared = True
+            return view
+        return _scalar(self.data[index])
+
+    def __setitem__(self, index, value):
+        if not _is_number(value):
+            raise ValueError("vector elements must be numbers")
+        if self.shared:
+            self._unshare()
+        if np is not None:
+            dtype = np.result_type(self.buf.dtype, value)
+            if dtype != self.buf.dtype:
+                self.buf = self.buf.astype(dtype)
+        self.data[index] = value
+
+    def append(self, value):
+        if not _is_number(value):
+            raise ValueError("vector elements must be numbers")
+        if self.shared:
+            self._unshare()
+        if np is None:
+            self.buf.append(value)
+            self.n += 1
+            return
+        dtype = np.result_type(value) if self.n == 0 else np.result_type(self.buf.dtype, value)
+        if self.n == len(self.buf) or dtype != self.buf.dtype:
+            capacity = max(8, 2 * self.n) if self.n == len(self.buf) else len(self.buf)
+            grown = np.empty(capacity, dtype=dtype)
+            grown[:self.n] = self.buf[:self.n]
+            self.buf = grown
+        self.buf[self.n] = value
+        self.n += 1
+
+    def _unshare(self):
+        self.buf = self.data.copy()
+        self.shared = False
+
+    def share(self):
+        # O(1) alias with value semantics: whichever side mutates first copies
+        alias = Vector(self.data)
+        self.shared = alias.shared = True
+        return alias
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __bool__(self):
+        return self.n > 0
+
+    def tolist(self):
+        return self.data.tolist() if np is not None else list(self.data)
+
+    def __str__(self):
+        return str(self.tolist())
+
+    __repr__ = __str__
+
+    def __eq__(self, other):
+        if isinstance(other, Vector):
+            other = other.tolist()
+        if isinstance(other, list):
+            return self.tolist() == other
+        return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    # --- Element-wise arithmetic ---
+
+    def _binary(self, other, op, reflected=False):
+        if isinstance(other, Vector):
+            if len(other) != len(self):
+                raise ValueError(f"vector length mismatch: {len(self)} vs {len(other)}")
+            b = other.data
+        elif _is_number(other):
+            b = other
+        else:
+            return NotImplemented
+        a = self.data
+        if reflected:
+            a, b = b, a
+        if np is not None:
+            return Vector(op(a, b))
+        if isinstance(other, Vector):
+            return Vector([op(x, y) for x, y in zip(a, b)])
+        if reflected:
+            return Vector([op(a, y) for y in b])
+        return Vector([op(x, b) for x in a])
+
+    def __add__(self, other): return self._binary(other, operator.add)
+    def __radd__(self, other): return self._binary(other, operator.add, True)
+    def __sub__(self, other): return self._binary(other, operator.sub)
+    def __rsub__(self, other): return self._binary(other, operator.sub, True)
+    def __mul__(self, other): return self._binary(other, operator.mul)
+    def __rmul__(self, other): return self._binary(other, operator.mul, True)
+    def __truediv__(self, other): return self._binary(other, operator.truediv)
+    def __rtruediv__(self, other): return self._binary(other, operator.truediv, True)
+    def __mod__(self, other): return self._binary(other, operator.mod)
+
+    def __neg__(self):
+        if np is not None:
+            return Vector(-self.data)
+        return Vector([-x for x in self.data])
+
+
+def make_vector(items):
+    if not _loaded:
+        load_numpy()
+    if np is None:
+        return Vector(list(items))
+    data = np.asarray(items) if len(items) else np.empty(0)
+    if data.dtype.kind not in "iufc":
+        raise ValueError("vector elements must be numbers")
+    return Vector(data)
+
+
+def make_list(items):
+    # List literal: a Vector when every element is a number, else a plain list
+    if all(_is_number(item) for item in items):
+        try:
+            return make_vector(items)
+        except (ValueError, OverflowError):
+            pass
+    return list(items)
+
+
+def _as_index(index):
+    if isinstance(index, float) and index.is_integer():
+        return int(index)
+    return index
+
+
+def index_value(base, index):
+    return base[_as_index(index)]
+
+
+def slice_value(base, start, stop):
+    return base[slice(_as_index(start), _as_index(stop))]
+
+
+def set_index(target, index, value):
+    target[_as_index(index)] = value
+
+
+def snapshot(value):
+    # Vectors recorded as outputs must not change when the variable is mutated
+    return value.share() if isinstance(value, Vector) else value
+
+
+def _map(fn, cfn, x):
+    # Apply a math function to a scalar or every element of a Vector
+    if isinstance(x, Vector):
+        if np is not None:
+            return Vector(getattr(np, fn.__name__)(x.data))
+        return Vector([cfn(v) if isinstance(v, complex) else fn(v) for v in x.data])
+    return cfn(x) if isinstance(x, complex) else fn(x)
+
+
+def _as_vector(value):
+    if isinstance(value, Vector):
+        return value
+    if isinstance(value, list):
+        return make_vector(value)
+    raise TypeError(f"expected a vector, got {type(value).__name__}")
+
+
+def vector_add(a, b):
+    return _as_vector(a) + _as_vector(b)
+
+
+def scalar_mul(a, b):
+    if _is_number(a):
+        a, b = b, a
+    if _is_number(a):
+        return a * b
+    return _as_vector(a) * b
+
+
+def append(target, value):
+    # In-place, amortized O(1); returns the target so it can be chained
+    if isinstance(target, Vector):
+        target.append(value)
+    elif isinstance(target, list):
+        target.append(value)
+    else:
+        raise TypeError(f"cannot append to {type(target).__name__}")
+    return target
+
+
+def zeros(n):
+    n = int(n)
+    if not _loaded:
+        load_numpy()
+    if np is not None:
+        return Vector(np.zeros(n))
+    return Vector([0.0] * n)
+
+
+def dot(a, b):
+    a, b = _as_vector(a), _as_vector(b)
+    if len(a) != len(b):
+        raise ValueError(f"vector length mismatch: {len(a)} vs {len(b)}")
+    if np is not None:
+        return _scalar(np.dot(a.data, b.data))
+    return sum(x * y for x, y in zip(a.data, b.data))
+
+
+def vector_sum(v):
+    if isinstance(v, Vector) and np is not None:
+        return _scalar(v.data.sum())
+    return sum(v)
+
+
+def make_complex(real, imag=0):
+    if isinstance(real, Vector) or isinstance(imag, Vector):
+        return real + imag * 1j
+    return complex(real, imag)
+
+
+def real(x):
+    if isinstance(x, Vector):
+        return Vector(x.data.real) if np is not None else Vector([complex(v).real for v in x.data])
+    return x.real
+
+
+def imag(x):
+    if isinstance(x, Vector):
+        return Vector(x.data.imag) if np is not None else Vector([complex(v).imag for v in x.data])
+    return x.imag
+
+
+def _abs(x):
+    if isinstance(x, Vector):
+        return Vector(np.abs(x.data)) if np is not None else Vector([abs(v) for v in x.data])
+    return abs(x)
+
+
+BUILTINS = {
+    "vector_add": vector_add,
+    "scalar_mul": scalar_mul,
+    "dot": dot,
+    "sum": vector_sum,
+    "append": append,
+    "zeros": zeros,
+    "len": len,
+    "complex": make_complex,
+    "real": real,
+    "imag": imag,
+    "abs": _abs,
+    "cos": lambda x: _map(math.cos, cmath.cos, x),
+    "sin": lambda x: _map(math.sin, cmath.sin, x),
+    "exp": lambda x: _map(math.exp, cmath.exp, x),
+    "sqrt": lambda x: _map(math.sqrt, cmath.sqrt, x),
+}
+
+# Builtins without side effects on their arguments (append mutates in place)
+PURE_BUILTINS = frozenset(BUILTINS) - {"append"}
@@ -0,0 +1,173 @@
+# --- language/output.py ---
+# Output sinks for the executor. Everything a program prints (say, recall,
+# reflection, self-model answers, warnings and errors) goes through
+# Executor.emit(text, kind) to one sink:
+#   StdoutSink     buffered console output
+#   CaptureSink    in-memory (kind, text) records
+#   JsonLinesSink  one JSON object per line in a file
+#   NullSink       discard everything (headless runs)
+# Buffered sinks flush by policy: "always" (every line), "size" (once
+# buffer_size characters are pending) or "interval" (once 'interval' seconds
+# have passed). The executor also flushes at the end of every run(), and
+# anything still pending is flushed at interpreter exit.
+
+import atexit
+import inspect
+import json
+import sys
+import time
+import weakref
+
+FLUSH_POLICIES = ("always", "size", "interval")
+
+_pending = weakref.WeakSet()  # buffered sinks with unflushed output
+
+
+@atexit.register
+def _flush_pending():
+    for sink in list(_pending):
+        try:
+            sink.flush()
+        except Exception:
+            pass
+
+
+class OutputSink:
+    def emit(self, text, kind="say"):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class _BufferedSink(OutputSink):
+    def __init__(self, policy="size", buffer_size=65536, interval=0.5):
+        if policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy '{policy}' (expected one of {', '.join(FLUSH_POLICIES)})")
+        self.policy = policy
+        self.buffer_size = buffer_size
+        self.interval = interval
+        self._buffer = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def _format(self, text, kind):
+        return text + "\n"
+
+    def emit(self, text, kind="say"):
+        chunk = self._format(text, kind)
+        self._buffer.append(chunk)
+        self._size += len(chunk)
+        if len(self._buffer) == 1:
+            _pending.add(self)
+        if self.policy == "always":
+            self.flush()
+        elif self.policy == "size":
+            if self._size >= self.buffer_size:
+                self.flush()
+        elif time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._size = 0
+        _pending.discard(self)
+        self._write(data)
+
+    def _write(self, data):
+        raise NotImplementedError
+
+
+class StdoutSink(_BufferedSink):
+    def __init__(self, stream=None, policy="size", buffer_size=65536, interval=0.5):
+        super().__init__(policy, buffer_size, interval)
+        self.stream = stream  # None: whatever sys.stdout is at flush time
+
+    def _write(self, data):
+        stream = self.stream or sys.stdout
+        stream.write(data)
+        stream.flush()
+
+
+class JsonLinesSink(_BufferedSink):
+    def __init__(self, path, policy="size", buffer_size=65536, interval=0.5):
+        super().__init__(policy, buffer_size, interval)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._seq = 0
+
+    def _format(self, text, kind):
+        self._seq += 1
+        return json.dumps({"seq": self._seq, "kind": kind, "text": text}) + "\n"
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class CaptureSink(OutputSink):
+    def __init__(self):
+        self.records = []  # (kind, text)
+
+    def emit(self, text, kind="say"):
+        self.records.append((kind, text))
+
+    def lines(self, kinds=None):
+        return [text for kind, text in self.records if kinds is None or kind in kinds]
+
+    def getvalue(self, kinds=None):
+        return "".join(text + "\n" for text in self.lines(kinds))
+
+    def clear(self):
+        self.records.clear()
+
+
+class NullSink(OutputSink):
+    def emit(self, text, kind="say"):
+        pass
+
+
+SINKS = {
+    "stdout": StdoutSink,
+    "capture": CaptureSink,
+    "jsonl": JsonLinesSink,
+    "null": NullSink,
+}
+
+
+BUFFER_OPTIONS = ("policy", "buffer_size", "interval")
+
+
+def make_sink(spec=None):
+    # spec: settings.output from elan_config.json, e.g.
+    # {"sink": "jsonl", "path": "run.jsonl", "policy": "size", "buffer_size": 65536}
+    # Buffering options are ignored by the sinks that do not buffer, so
+    # switching only "sink" keeps a valid spec
+    spec = dict(spec or {})
+    name = spec.pop("sink", "stdout")
+    if name not in SINKS:
+        raise ValueError(f"Unknown output sink '{name}' (expected one of {', '.join(SINKS)})")
+    cls = SINKS[name]
+    if not issubclass(cls, _BufferedSink):
+        for option in BUFFER_OPTIONS:
+            spec.pop(option, None)
+    params = inspect.signature(cls).parameters
+    unknown = [key for key in spec if key not in params]
+    if unknown:
+        raise ValueError(f"Unknown option(s) {', '.join(unknown)} for output sink '{name}'")
+    missing = [key for key, p in params.items()
+               if p.default is inspect.Parameter.empty and key not in spec]
+    if missing:
+        raise ValueError(f"Output sink '{name}' needs {', '.join(repr(key) for key in missing)}")
+    return cls(**spec)
@@ -1,70 +1,174 @@
+import functools
+import hashlib
+import os
+import re
+
 from lark import Lark, Transformer, v_args
 
-elan_grammar = r"""
-    ...  # Use the full grammar above here as a raw string
-"""
+from language.resolve import Node, resolve_program, resolve_statement
+
+GRAMMAR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "grammar", "elan.lark")
+CACHE_DIR = os.environ.get("ELAN_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "elan"))
+
+_parsers = {}  # positions flag -> Lark instance
+_grammar_version = None
+
+def get_parser(positions=False):
+    # Built on first use; the LALR tables are cached on disk, so later
+    # interpreter starts load them instead of recompiling the grammar.
+    # positions=True records source lines on statements (for the profiler)
+    # at roughly twice the parsing cost, so it is off by default.
+    parser = _parsers.get(positions)
+    if parser is None:
+        cache = True
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            cache = os.path.join(CACHE_DIR, "elan_lalr_pos.cache" if positions else "elan_lalr.cache")
+        except OSError:
+            pass  # fall back to Lark's temp-dir cache
+        parser = Lark.open(GRAMMAR_PATH, parser="lalr", cache=cache, propagate_positions=positions)
+        _parsers[positions] = parser
+    return parser
+
+def grammar_version():
+    global _grammar_version
+    if _grammar_version is None:
+        with open(GRAMMAR_PATH, "rb") as f:
+            _grammar_version = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _grammar_version
 
-parser = Lark(elan_grammar, parser="lalr")
+def statement(handler):
+    # With positions, the statement keeps the line it starts on
+    @v_args(meta=True, inline=True)
+    @functools.wraps(handler)
+    def with_line(self, meta, *children):
+        result = handler(self, *children)
+        if meta.empty:
+            return result
+        result = Node(result)
+        result.line = meta.line
+        return result
+    return with_line
 
 @v_args(inline=True)
 class ElanTransformer(Transformer):
     # Assignments and commands
+    @statement
     def remember(self, name, value): return ['remember', str(name), value]
+    @statement
+    def remember_index(self, target, i, value): return ['remember_index', str(target)[:-1], i, value]
+    @statement
     def label_output(self, name): return ['label_output', str(name)]
+    @statement
     def expect(self, name, value): return ['expect', str(name), value]
+    @statement
     def identity(self, value): return ['identity', value]
+    @statement
     def declare(self, value): return ['declare', value]
+    @statement
     def belief(self, value): return ['belief', value]
+    @statement
     def intent(self, value): return ['intent', value]
+    @statement
     def goal(self, value): return ['goal', value]
+    @statement
     def reason(self, value): return ['reason', value]
+    @statement
     def evaluate(self, value): return ['evaluate', value]
+    @statement
     def adjust(self, value): return ['adjust', value]
+    @statement
     def contradiction(self, value): return ['contradiction', value]
+    @statement
     def trace(self, name): return ['trace', str(name)]
+    @statement
     def trace_step(self, name, value): return ['trace_step', str(name), value]
+    @statement
     def remember_program(self, name): return ['remember_program', str(name)]
+    @statement
     def end_program(self): return ['end_program']
-    def generate_macro(self, name, _from, source): return ['generate_macro', str(name), str(source)]
+    @statement
+    def generate_macro(self, name, source): return ['generate_macro', str(name), str(source)]
+    @statement
     def rewrite_macro(self, name): return ['rewrite_macro', str(name)]
+    @statement
     def remember_fix(self, name): return ['remember_fix', str(name)]
+    @statement
     def apply_fix(self, name): return ['apply_fix', str(name)]
+    @statement
     def run_program(self, name): return ['run_program', str(name)]
 
     # Commands
+    @statement
     def say(self, value): return ['say', value]
+    @statement
     def recall(self, name): return ['recall', str(name)]
+    @statement
     def reflect_memory(self): return ['reflect_memory']
+    @statement
     def reflect_macro(self, name): return ['reflect_macro', str(name)]
+    @statement
     def reflect_all(self): return ['reflect_all']
+    @statement
     def describe_self(self): return ['describe_self']
+    @statement
     def ask_self(self, value): return ['ask_self', value]
+    @statement
     def resolve(self): return ['resolve']
+    @statement
     def analyze_success(self, name): return ['analyze_success', str(name)]
+    @statement
     def score_thoughts(self): return ['score_thoughts']
+    @statement
     def suggest_fix(self, name): return ['suggest_fix', str(name)]
+    @statement
     def break_(self): return ['break']
+    @statement
     def return_(self, value): return ['return', value]
+    @statement
+    def call_stmt(self, name, args=None): return ['function_call', str(name), args or []]
 
     # Blocks
+    @statement
     def if_block(self, cond, then_block, else_block=None):
         if else_block:
             return ['if', cond, then_block, else_block]
         else:
             return ['if', cond, then_block]
 
+    @statement
     def while_block(self, cond, body):
         return ['while', cond, body]
 
+    @statement
     def function_def_block(self, name, params=None, body=None):
-        params_list = [str(p) for p in params.children] if params else []
+        params_list = [str(p) for p in params] if params else []
         return ['function_def', str(name), params_list, body]
 
-    # Expressions (example for simple expr only)
+    def block_body(self, *statements): return list(statements)
+    def start(self, *statements): return list(statements)
+
+    # Expressions
     def add(self, a, b): return ['+', a, b]
     def sub(self, a, b): return ['-', a, b]
     def mul(self, a, b): return ['*', a, b]
     def div(self, a, b): return ['/', a, b]
+    def mod(self, a, b): return ['%', a, b]
+    def eq(self, a, b): return ['==', a, b]
+    def ne(self, a, b): return ['!=', a, b]
+    def lt(self, a, b): return ['<', a, b]
+    def gt(self, a, b): return ['>', a, b]
+    def le(self, a, b): return ['<=', a, b]
+    def ge(self, a, b): return ['>=', a, b]
+    def neg(self, a): return ['neg', a]
+
+    def call(self, name, args=None): return ['function_call', str(name), args or []]
+    def list_literal(self, items=None): return ['list', items or []]
+    def index(self, base, i): return ['index', base, i]
+    def slice(self, base, start=None, stop=None): return ['slice', base, start, stop]
+    def vector_add(self, a, b): return ['function_call', 'vector_add', [a, b]]
+    def scalar_mul(self, a, b): return ['function_call', 'scalar_mul', [a, b]]
+    def dot(self, a, b): return ['function_call', 'dot', [a, b]]
 
     def number(self, n): return float(n)
     def string(self, s): return str(s)[1:-1]  # strip quotes
@@ -73,13 +177,50 @@ class ElanTransformer(Transformer):
     def expr(self, val): return val
     def value(self, val): return val
     def param_list(self, *params): return list(params)
+    def arg_list(self, *args): return list(args)
 
 transformer = ElanTransformer()
 
-def parse_line(line):
+def _parse_error(e, report):
+    # report: callable taking the message (e.g. a sink-backed emit); print by default
+    if report is None:
+        print("Parse error:", e)
+    else:
+        report(f"Parse error: {e}")
+
+def parse_line(line, report=None):
+    # None for a blank or comment-only line (quietly) and for a line that
+    # fails to parse (after reporting the error)
     try:
-        tree = parser.parse(line)
-        return transformer.transform(tree.children[0])
+        tree = get_parser().parse(line)
+        if not tree.children:
+            return None
+        return resolve_statement(transformer.transform(tree.children[0]))
     except Exception as e:
-        print("Parse error:", e)
+        _parse_error(e, report)
+        return None
+
+def parse_source(source, strict=False, positions=False, report=None):
+    # Parse a whole script in one pass, including multi-line blocks.
+    # With strict=True parse errors are raised instead of reported.
+    try:
+        return resolve_program(transformer.transform(get_parser(positions).parse(source)))
+    except Exception as e:
+        if strict:
+            raise
+        _parse_error(e, report)
         return None
+
+def parse_file(path, strict=False, positions=False, report=None):
+    with open(path, encoding="utf-8") as f:
+        return parse_source(f.read(), strict=strict, positions=positions, report=report)
+
+_BLOCK_WORDS = re.compile(r'"(?:\\.|[^"\\])*"|#[^\n]*|\b(end\s+)?(if|while|define)\b')
+
+def block_depth(line):
+    # Net number of if/while/define blocks opened by a line (negative if it closes them)
+    depth = 0
+    for m in _BLOCK_WORDS.finditer(line):
+        if m.group(2):
+            depth += -1 if m.group(1) else 1
+    return depth
@@ -0,0 +1,117 @@
+# --- language/profiler.py ---
+# Profiler for ELAN programs: call counts, inclusive and exclusive wall time
+# and net allocated memory blocks per function and per source line, plus
+# folded stacks for flamegraph tools. The executor only calls into it while
+# profiling is enabled (Executor.enable_profiling), so it costs nothing
+# otherwise.
+
+import sys
+import time
+
+FUNCTION, LINE = 0, 1
+
+_ROOT = ("<main>",)
+
+
+class Stat:
+    __slots__ = ("calls", "inclusive", "exclusive", "allocs")
+
+    def __init__(self):
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        self.allocs = 0
+
+
+class _Entry:
+    __slots__ = ("kind", "key", "path", "start", "child", "blocks")
+
+    def __init__(self, kind, key, path, start, blocks):
+        self.kind = kind
+        self.key = key
+        self.path = path  # function names from the root, for folded stacks
+        self.start = start
+        self.child = 0.0
+        self.blocks = blocks
+
+
+class Profiler:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.functions = {}  # name -> Stat
+        self.lines = {}  # line number -> Stat
+        self.folded = {}  # stack tuple -> exclusive seconds
+        self._stack = []
+        self._live = {}  # (kind, key) -> entries on the stack, for recursion
+
+    def enter_function(self, name):
+        path = (self._stack[-1].path if self._stack else _ROOT) + (name,)
+        self._push(FUNCTION, name, path)
+
+    def enter_line(self, line):
+        path = self._stack[-1].path if self._stack else _ROOT
+        self._push(LINE, line, path)
+
+    def _push(self, kind, key, path):
+        ident = (kind, key)
+        self._live[ident] = self._live.get(ident, 0) + 1
+        self._stack.append(_Entry(kind, key, path, self.clock(), sys.getallocatedblocks()))
+
+    def leave(self):
+        entry = self._stack.pop()
+        elapsed = self.clock() - entry.start
+        exclusive = elapsed - entry.child
+        if self._stack:
+            self._stack[-1].child += elapsed
+
+        table = self.functions if entry.kind == FUNCTION else self.lines
+        stat = table.get(entry.key)
+        if stat is None:
+            stat = table[entry.key] = Stat()
+        stat.calls += 1
+        stat.exclusive += exclusive
+        ident = (entry.kind, entry.key)
+        self._live[ident] -= 1
+        if self._live[ident] == 0:
+            # Only the outermost of recursive entries adds inclusive time
+            stat.inclusive += elapsed
+            stat.allocs += sys.getallocatedblocks() - entry.blocks
+
+        stack = entry.path if entry.kind == FUNCTION else entry.path + (f"line {entry.key}",)
+        self.folded[stack] = self.folded.get(stack, 0.0) + exclusive
+
+    def wrap_statement(self, line, fn):
+        # Profiled version of a compiled statement
+        enter_line, leave = self.enter_line, self.leave
+
+        def profiled():
+            enter_line(line)
+            try:
+                return fn()
+            finally:
+                leave()
+        return profiled
+
+    # --- Reports ---
+
+    def folded_lines(self):
+        # "main;f;g 1234" per stack, weights in microseconds
+        return [f"{';'.join(stack)} {round(seconds * 1e6)}"
+                for stack, seconds in sorted(self.folded.items()) if seconds > 0]
+
+    def write_folded(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self.folded_lines():
+                f.write(line + "\n")
+
+    def summary(self, top=10, sort="exclusive"):
+        out = []
+        for title, table, label in (("Functions", self.functions, "function"),
+                                    ("Lines", self.lines, "line")):
+            rows = sorted(table.items(), key=lambda item: getattr(item[1], sort), reverse=True)[:top]
+            out.append(f"== {title} (top {top} by {sort}) ==")
+            out.append(f"{label:<24} {'calls':>8} {'incl ms':>10} {'excl ms':>10} {'allocs':>8}")
+            for key, stat in rows:
+                out.append(f"{str(key):<24} {stat.calls:>8} {stat.inclusive * 1e3:>10.3f} "
+                           f"{stat.exclusive * 1e3:>10.3f} {stat.allocs:>8}")
+        return "\n".join(out)
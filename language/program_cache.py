@@ -0,0 +1,130 @@
+# --- language/program_cache.py ---
+# On-disk cache of parsed programs (.elanc files), so a script is parsed,
+# transformed and resolved once and reloaded on later runs. Entries are keyed
+# by the source hash, the grammar version and the interpreter version; a mismatch
+# on any of them means the entry is stale and gets rebuilt.
+# Entries are JSON, not pickles: a .elanc file sits next to the script and
+# anyone who can write there could otherwise run code on the next load.
+# Node, tuple, complex and resolved-expression values are tagged objects.
+# A file that fails to load for any reason is a miss and is overwritten.
+
+import hashlib
+import json
+import os
+
+from language.config import interpreter_version
+from language.parser import grammar_version, parse_source
+from language.resolve import RESOLVED, Node
+
+CACHE_FORMAT = 4  # bump whenever the cached node layout changes
+MAGIC = b"ELANC\x01"
+
+_EXPR_CLASSES = {cls.__name__: cls for cls in RESOLVED}
+
+
+def cache_key(source_bytes):
+    return (CACHE_FORMAT, grammar_version(), interpreter_version(),
+            hashlib.sha256(source_bytes).hexdigest())
+
+
+def cache_path(source_path, cache_dir=None):
+    # foo.elan -> foo.elanc next to the source, or a per-path file in cache_dir
+    if cache_dir is None:
+        return source_path + "c"
+    base = os.path.splitext(os.path.basename(source_path))[0]
+    tag = hashlib.sha256(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{base}-{tag}.elanc")
+
+
+def _encode(value):
+    kind = type(value)
+    if value is None or kind in (bool, int, float, str):
+        return value
+    if kind is list:
+        return [_encode(item) for item in value]
+    if kind is Node:
+        encoded = {"node": [_encode(item) for item in value]}
+        if hasattr(value, "line"):
+            encoded["line"] = value.line
+        return encoded
+    if kind is tuple:
+        return {"tuple": [_encode(item) for item in value]}
+    if kind is complex:
+        return {"complex": [value.real, value.imag]}
+    if kind in RESOLVED:
+        return {"expr": [kind.__name__] + [_encode(getattr(value, name)) for name in kind.__slots__]}
+    raise TypeError(f"cannot cache {kind.__name__} values")
+
+
+def _decode(obj):
+    # json object_hook: inner values are already decoded
+    if "node" in obj:
+        node = Node(obj["node"])
+        if "line" in obj:
+            node.line = obj["line"]
+        return node
+    if "tuple" in obj:
+        return tuple(obj["tuple"])
+    if "complex" in obj:
+        return complex(*obj["complex"])
+    if "expr" not in obj:
+        return obj  # the entry itself
+    name, *values = obj["expr"]
+    cls = _EXPR_CLASSES[name]
+    expr = cls.__new__(cls)
+    for slot, value in zip(cls.__slots__, values, strict=True):
+        setattr(expr, slot, value)
+    return expr
+
+
+def read_cache(path, key):
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            entry = json.loads(f.read(), object_hook=_decode)
+        if tuple(entry["key"]) != key:
+            return None
+        nodes = entry["nodes"]
+    except Exception:  # unreadable, truncated or foreign: rebuild it
+        return None
+    if type(nodes) is not list:
+        return None
+    return nodes
+
+
+def write_cache(path, key, nodes):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        data = json.dumps({"key": list(key), "nodes": _encode(nodes)}, separators=(",", ":"))
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(data.encode("utf-8"))
+        os.replace(tmp, path)  # atomic, so concurrent readers never see half a file
+        return True
+    except (OSError, TypeError, ValueError, RecursionError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def load_program(path, cache_dir=None):
+    # Parsed nodes for the script at path, from the cache when it is fresh.
+    # Parse errors are raised; an unwritable cache location is ignored.
+    with open(path, "rb") as f:
+        data = f.read()
+    key = cache_key(data)
+    cached = cache_path(path, cache_dir)
+
+    nodes = read_cache(cached, key)
+    if nodes is None:
+        nodes = parse_source(data.decode("utf-8"), strict=True)
+        if cache_dir is not None:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+            except OSError:
+                pass
+        write_cache(cached, key, nodes)
+    return nodes
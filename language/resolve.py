@@ -0,0 +1,257 @@
+# --- language/resolve.py ---
+# Resolution pass run once after parsing: expression slots are tagged as
+# Literal, VarRef or BinOp so evaluation no longer has to guess with
+# int()/float() on every read, and constant subexpressions are folded.
+# Literal values follow the executor's rules exactly (int() first, then
+# float()), and names still evaluate to themselves when nothing is stored.
+
+import operator
+
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+UNARY_OPERATORS = {
+    'neg': operator.neg,
+}
+
+_MISSING = object()
+
+
+class Node(list):
+    # A parsed statement that remembers its source line
+    __slots__ = ("line",)
+
+
+class Literal:
+    __slots__ = ("value", "source")
+
+    def __init__(self, value, source):
+        self.value = value
+        self.source = source
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+class VarRef:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return repr(self.name)
+
+
+class BinOp:
+    __slots__ = ("op", "left", "right", "source")
+
+    def __init__(self, op, left, right, source):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.source = source
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+class UnaryOp:
+    __slots__ = ("op", "operand", "source")
+
+    def __init__(self, op, operand, source):
+        self.op = op
+        self.operand = operand
+        self.source = source
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+class Call:
+    __slots__ = ("name", "args", "source")
+
+    def __init__(self, name, args, source):
+        self.name = name
+        self.args = args
+        self.source = source
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+class ListExpr:
+    __slots__ = ("items", "source")
+
+    def __init__(self, items, source):
+        self.items = items
+        self.source = source
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+class Index:
+    __slots__ = ("base", "index", "source")
+
+    def __init__(self, base, index, source):
+        self.base = base
+        self.index = index
+        self.source = source
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+class Slice:
+    __slots__ = ("base", "start", "stop", "source")
+
+    def __init__(self, base, start, stop, source):
+        self.base = base
+        self.start = start
+        self.stop = stop
+        self.source = source
+
+    def __repr__(self):
+        return repr(self.source)
+
+
+RESOLVED = (Literal, VarRef, BinOp, UnaryOp, Call, ListExpr, Index, Slice)
+
+
+def literal_value(token):
+    # The executor's literal rule: int(token), else float(token); floats
+    # with a fractional part are kept rather than truncated by int()
+    if isinstance(token, float) and not token.is_integer():
+        return token
+    try:
+        return int(token)
+    except:
+        pass
+    try:
+        return float(token)
+    except:
+        pass
+    return _MISSING
+
+
+def resolve_expr(token):
+    if isinstance(token, RESOLVED):
+        return token
+
+    if isinstance(token, list):
+        head = token[0] if token and isinstance(token[0], str) else None
+        if len(token) == 2 and head in UNARY_OPERATORS:
+            operand = resolve_expr(token[1])
+            if type(operand) is Literal:
+                try:
+                    return Literal(UNARY_OPERATORS[head](operand.value), token)
+                except Exception:
+                    pass
+            return UnaryOp(head, operand, token)
+        if len(token) == 3 and head == "function_call" and isinstance(token[2], list):
+            return Call(token[1], [resolve_expr(a) for a in token[2]], token)
+        if len(token) == 2 and head == "list" and isinstance(token[1], list):
+            return ListExpr([resolve_expr(item) for item in token[1]], token)
+        if len(token) == 3 and head == "index":
+            return Index(resolve_expr(token[1]), resolve_expr(token[2]), token)
+        if len(token) == 4 and head == "slice":
+            bounds = [None if b is None else resolve_expr(b) for b in token[2:]]
+            return Slice(resolve_expr(token[1]), bounds[0], bounds[1], token)
+        if len(token) == 3 and head in OPERATORS:
+            left = resolve_expr(token[1])
+            right = resolve_expr(token[2])
+            if type(left) is Literal and type(right) is Literal:
+                try:
+                    value = OPERATORS[token[0]](left.value, right.value)
+                    return Literal(value, token)
+                except Exception:
+                    pass  # e.g. division by zero: leave it to fail at run time
+            return BinOp(token[0], left, right, token)
+        return token  # unknown form: evaluated by the generic path
+
+    if isinstance(token, (str, int, float)):
+        value = literal_value(token)
+        if value is not _MISSING:
+            return Literal(value, token)
+        if isinstance(token, str):
+            return VarRef(token)
+    return token
+
+
+def expr_reads(token):
+    # Names a resolved expression reads, or None if it may reach other state
+    kind = type(token)
+    if kind is Literal:
+        return frozenset()
+    if kind is VarRef:
+        return frozenset((token.name,))
+    if kind is BinOp:
+        left = expr_reads(token.left)
+        right = expr_reads(token.right)
+        if left is None or right is None:
+            return None
+        return left | right
+    if kind is UnaryOp:
+        return expr_reads(token.operand)
+    return None
+
+
+# Statement -> indices of the slots the executor evaluates as expressions
+EXPR_SLOTS = {
+    "say": (1,),
+    "remember": (2,),
+    "remember_index": (2, 3),
+    "expect": (2,),
+    "return": (1,),
+    "if": (1,),
+    "while": (1,),
+}
+
+# Statement -> indices of slots holding a body (list of statements or one statement)
+BODY_SLOTS = {
+    "if": (2, 3),
+    "while": (2,),
+    "function_def": (3,),
+}
+
+
+def resolve_statement(node):
+    if not isinstance(node, list) or not node or not isinstance(node[0], str):
+        return node
+    cmd = node[0]
+    if type(node) is Node:
+        line, node = node.line, Node(node)
+        node.line = line
+    else:
+        node = list(node)
+    for i in EXPR_SLOTS.get(cmd, ()):
+        if i < len(node):
+            node[i] = resolve_expr(node[i])
+    for i in BODY_SLOTS.get(cmd, ()):
+        if i < len(node):
+            node[i] = _resolve_body(node[i])
+    if cmd == "function_call" and len(node) > 2 and isinstance(node[2], list):
+        node[2] = [resolve_expr(a) for a in node[2]]
+    return node
+
+
+def _resolve_body(body):
+    if isinstance(body, list) and body and isinstance(body[0], list):
+        return [resolve_statement(stmt) for stmt in body]
+    return resolve_statement(body)
+
+
+def resolve_program(nodes):
+    return [resolve_statement(node) for node in nodes]
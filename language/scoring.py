@@ -0,0 +1,245 @@
+# --- language/scoring.py ---
+# Bulk checking of expectations ('expect label value') against labelled
+# outputs ('label_output label' then 'say'). score() sorts every label into
+# one of three groups:
+#   - number vs number: compared together in one isclose call;
+#   - Vector vs Vector: concatenated and compared element-wise in one call,
+#     then reduced per label;
+#   - anything else: compared with ==.
+# Tolerances follow numpy.isclose: |actual - expected| <= atol + rtol * |expected|,
+# and only apply when a float or complex is involved: int against int (scalars
+# or integer vectors) must be equal.
+# The result is a Scores table that renders as a summary dict, JSON or
+# fixed-width text.
+
+import json
+import math
+import numbers
+
+from language.numeric import Vector, _is_number, load_numpy
+
+PASS, FAIL, MISSING = "pass", "fail", "missing"
+
+_ABSENT = object()
+
+
+def score(expectations, outputs, rtol=1e-9, atol=1e-12):
+    labels = list(expectations)
+    expected = [expectations[label] for label in labels]
+    actual = [outputs.get(label, _ABSENT) for label in labels]
+    status = [FAIL] * len(labels)
+    errors = [None] * len(labels)  # largest absolute difference, numeric labels only
+
+    scalars, vectors = [], []
+    for i, (e, a) in enumerate(zip(expected, actual)):
+        if a is _ABSENT:
+            status[i] = MISSING
+        elif _is_number(e) and _is_number(a):
+            scalars.append(i)
+        elif isinstance(e, Vector) and isinstance(a, Vector):
+            if len(e) == len(a):
+                vectors.append(i)
+        elif a == e:
+            status[i] = PASS
+
+    if scalars:
+        _score_scalars(scalars, expected, actual, status, errors, rtol, atol)
+    if vectors:
+        _score_vectors(vectors, expected, actual, status, errors, rtol, atol)
+    return Scores(labels, expected, actual, status, errors, rtol, atol)
+
+
+def _record(indices, ok, err, status, errors):
+    for i, passed, diff in zip(indices, ok, err):
+        status[i] = PASS if passed else FAIL
+        errors[i] = float(diff)
+
+
+def _is_int(value):
+    # Python and NumPy integers, but not bools
+    if type(value) is int:
+        return True
+    return isinstance(value, numbers.Integral) and not isinstance(value, bool)
+
+
+def _score_scalars(indices, expected, actual, status, errors, rtol, atol):
+    exact = [i for i in indices if _is_int(expected[i]) and _is_int(actual[i])]
+    if exact:
+        _record(exact, [actual[i] == expected[i] for i in exact],
+                [_diff(actual[i], expected[i]) for i in exact], status, errors)
+        indices = [i for i in indices if not (_is_int(expected[i]) and _is_int(actual[i]))]
+        if not indices:
+            return
+    np = load_numpy()
+    if np is not None:
+        dtype = complex if any(isinstance(expected[i], complex) or isinstance(actual[i], complex)
+                               for i in indices) else float
+        try:
+            e = np.array([expected[i] for i in indices], dtype=dtype)
+            a = np.array([actual[i] for i in indices], dtype=dtype)
+        except OverflowError:  # integers past float range
+            pass
+        else:
+            _record(indices, np.isclose(a, e, rtol=rtol, atol=atol).tolist(),
+                    np.abs(a - e).tolist(), status, errors)
+            return
+    ok = [_isclose(actual[i], expected[i], rtol, atol) for i in indices]
+    err = [_diff(actual[i], expected[i]) for i in indices]
+    _record(indices, ok, err, status, errors)
+
+
+def _score_vectors(indices, expected, actual, status, errors, rtol, atol):
+    np = load_numpy()
+    if np is None:
+        ok, err = [], []
+        for i in indices:
+            pairs = list(zip(actual[i].data, expected[i].data))
+            ok.append(all(_isclose(a, e, rtol, atol) for a, e in pairs))
+            err.append(max((_diff(a, e) for a, e in pairs), default=0.0))
+        _record(indices, ok, err, status, errors)
+        return
+
+    # Integer vectors on both sides compare exactly, in their own group so
+    # concatenation does not turn them into floats
+    integral = lambda i: expected[i].data.dtype.kind in "iu" and actual[i].data.dtype.kind in "iu"
+    exact = [i for i in indices if integral(i)]
+    tolerant = [i for i in indices if not integral(i)]
+    for group, tolerance in ((exact, False), (tolerant, True)):
+        if group:
+            _score_vector_group(np, group, expected, actual, status, errors, rtol, atol, tolerance)
+
+
+def _score_vector_group(np, indices, expected, actual, status, errors, rtol, atol, tolerance):
+    lengths = np.array([len(expected[i]) for i in indices])
+    e = np.concatenate([expected[i].data for i in indices])
+    a = np.concatenate([actual[i].data for i in indices])
+    if tolerance:
+        close = np.isclose(a, e, rtol=rtol, atol=atol)
+        diff = np.abs(a - e)
+    else:
+        close = a == e
+        diff = np.abs(a.astype(float) - e.astype(float))
+    # Per-label reductions over the concatenated arrays; empty vectors are
+    # skipped (reduceat cannot express an empty segment) and pass
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    nonempty = lengths > 0
+    ok = np.ones(len(indices), dtype=bool)
+    err = np.zeros(len(indices))
+    if nonempty.any():
+        ok[nonempty] = np.logical_and.reduceat(close, starts[nonempty])
+        err[nonempty] = np.maximum.reduceat(diff, starts[nonempty])
+    _record(indices, ok.tolist(), err.tolist(), status, errors)
+
+
+def _isclose(a, e, rtol, atol):
+    if _is_int(a) and _is_int(e):
+        return a == e
+    try:
+        return abs(a - e) <= atol + rtol * abs(e)
+    except OverflowError:
+        return a == e
+
+
+def _diff(a, e):
+    try:
+        return float(abs(a - e))
+    except OverflowError:
+        return math.inf
+
+
+def _plain(value):
+    # JSON-friendly form of an expected or actual value
+    if value is _ABSENT:
+        return None
+    if isinstance(value, Vector):
+        value = value.tolist()
+    if isinstance(value, complex):
+        return [value.real, value.imag]
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+class Scores:
+    def __init__(self, labels, expected, actual, status, errors, rtol, atol):
+        self.labels = labels
+        self.expected = expected
+        self.actual = actual
+        self.status = status
+        self.errors = errors
+        self.rtol = rtol
+        self.atol = atol
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def passed(self):
+        return self.status.count(PASS)
+
+    @property
+    def failed(self):
+        return self.status.count(FAIL)
+
+    @property
+    def missing(self):
+        return self.status.count(MISSING)
+
+    @property
+    def ok(self):
+        return all(s == PASS for s in self.status)
+
+    def failures(self):
+        return [label for label, s in zip(self.labels, self.status) if s != PASS]
+
+    def rows(self, failures_only=False):
+        for i, label in enumerate(self.labels):
+            if failures_only and self.status[i] == PASS:
+                continue
+            yield {"label": label, "status": self.status[i], "expected": self.expected[i],
+                   "actual": None if self.actual[i] is _ABSENT else self.actual[i],
+                   "error": self.errors[i]}
+
+    def summary(self):
+        return {"total": len(self.labels), "passed": self.passed, "failed": self.failed,
+                "missing": self.missing, "rtol": self.rtol, "atol": self.atol}
+
+    def as_dict(self, failures_only=False, limit=None):
+        results = []
+        for row in self.rows(failures_only):
+            if limit is not None and len(results) >= limit:
+                break
+            row["expected"] = _plain(row["expected"])
+            row["actual"] = _plain(row["actual"])
+            results.append(row)
+        report = self.summary()
+        report["results"] = results
+        return report
+
+    def to_json(self, failures_only=False, limit=None, indent=None):
+        return json.dumps(self.as_dict(failures_only, limit), indent=indent, default=str)
+
+    def table(self, failures_only=True, limit=50, width=32):
+        out = [f"{'label':<24} {'status':<8} {'max error':>10}  expected / actual"]
+        shown = 0
+        for row in self.rows(failures_only):
+            if limit is not None and shown >= limit:
+                break
+            error = "" if row["error"] is None else f"{row['error']:.3g}"
+            out.append(f"{str(row['label']):<24} {row['status']:<8} {error:>10}  "
+                       f"{_clip(row['expected'], width)} / {_clip(row['actual'], width)}")
+            shown += 1
+        hidden = (self.failed + self.missing if failures_only else len(self)) - shown
+        if hidden > 0:
+            out.append(f"... {hidden} more")
+        out.append(self.summary_line())
+        return "\n".join(out)
+
+    def summary_line(self):
+        return (f"{self.passed}/{len(self)} passed, {self.failed} failed, {self.missing} missing "
+                f"(rtol={self.rtol:g}, atol={self.atol:g})")
+
+
+def _clip(value, width):
+    text = str(value)
+    return text if len(text) <= width else text[:width - 3] + "..."
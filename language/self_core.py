@@ -1,44 +1,187 @@
 # --- language/self_core.py ---
+# Self-model stores are bounded: each keeps at most 'capacity' distinct items
+# (None = unbounded), evicting by FIFO, LRU or lowest priority. Limits come
+# from settings.self_model_limits in elan_config.json, per store or "default".
+
+import heapq
+from collections import OrderedDict
+
+from language.config import load_config
+from language.tracelog import TraceLog, TraceLogLocked
+
+POLICIES = ("fifo", "lru", "priority")
+
+STORES = ("declarations", "beliefs", "intentions", "goals", "reasons",
+          "evaluations", "adjustments", "contradictions")
+
+
+def _key(item):
+    try:
+        hash(item)
+        return item
+    except TypeError:  # lists, vectors: dedupe by their printed form
+        return (type(item).__name__, repr(item))
+
+
+class BoundedStore:
+    def __init__(self, capacity=None, policy="fifo"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.capacity = capacity
+        self.policy = policy
+        self.items = OrderedDict()  # key -> [item, priority]
+        self.heap = []  # (priority, seq, key); stale entries skipped lazily
+        self.seq = 0
+        self.evicted = 0
+        self.version = 0  # bumped on every change, for cached views
+        self._shared = False  # items and heap also belong to a fork
+
+    def fork(self):
+        # O(1): both stores share their contents until one of them changes
+        child = BoundedStore.__new__(BoundedStore)
+        child.__dict__.update(self.__dict__)
+        self._shared = child._shared = True
+        return child
+
+    def _own(self):
+        # Copy the shared contents before the first change
+        self.items = OrderedDict((key, list(entry)) for key, entry in self.items.items())
+        self.heap = list(self.heap)
+        self._shared = False
+
+    def add(self, item, priority=0):
+        if self._shared:
+            self._own()
+        key = _key(item)
+        entry = self.items.get(key)
+        if entry is not None:
+            # Re-adding refreshes recency (lru) or raises priority; both
+            # change the store, so cached views have to see a new version
+            if self.policy == "lru":
+                self.items.move_to_end(key)
+                self.version += 1
+            elif self.policy == "priority" and priority > entry[1]:
+                entry[1] = priority
+                self._push(priority, key)
+                self.version += 1
+            return False
+        self.items[key] = [item, priority]
+        if self.policy == "priority":
+            self._push(priority, key)
+        self.version += 1
+        if self.capacity is not None and len(self.items) > self.capacity:
+            self._evict()
+        return True
+
+    def _push(self, priority, key):
+        self.seq += 1
+        heapq.heappush(self.heap, (priority, self.seq, key))
+        if len(self.heap) > 2 * len(self.items) + 64:
+            self.heap = [(e[1], i, k) for i, (k, e) in enumerate(self.items.items())]
+            heapq.heapify(self.heap)
+            self.seq = len(self.heap)
+
+    def _evict(self):
+        if self.policy == "priority":
+            while True:
+                priority, _, key = heapq.heappop(self.heap)
+                entry = self.items.get(key)
+                if entry is not None and entry[1] == priority:
+                    del self.items[key]
+                    break
+        else:
+            self.items.popitem(last=False)
+        self.evicted += 1
+
+    def touch(self, item):
+        # Mark an item as used (LRU only); returns whether it is stored
+        key = _key(item)
+        if key not in self.items:
+            return False
+        if self.policy == "lru":
+            if self._shared:
+                self._own()
+            self.items.move_to_end(key)
+            self.version += 1
+        return True
+
+    def __contains__(self, item):
+        return _key(item) in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return (entry[0] for entry in self.items.values())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def clear(self):
+        self.items = OrderedDict()
+        self.heap = []
+        self._shared = False
+        self.version += 1
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _limits(store, limits):
+    spec = limits.get(store, limits.get("default", {}))
+    return spec.get("capacity"), spec.get("policy", "fifo")
+
 
 class SelfModel:
-    def __init__(self):
+    def __init__(self, limits=None):
+        if limits is None:
+            limits = load_config().get("settings", {}).get("self_model_limits", {})
         self.identity = None
-        self.declarations = []
-        self.beliefs = []
-        self.intentions = []
-        self.goals = []
-        self.reasons = []
-        self.evaluations = []
-        self.adjustments = []
-        self.contradictions = []
-        self.traces = {}  # name -> list of steps
+        for store in STORES:
+            capacity, policy = _limits(store, limits)
+            setattr(self, store, BoundedStore(capacity, policy))
+        self._traces = None  # TraceLog, opened on first use
+        self._private_traces = False  # forks never write to trace_log_path
+        self._answers = {}  # ask_self topic -> (store version, lines)
+
+    def fork(self):
+        # Copy-on-write branch; trace steps are not shared, a fork starts
+        # its own (temporary) trace log
+        child = SelfModel.__new__(SelfModel)
+        child.identity = self.identity
+        for store in STORES:
+            setattr(child, store, getattr(self, store).fork())
+        child._traces = None
+        child._private_traces = True
+        child._answers = {}
+        return child
 
     def set_identity(self, value):
         self.identity = value
 
-    def add_declaration(self, declaration):
-        self.declarations.append(declaration)
+    def add_declaration(self, declaration, priority=0):
+        self.declarations.add(declaration, priority)
 
-    def add_belief(self, belief):
-        self.beliefs.append(belief)
+    def add_belief(self, belief, priority=0):
+        self.beliefs.add(belief, priority)
 
-    def add_intent(self, intent):
-        self.intentions.append(intent)
+    def add_intent(self, intent, priority=0):
+        self.intentions.add(intent, priority)
 
-    def add_goal(self, goal):
-        self.goals.append(goal)
+    def add_goal(self, goal, priority=0):
+        self.goals.add(goal, priority)
 
-    def add_reason(self, reason):
-        self.reasons.append(reason)
+    def add_reason(self, reason, priority=0):
+        self.reasons.add(reason, priority)
 
-    def add_evaluation(self, evaluation):
-        self.evaluations.append(evaluation)
+    def add_evaluation(self, evaluation, priority=0):
+        self.evaluations.add(evaluation, priority)
 
-    def add_adjustment(self, adjustment):
-        self.adjustments.append(adjustment)
+    def add_adjustment(self, adjustment, priority=0):
+        self.adjustments.add(adjustment, priority)
 
-    def add_contradiction(self, item):
-        self.contradictions.append(item)
+    def add_contradiction(self, item, priority=0):
+        self.contradictions.add(item, priority)
 
     def resolve_contradictions(self):
         resolved = []
@@ -47,16 +190,31 @@ class SelfModel:
         self.contradictions.clear()
         return resolved
 
+    @property
+    def traces(self):
+        # Trace steps go to an append-only log on disk, not the heap. The
+        # log at trace_log_path has one owner at a time; other self-models
+        # (further sessions, other processes) keep a private log instead
+        if self._traces is None:
+            settings = load_config().get("settings", {})
+            path = None if self._private_traces else settings.get("trace_log_path")
+            max_bytes = settings.get("trace_segment_bytes", 64 * 1024 * 1024)
+            try:
+                self._traces = TraceLog(path, max_bytes)
+            except TraceLogLocked:
+                self._traces = TraceLog(None, max_bytes)
+        return self._traces
+
     def start_trace(self, name):
-        self.traces[name] = []
+        self.traces.start(name)
 
     def add_trace_step(self, name, step):
-        if name not in self.traces:
-            self.traces[name] = []
-        self.traces[name].append(step)
+        self.traces.append(name, step)
 
-    def get_trace(self, name):
-        return self.traces.get(name, ["<no trace found>"])
+    def get_trace(self, name, start=None, stop=None):
+        if name not in self.traces:
+            return ["<no trace found>"]
+        return self.traces.steps(name, start, stop)
 
     def describe(self):
         yield f"Identity: {self.identity or 'unknown'}"
@@ -68,15 +226,29 @@ class SelfModel:
         yield f"Evaluations: {self.evaluations}"
         yield f"Adjustments: {self.adjustments}"
         yield f"Contradictions: {self.contradictions}"
-        yield f"Traces: {list(self.traces.keys())}"
+        yield f"Traces: {self._traces.trace_names() if self._traces is not None else []}"
+
+    # ask_self topics, checked in order: keyword -> (store, line template)
+    ASK_TOPICS = (
+        ("belief", "beliefs", "I believe: {}"),
+        ("goal", "goals", "My goals include: {}"),
+    )
 
     def ask_self(self, query):
         # Simple pattern matcher for known fields
         query = query.lower()
         if "identity" in query:
             return [f"My identity is: {self.identity}"]
-        if "belief" in query:
-            return [f"I believe: {b}" for b in self.beliefs]
-        if "goal" in query:
-            return [f"My goals include: {g}" for g in self.goals]
+        for keyword, store, template in self.ASK_TOPICS:
+            if keyword in query:
+                return self._answer(store, template)
         return [f"I don't understand the query: {query}"]
+
+    def _answer(self, store, template):
+        # Lines are rebuilt only when the store has changed since last asked
+        items = getattr(self, store)
+        cached = self._answers.get(store)
+        if cached is None or cached[0] != items.version:
+            cached = (items.version, [template.format(item) for item in items])
+            self._answers[store] = cached
+        return list(cached[1])
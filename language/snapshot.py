@@ -0,0 +1,168 @@
+# --- language/snapshot.py ---
+# Snapshots of interpreter state for warm starts: globals, macros and tags
+# (Memory), the self-model stores, TypeEngine tables, and the executor's
+# programs, expectations and labelled outputs. A snapshot file is
+#
+#   MAGIC | format (u16) | section count (u16) | table | payloads
+#
+# where each table entry is name (16 bytes) | offset (u64) | length (u64)
+# and each payload is one pickled section. Restoring maps the file and only
+# unpickles the sections asked for, straight from the map.
+#
+# Trace steps already live on disk: a log at settings.trace_log_path is
+# reopened by the restored SelfModel, a private temporary log is not kept.
+
+import mmap
+import os
+import pickle
+import struct
+from collections.abc import MutableMapping
+
+from language.config import interpreter_version
+from language.self_core import STORES
+
+MAGIC = b"ELANSNAP"
+FORMAT = 1  # bump whenever a section layout changes
+HEADER = struct.Struct("<HH")
+ENTRY = struct.Struct("<16sQQ")
+
+SECTIONS = ("meta", "memory", "self_model", "types", "executor")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def capture(executor):
+    # Section name -> picklable state
+    memory = executor.memory
+    if memory.stack or executor.call_depth:
+        raise SnapshotError("Cannot snapshot while a function call is running")
+    model = executor.self_model
+    types = executor.type_engine
+    return {
+        "meta": {"interpreter": interpreter_version(), "engine": executor.engine},
+        "memory": (dict(memory.global_vars), dict(memory.macros), dict(memory.tags)),
+        "self_model": (model.identity, {store: getattr(model, store) for store in STORES}),
+        "types": {name: _plain(value) for name, value in vars(types).items()},
+        "executor": (dict(executor.programs), dict(executor.expectations), dict(executor.outputs),
+                     executor.last_label, executor.collecting, executor.collected_lines),
+    }
+
+
+def _plain(value):
+    # Copy-on-write mappings are stored flattened
+    return dict(value) if isinstance(value, MutableMapping) else value
+
+
+def _refill(mapping, items):
+    mapping.clear()
+    mapping.update(items)
+
+
+def apply(executor, sections):
+    # Restore sections in place: compiled closures keep references to the
+    # Memory dicts, the SelfModel and the TypeEngine, so those objects stay
+    if "memory" in sections:
+        global_vars, macros, tags = sections["memory"]
+        memory = executor.memory
+        _refill(memory.global_vars, global_vars)
+        _refill(memory.macros, macros)
+        _refill(memory.tags, tags)
+        memory.macro_version += 1
+    if "self_model" in sections:
+        identity, stores = sections["self_model"]
+        model = executor.self_model
+        model.identity = identity
+        for store, items in stores.items():
+            setattr(model, store, items)
+        model._answers = {}
+    if "types" in sections:
+        types = executor.type_engine
+        for name, value in sections["types"].items():
+            current = getattr(types, name, None)
+            if isinstance(current, MutableMapping):
+                _refill(current, value)
+            else:
+                setattr(types, name, value)
+    if "executor" in sections:
+        programs, expectations, outputs, *rest = sections["executor"]
+        _refill(executor.programs, programs)
+        _refill(executor.expectations, expectations)
+        _refill(executor.outputs, outputs)
+        executor.last_label, executor.collecting, executor.collected_lines = rest
+
+
+def write_snapshot(path, sections):
+    payloads = [(name, pickle.dumps(state, pickle.HIGHEST_PROTOCOL)) for name, state in sections.items()]
+    offset = len(MAGIC) + HEADER.size + ENTRY.size * len(payloads)
+    table = []
+    for name, data in payloads:
+        table.append(ENTRY.pack(name.encode("ascii"), offset, len(data)))
+        offset += len(data)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER.pack(FORMAT, len(payloads)))
+            f.writelines(table)
+            for _, data in payloads:
+                f.write(data)
+        os.replace(tmp, path)  # atomic, so a reader never sees half a snapshot
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return offset
+
+
+def read_snapshot(path, names=None):
+    # Section name -> state for the requested sections (all by default)
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            raise SnapshotError(f"Not an ELAN snapshot: {path}")
+    try:
+        view = memoryview(data)
+        try:
+            return _read_sections(path, view, names)
+        finally:
+            view.release()
+    finally:
+        data.close()
+
+
+def _read_sections(path, view, names):
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise SnapshotError(f"Not an ELAN snapshot: {path}")
+    fmt, count = HEADER.unpack_from(view, len(MAGIC))
+    if fmt != FORMAT:
+        raise SnapshotError(f"Snapshot format {fmt} is not supported (expected {FORMAT})")
+
+    table = {}
+    pos = len(MAGIC) + HEADER.size
+    for _ in range(count):
+        name, offset, length = ENTRY.unpack_from(view, pos)
+        table[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+        pos += ENTRY.size
+
+    def load(name):
+        offset, length = table[name]
+        return pickle.loads(view[offset:offset + length])
+
+    meta = load("meta")
+    if meta.get("interpreter") != interpreter_version():
+        raise SnapshotError(f"Snapshot was written by interpreter {meta.get('interpreter')}, "
+                            f"this is {interpreter_version()}")
+    wanted = SECTIONS if names is None else names
+    sections = {"meta": meta}
+    for name in wanted:
+        if name not in SECTIONS:
+            raise SnapshotError(f"Unknown snapshot section '{name}' (expected one of {', '.join(SECTIONS)})")
+        if name != "meta" and name in table:
+            sections[name] = load(name)
+    return sections
@@ -0,0 +1,341 @@
+# --- language/tracelog.py ---
+# Append-only binary log for trace steps, so millions of steps live on disk
+# instead of the heap. A log is a series of segment files; each segment is a
+# header followed by records:
+#
+#   kind (u8) | name id (u32) | seq (u64) | timestamp (f64) | length (u32) | payload
+#
+# kind NAME binds a name id to its UTF-8 name, START restarts a trace (older
+# steps of that name become garbage), STEP carries a pickled step. Reads go
+# through mmap and only unpickle the payloads a query returns. Segments are
+# rotated past max_bytes and compact() rewrites only the live steps.
+#
+# A log on a given path has one writer at a time: opening it takes an
+# exclusive lock (a .lock file, flock'd where available), and a second
+# TraceLog on the same path, in this or another process, raises
+# TraceLogLocked. An empty or torn segment header is treated as an empty
+# segment and a torn record at the tail is cut off before appending.
+
+import glob
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+import threading
+from array import array
+from bisect import bisect_left
+
+try:
+    import fcntl
+except ImportError:  # no flock: the lock only holds within this process
+    fcntl = None
+
+MAGIC = b"ELTRACE1"
+RECORD = struct.Struct("<BIQdI")
+
+NAME, START, STEP = 0, 1, 2
+
+# Offsets pack the segment number above the byte offset within the segment
+_OFFSET_BITS = 40
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+
+
+class TraceLogError(Exception):
+    pass
+
+
+class TraceLogLocked(TraceLogError):
+    pass
+
+
+_held = set()  # lock paths held by TraceLogs in this process
+_held_lock = threading.Lock()
+
+
+def _acquire(path):
+    lock_path = os.path.abspath(path) + ".lock"
+    with _held_lock:
+        if lock_path in _held:
+            raise TraceLogLocked(f"Trace log {path} is already open in this process")
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                raise TraceLogLocked(f"Trace log {path} is open in another process") from None
+        _held.add(lock_path)
+    return lock_path, fd
+
+
+def _release(lock):
+    lock_path, fd = lock
+    with _held_lock:
+        _held.discard(lock_path)
+        os.close(fd)  # also drops the flock
+
+
+class TraceLog:
+    def __init__(self, path=None, max_bytes=64 * 1024 * 1024):
+        # path is the segment prefix; None means a private temporary log
+        self._tmpdir = None
+        if path is None:
+            self._tmpdir = tempfile.mkdtemp(prefix="elan-trace-")
+            path = os.path.join(self._tmpdir, "trace")
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = None
+        self._file = None
+        self._maps = {}
+        if self._tmpdir is None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._lock = _acquire(path)
+        self.names = {}  # name -> id
+        self._name_list = []  # id -> name
+        self.index = {}  # name -> array('Q') of packed offsets, one per seq
+        self._segments = []  # segment paths, oldest first
+        self._tail = 0  # end of the last whole record in the newest segment
+        self._rotated = False  # the next write starts a new segment
+        self._load()
+
+    # --- Segments ---
+
+    def _segment_path(self, number):
+        return f"{self.path}.{number:05d}"
+
+    def _next_segment_path(self):
+        if not self._segments:
+            return self._segment_path(0)
+        return self._segment_path(int(self._segments[-1].rsplit(".", 1)[1]) + 1)
+
+    def _load(self):
+        for seg_path in sorted(glob.glob(glob.escape(self.path) + ".[0-9][0-9][0-9][0-9][0-9]")):
+            self._segments.append(seg_path)
+            self._scan(len(self._segments) - 1)
+
+    def _scan(self, number):
+        with open(self._segments[number], "rb") as f:
+            header = f.read(len(MAGIC))
+            if header != MAGIC:
+                if MAGIC.startswith(header):  # empty, or cut off in the header
+                    self._tail = 0
+                    return
+                raise TraceLogError(f"Not a trace log segment: {self._segments[number]}")
+            data = f.read()
+        pos = 0
+        base = len(MAGIC)
+        while pos + RECORD.size <= len(data):
+            kind, name_id, seq, ts, length = RECORD.unpack_from(data, pos)
+            end = pos + RECORD.size + length
+            if end > len(data):
+                break  # torn write at the tail: ignore the partial record
+            if kind == NAME:
+                name = data[pos + RECORD.size:end].decode("utf-8")
+                self._bind(name, name_id)
+            elif kind == START:
+                self.index[self._name_list[name_id]] = array("Q")
+            elif kind == STEP:
+                self.index[self._name_list[name_id]].append((number << _OFFSET_BITS) | (base + pos))
+            pos = end
+        self._tail = base + pos
+
+    def _bind(self, name, name_id):
+        self.names[name] = name_id
+        while len(self._name_list) <= name_id:
+            self._name_list.append(None)
+        self._name_list[name_id] = name
+        self.index.setdefault(name, array("Q"))
+
+    def _writer(self):
+        if self._file is None:
+            # Segments are only listed once they are about to exist
+            if not self._segments or self._rotated:
+                self._segments.append(self._next_segment_path())
+                self._tail = 0
+                self._rotated = False
+            self._file = open(self._segments[-1], "ab")
+            if self._file.tell() != self._tail:
+                self._file.truncate(self._tail)  # drop a torn header or record
+                self._file.seek(self._tail)
+            if self._file.tell() == 0:
+                self._file.write(MAGIC)
+                # A fresh segment restates the names so each segment reads alone
+                for name_id, name in enumerate(self._name_list):
+                    if name is not None:
+                        self._write(NAME, name_id, 0, name.encode("utf-8"))
+        return self._file
+
+    def _write(self, kind, name_id, seq, payload):
+        f = self._file
+        offset = f.tell()
+        f.write(RECORD.pack(kind, name_id, seq, time.time(), len(payload)))
+        f.write(payload)
+        return offset
+
+    def rotate(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._segments:
+            self._rotated = True
+
+    # --- Writing ---
+
+    def _name_id(self, name):
+        name_id = self.names.get(name)
+        if name_id is None:
+            name_id = len(self._name_list)
+            self._writer()
+            self._bind(name, name_id)
+            self._write(NAME, name_id, 0, name.encode("utf-8"))
+        return name_id
+
+    def start(self, name):
+        name_id = self._name_id(name)
+        self._writer()
+        self._write(START, name_id, 0, b"")
+        self.index[name] = array("Q")
+
+    def append(self, name, step):
+        name_id = self._name_id(name)
+        f = self._writer()
+        steps = self.index[name]
+        seq = len(steps)
+        offset = self._write(STEP, name_id, seq, pickle.dumps(step, pickle.HIGHEST_PROTOCOL))
+        steps.append(((len(self._segments) - 1) << _OFFSET_BITS) | offset)
+        if f.tell() >= self.max_bytes:
+            self.rotate()
+        return seq
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    # --- Reading ---
+
+    def _map(self, number):
+        if number == len(self._segments) - 1:
+            self.flush()  # the active segment: make pending writes visible
+        size = os.path.getsize(self._segments[number])
+        cached = self._maps.get(number)
+        if cached is None or cached[1] < size:
+            if cached is not None:
+                cached[0].close()
+            with open(self._segments[number], "rb") as f:
+                cached = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), size)
+            self._maps[number] = cached
+        return cached[0]
+
+    def _record(self, packed, with_payload=True):
+        data = self._map(packed >> _OFFSET_BITS)
+        pos = packed & _OFFSET_MASK
+        kind, name_id, seq, ts, length = RECORD.unpack_from(data, pos)
+        if not with_payload:
+            return seq, ts, None
+        start = pos + RECORD.size
+        return seq, ts, pickle.loads(data[start:start + length])
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return sum(len(steps) for steps in self.index.values())
+
+    def trace_names(self):
+        return list(self.index)
+
+    def count(self, name):
+        return len(self.index.get(name, ()))
+
+    def steps(self, name, start=None, stop=None):
+        # Steps of one trace by sequence number range [start, stop)
+        offsets = self.index.get(name)
+        if offsets is None:
+            return []
+        return [self._record(packed)[2] for packed in offsets[start:stop]]
+
+    def query(self, name=None, since=None, until=None):
+        # (name, seq, timestamp, step) tuples, optionally filtered by name
+        # and by timestamp range [since, until); timestamps only grow within
+        # a trace, so each one is a binary search over its offsets
+        names = self.trace_names() if name is None else [name] if name in self.index else []
+        results = []
+        for trace in names:
+            offsets = self.index[trace]
+            ts_at = lambda packed: self._record(packed, with_payload=False)[1]
+            lo = 0 if since is None else bisect_left(offsets, since, key=ts_at)
+            hi = len(offsets) if until is None else bisect_left(offsets, until, key=ts_at)
+            for packed in offsets[lo:hi]:
+                seq, ts, step = self._record(packed)
+                results.append((trace, seq, ts, step))
+        if name is None:
+            results.sort(key=lambda r: r[2])
+        return results
+
+    # --- Maintenance ---
+
+    def compact(self):
+        # Copy only the live steps (those after each trace's latest start)
+        # into one fresh segment, streaming from the old maps, then drop the
+        # old segments
+        self.flush()
+        old = self._segments
+        new_path = self._next_segment_path()
+        index = {}
+        with open(new_path, "wb") as out:
+            out.write(MAGIC)
+            for name_id, name in enumerate(self.index):
+                encoded = name.encode("utf-8")
+                out.write(RECORD.pack(NAME, name_id, 0, time.time(), len(encoded)))
+                out.write(encoded)
+            for name_id, (name, offsets) in enumerate(self.index.items()):
+                moved = index[name] = array("Q")
+                for packed in offsets:
+                    data = self._map(packed >> _OFFSET_BITS)
+                    pos = packed & _OFFSET_MASK
+                    end = pos + RECORD.size + RECORD.unpack_from(data, pos)[4]
+                    moved.append(out.tell())  # segment 0 of the new list
+                    out.write(struct.pack("<BI", STEP, name_id))
+                    out.write(data[pos + 5:end])
+        # Switch to the new segment before the old ones go, so a failed
+        # removal leaves stale files behind rather than dangling offsets
+        self._close_files()
+        self._segments = [new_path]
+        self._tail = os.path.getsize(new_path)
+        self._rotated = False
+        self.names = {name: i for i, name in enumerate(index)}
+        self._name_list = list(index)
+        self.index = index
+        for seg_path in old:
+            try:
+                os.remove(seg_path)
+            except FileNotFoundError:
+                pass
+
+    def _close_files(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for data, _ in self._maps.values():
+            data.close()
+        self._maps = {}
+
+    def close(self, remove_tmp=True):
+        self._close_files()
+        if self._lock is not None:
+            _release(self._lock)
+            self._lock = None
+        if remove_tmp and self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
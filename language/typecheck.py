@@ -1,11 +1,56 @@
 # --- language/typecheck.py ---
+# Runtime type records plus a static pass (analyze) over resolved statements.
+# The static pass proves the types of names bound by 'remember' in the
+# current frame, so the compiler can drop guards on their reads and skip
+# the runtime infer_type dispatch when storing them. Mismatches are kept
+# once each, up to mismatch_limit entries (oldest dropped first).
+
+from language.config import load_config
+from language.cow import CowDict
+from language.numeric import Vector
+from language.resolve import Literal, VarRef, BinOp, UnaryOp, resolve_expr
+
+NUMERIC = ("int", "float")
+
+_ARITHMETIC = {"+", "-", "*", "/", "%"}
+_COMPARISONS = {"==", "!=", "<", ">", "<=", ">="}
+
+# Statements that never rebind a name in the running frame
+_NO_BINDING = {"say", "expect", "label_output", "recall", "remember_index",
+               "function_def", "function_call", "return", "break",
+               "identity", "declare", "belief", "intent", "goal", "reason",
+               "evaluate", "adjust", "trace", "trace_step", "describe_self",
+               "ask_self", "remember_program", "end_program"}
+
+
+def _body(body):
+    return body if isinstance(body, list) and body and isinstance(body[0], list) else [body]
+
+
+def _meet(a, b):
+    # Facts that hold on both paths
+    return {name: t for name, t in a.items() if b.get(name) == t}
+
 
 class TypeEngine:
-    def __init__(self):
-        self.types = {}         # type_name -> structure or rules
-        self.signatures = {}    # function_name -> [arg_types]
-        self.inferred = {}      # var_name -> inferred_type
-        self.mismatches = []    # list of (var, expected, actual)
+    def __init__(self, mismatch_limit=None):
+        if mismatch_limit is None:
+            mismatch_limit = load_config().get("settings", {}).get("type_mismatch_limit", 1000)
+        self.types = CowDict()       # type_name -> structure or rules
+        self.signatures = CowDict()  # function_name -> [arg_types]
+        self.inferred = CowDict()    # var_name -> inferred_type
+        self.mismatches = {}         # (var, expected, actual) -> times seen
+        self.mismatch_limit = mismatch_limit
+
+    def fork(self):
+        # Copy-on-write branch; mismatches are bounded, so they are copied
+        child = TypeEngine.__new__(TypeEngine)
+        child.types = self.types.fork()
+        child.signatures = self.signatures.fork()
+        child.inferred = self.inferred.fork()
+        child.mismatches = dict(self.mismatches)
+        child.mismatch_limit = self.mismatch_limit
+        return child
 
     def declare_type(self, name, structure=None):
         self.types[name] = structure or {}
@@ -27,18 +72,42 @@ class TypeEngine:
     def check_type(self, var_name, expected_type):
         actual = self.inferred.get(var_name)
         if actual != expected_type:
-            self.mismatches.append((var_name, expected_type, actual))
+            self._mismatch(var_name, expected_type, actual)
             return False
         return True
 
+    def check_signature(self, func_name, params, values):
+        # Called on entry to a function with a declared signature
+        ok = True
+        for param, expected, value in zip(params, self.signatures.get(func_name, ()), values):
+            actual = self._infer(value)
+            if expected is not None and actual != expected:
+                self._mismatch(f"{func_name}({param})", expected, actual)
+                ok = False
+        return ok
+
+    def _mismatch(self, var_name, expected_type, actual):
+        key = (var_name, expected_type, actual)
+        seen = self.mismatches.get(key)
+        if seen is not None:
+            self.mismatches[key] = seen + 1
+            return
+        self.mismatches[key] = 1
+        if self.mismatch_limit is not None and len(self.mismatches) > self.mismatch_limit:
+            del self.mismatches[next(iter(self.mismatches))]
+
     def list_mismatches(self):
-        return self.mismatches
+        return list(self.mismatches)
 
     def _infer(self, value):
         if isinstance(value, int):
             return "int"
         if isinstance(value, float):
             return "float"
+        if isinstance(value, complex):
+            return "complex"
+        if isinstance(value, Vector):
+            return "vector"
         if isinstance(value, str):
             return "string"
         if isinstance(value, list):
@@ -46,3 +115,94 @@ class TypeEngine:
         if isinstance(value, dict):
             return "map"
         return "unknown"
+
+    # --- Static inference ---
+
+    def infer_static(self, token, env):
+        # (type, total) of an expression given the proven types in env; type
+        # is None when unknown, total is False when evaluation may raise
+        token = resolve_expr(token)
+        kind = type(token)
+        if kind is Literal:
+            t = self._infer(token.value)
+            return (t, True) if t in NUMERIC else (None, False)
+        if kind is VarRef:
+            t = env.get(token.name)
+            return t, t is not None
+        if kind is UnaryOp:
+            t, total = self.infer_static(token.operand, env)
+            return (t, total) if t in NUMERIC else (None, False)
+        if kind is BinOp:
+            left, left_total = self.infer_static(token.left, env)
+            right, right_total = self.infer_static(token.right, env)
+            if left not in NUMERIC or right not in NUMERIC:
+                return None, False
+            total = left_total and right_total
+            if token.op in _COMPARISONS:
+                return "int", total  # bools record as int
+            if token.op not in _ARITHMETIC:
+                return None, False
+            if token.op == "/":
+                return "float", False  # division by zero
+            t = "int" if left == right == "int" else "float"
+            # Mixed int/float overflows on huge ints; % may divide by zero
+            return t, total and left == right and token.op != "%"
+        return None, False
+
+    def analyze(self, stmts, env=None, facts=None):
+        # Walk statements in order; facts maps id(statement) to the types
+        # proven before it runs. Returns (facts, types proven after them).
+        env = dict(env or {})
+        facts = {} if facts is None else facts
+        for stmt in stmts:
+            if not isinstance(stmt, list) or not stmt:
+                continue
+            cmd = stmt[0]
+            before = facts.get(id(stmt))
+            if cmd == "while" and len(stmt) == 3:
+                env = self._analyze_while(stmt, env, facts)
+                continue
+            facts[id(stmt)] = env if before is None else _meet(before, env)
+            if cmd == "remember" and len(stmt) == 3 and isinstance(stmt[1], str):
+                t, total = self.infer_static(stmt[2], env)
+                env = dict(env)
+                if t is not None and (total or env.get(stmt[1]) == t):
+                    env[stmt[1]] = t
+                else:
+                    env.pop(stmt[1], None)  # a failed store keeps the old value
+            elif cmd == "if" and len(stmt) >= 3:
+                after = self.analyze(_body(stmt[2]), env, facts)[1]
+                other = self.analyze(_body(stmt[3]), env, facts)[1] if len(stmt) > 3 else env
+                after = _meet(after, other)
+                if not self.infer_static(stmt[1], env)[1]:
+                    after = _meet(after, env)  # the condition may raise
+                env = after
+            elif cmd not in _NO_BINDING:
+                env = {}  # tree-walked statements may bind anything
+        return facts, env
+
+    def _analyze_while(self, stmt, env, facts):
+        # The condition runs with the facts that survive every iteration;
+        # names the body binds are dropped after the loop (break, limits)
+        head = env
+        while True:
+            after = self.analyze(_body(stmt[2]), head, facts)[1]
+            merged = _meet(head, after)
+            if merged == head:
+                break
+            head = merged
+        before = facts.get(id(stmt))
+        facts[id(stmt)] = head if before is None else _meet(before, head)
+        bound = set()
+        self._bound_names(_body(stmt[2]), bound)
+        return {name: t for name, t in head.items() if name not in bound}
+
+    def _bound_names(self, stmts, bound):
+        for stmt in stmts:
+            if not isinstance(stmt, list) or not stmt:
+                continue
+            if stmt[0] == "remember" and len(stmt) == 3:
+                bound.add(stmt[1])
+            elif stmt[0] in ("if", "while"):
+                for block in stmt[2:4] if stmt[0] == "if" else stmt[2:3]:
+                    self._bound_names(_body(block), bound)
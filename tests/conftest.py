@@ -0,0 +1,41 @@
+import copy
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import language.config
+from language.executor import Executor
+from language.memory import Memory
+from language.output import CaptureSink
+from language.parser import parse_source
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    # A private copy of elan_config.json settings; changes last one test
+    config = copy.deepcopy(language.config.load_config())
+    monkeypatch.setattr(language.config, "_config", config)
+    return config.setdefault("settings", {})
+
+
+def make_executor(engine="tree"):
+    return Executor(Memory(), engine=engine, output=CaptureSink())
+
+
+def run(source, engine="tree", executor=None):
+    # Run source and return (executor, captured output)
+    if executor is None:
+        executor = make_executor(engine)
+    executor.output.clear()
+    executor.run(parse_source(source, strict=True))
+    return executor, executor.output.getvalue()
+
+
+@pytest.fixture
+def elan():
+    return run
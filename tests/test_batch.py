@@ -0,0 +1,31 @@
+import os
+
+from conftest import ROOT
+from interpreter.batch import _run_one, run_batch
+
+
+def test_successful_script():
+    result = _run_one("label_output a\nsay 1 + 2")
+    assert result["error"] is None
+    assert result["outputs"] == {"a": 3}
+    assert result["stdout"] == "3\n"
+
+
+def test_parse_error_sets_error():
+    result = _run_one("say 1\nsay (")
+    assert result["error"].startswith("[ERROR] Parse error")
+    assert result["stdout"].startswith("1\n")
+
+
+def test_missing_file_is_an_error():
+    result = _run_one("no/such/script.elan")
+    assert result["script"] == "no/such/script.elan"
+    assert result["error"].startswith("FileNotFoundError")
+    assert result["stdout"] == ""
+
+
+def test_pool_keeps_input_order():
+    path = os.path.join(ROOT, "examples", "test_logic.elan")
+    results = run_batch(["say 1", path, "say (", "missing.elan"], workers=2)
+    assert [r["script"] for r in results] == [None, path, None, "missing.elan"]
+    assert [r["error"] is None for r in results] == [True, True, False, False]
@@ -0,0 +1,98 @@
+import pytest
+
+from benchmarks import cases, harness
+from conftest import make_executor, run
+from language.parser import parse_source
+
+SPIN = "remember i 0\nwhile 1 < 2 as:\n    remember i i + 1\nend while"
+ENGINES = pytest.mark.parametrize("engine", ["tree", "compiled"])
+
+
+@pytest.fixture
+def limits(settings):
+    limits = settings["limits"] = dict(settings.get("limits", {}), loop_iterations=None)
+    settings["safe_mode"] = True
+    return limits
+
+
+@ENGINES
+def test_instruction_budget(limits, engine):
+    limits["instructions"] = 500
+    executor, out = run(SPIN, engine)
+    assert out.endswith("[ERROR] Instruction budget of 500 exceeded\n")
+    assert executor.budget.exceeded.limit == "instructions"
+    assert executor.memory.recall("i") < 500
+
+
+@ENGINES
+def test_each_run_gets_a_fresh_budget(limits, engine):
+    limits["instructions"] = 50
+    executor = make_executor(engine)
+    for _ in range(5):
+        _, out = run("say 1\nsay 2\nsay 3", executor=executor)
+        assert out == "1\n2\n3\n"
+
+
+@ENGINES
+def test_deadline(limits, engine):
+    limits.update(deadline=0.05, check_every=64)
+    executor, out = run(SPIN, engine)
+    assert "[ERROR] Deadline of 0.05s exceeded" in out
+    assert executor.budget.exceeded.limit == "deadline"
+
+
+def test_memory_ceiling(limits):
+    limits.update(memory_mb=1, check_every=1)
+    executor, out = run("say 1", "tree")
+    assert "[ERROR] Memory ceiling of 1 MB exceeded" in out
+
+
+@ENGINES
+def test_loop_iteration_cap(limits, engine):
+    limits["loop_iterations"] = 100
+    _, out = run(SPIN + "\nsay i", engine)
+    assert out == "[WARN] Loop iteration limit reached\n100\n"
+
+
+def test_limits_are_off_without_safe_mode(settings, limits):
+    limits.update(instructions=10, loop_iterations=10)
+    settings["safe_mode"] = False
+    _, out = run("remember i 0\nwhile i < 100 as:\n    remember i i + 1\nend while\nsay i", "tree")
+    assert out == "100\n"
+
+
+@ENGINES
+def test_task_pauses_and_resumes(limits, engine):
+    executor = make_executor(engine)
+    task = executor.start_task(parse_source(
+        "remember i 0\nwhile i < 100 as:\n    remember i i + 1\nend while\nsay i", strict=True))
+    steps = 0
+    while task.step(20) == "paused":
+        steps += 1
+    assert task.state == "done" and steps >= 4
+    assert executor.output.getvalue() == "100\n"
+
+
+@ENGINES
+def test_task_cancel(limits, engine):
+    executor = make_executor(engine)
+    task = executor.start_task(parse_source(SPIN, strict=True))
+    assert task.step(100) == "paused"
+    assert task.cancel() == "stopped"
+    assert executor.output.getvalue() == "[ERROR] Task cancelled\n"
+
+
+@ENGINES
+def test_benchmark_runs_reset_the_budget(limits, engine):
+    limits["instructions"] = 10000
+    body = cases._program(cases.LOOP, engine)
+    for _ in range(5):
+        body()  # each run uses ~6000 instructions
+
+
+@ENGINES
+def test_benchmark_harness_reports_exceeded_budgets(limits, engine, monkeypatch, capsys):
+    limits["instructions"] = 1000
+    monkeypatch.setattr(harness, "BENCHMARKS", {"loop": lambda: cases._program(cases.LOOP, engine)})
+    assert harness.run_all(warmup=0, repeat=1) == {}
+    assert "[ERROR] loop: Instruction budget of 1000 exceeded" in capsys.readouterr().out
@@ -0,0 +1,152 @@
+import glob
+import os
+
+import pytest
+
+from conftest import ROOT, make_executor, run
+from language.parser import parse_file
+
+PROGRAMS = {
+    "arithmetic": """
+remember x 2
+remember y x * 3 + 1
+say y
+say y / 2
+say -x
+""",
+    "while_break": """
+remember i 0
+while i < 10 as:
+    remember i i + 1
+    if i == 4 as:
+        break
+    end if
+end while
+say i
+""",
+    "recursion": """
+define fib(n) as:
+    if n < 2 as:
+        return n
+    end if
+    return fib(n - 1) + fib(n - 2)
+end define
+say fib(15)
+""",
+    "tail_calls": """
+define count(n, acc) as:
+    if n <= 0 as:
+        return acc
+    end if
+    return count(n - 1, acc + n)
+end define
+say count(20000, 0)
+""",
+    "dynamic_scope": """
+define peek(n) as:
+    return outer
+end define
+define caller(outer) as:
+    return peek(1)
+end define
+say caller(7)
+""",
+    "vectors": """
+remember v [1, 2, 3]
+remember w v
+remember w[0] 99
+say v
+say w
+say v + w
+say dot v w
+say v[1:]
+""",
+    "labels": """
+label_output a
+say 1 + 2
+expect a = 3
+score_thoughts
+""",
+    "limits": """
+define down(n) as:
+    return 1 + down(n - 1)
+end define
+say down(1)
+say "after"
+""",
+    "stored_programs": """
+label_output a
+say 1
+expect a = 1
+remember_program report
+suggest_fix f
+reflect_memory
+end_program
+remember_program twice
+run_program report
+run_program report
+end_program
+run_program twice
+remember i 0
+while i < 3 as:
+    run_program report
+    remember i i + 1
+end while
+remember_program report
+suggest_fix g
+end_program
+run_program twice
+run_program missing
+""",
+    "return_outside": """
+return 5
+say 1
+""",
+}
+
+
+@pytest.mark.parametrize("name", sorted(PROGRAMS))
+def test_engines_agree(name):
+    tree, tree_out = run(PROGRAMS[name], "tree")
+    compiled, compiled_out = run(PROGRAMS[name], "compiled")
+    assert tree_out == compiled_out
+    assert dict(tree.outputs) == dict(compiled.outputs)
+    assert dict(tree.memory.global_vars) == dict(compiled.memory.global_vars)
+
+
+EXAMPLES = sorted(glob.glob(os.path.join(ROOT, "examples", "*.elan")))
+
+
+@pytest.mark.parametrize("path", EXAMPLES, ids=os.path.basename)
+def test_examples_agree(path):
+    nodes = parse_file(path)
+    if nodes is None:
+        pytest.skip("example does not parse with the current grammar")
+    outputs = []
+    for engine in ("tree", "compiled"):
+        executor = make_executor(engine)
+        executor.run(nodes)
+        outputs.append((executor.output.getvalue(), dict(executor.outputs)))
+    assert outputs[0] == outputs[1]
+
+
+def test_compiled_program_reruns():
+    executor = make_executor("compiled")
+    body = executor.compile(parse_file(os.path.join(ROOT, "examples", "test_vector_math.elan")))
+    body()
+    first = executor.output.getvalue()
+    executor.output.clear()
+    body()
+    assert executor.output.getvalue() == first
+
+
+def test_stored_programs_compile_once():
+    executor, _ = run("remember_program p\nsuggest_fix f\nend_program\nrun_program p", "compiled")
+    compiled = executor._compiled_programs["p"][1]
+    _, out = run("run_program p", executor=executor)
+    assert out == "Suggesting fix for macro 'f': (stub)\n"
+    assert executor._compiled_programs["p"][1] is compiled
+    # Re-recording the program compiles the new lines on its next run
+    _, out = run("remember_program p\nsuggest_fix g\nend_program\nrun_program p", executor=executor)
+    assert out == "Suggesting fix for macro 'g': (stub)\n"
+    assert executor._compiled_programs["p"][1] is not compiled
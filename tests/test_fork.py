@@ -0,0 +1,100 @@
+import pytest
+
+from conftest import run
+from interpreter.branches import merge_branches, run_branches
+from language.cow import MAX_LAYERS, CowDict
+from language.memory import _branch_copy
+
+BASE = """
+remember v [1, 2, 3]
+remember n 10
+define sq(x) as:
+    return x * x
+end define
+belief "base"
+"""
+
+
+@pytest.fixture(params=["tree", "compiled"])
+def parent(request):
+    executor, _ = run(BASE, request.param)
+    return executor
+
+
+def test_child_changes_stay_in_the_child(parent):
+    child = parent.fork()
+    run("remember v[0] 99\nremember n 11\nbelief \"child\"\ndefine sq(x) as:\n    return 0\nend define",
+        executor=child)
+    _, out = run("say v\nsay n\nsay sq(3)\nask_self \"belief\"", executor=parent)
+    assert out == "[1, 2, 3]\n10\n9\nI believe: base\n"
+
+
+def test_parent_changes_stay_in_the_parent(parent):
+    child = parent.fork()
+    run("remember v[1] 7\nremember n 0\nbelief \"parent\"\nlabel_output L\nsay 1", executor=parent)
+    _, out = run("say v\nsay n\nask_self \"belief\"", executor=child)
+    assert out == "[1, 2, 3]\n10\nI believe: base\n"
+    assert "L" not in child.outputs
+
+
+def test_aliases_survive_a_fork(parent):
+    run("remember w v", executor=parent)
+    child = parent.fork()
+    _, out = run("remember w[0] 99\nsay v", executor=parent)
+    assert out == "[99, 2, 3]\n"
+    _, out = run("remember v[2] 5\nsay w", executor=child)
+    assert out == "[1, 2, 5]\n"
+
+
+def test_aliases_survive_later_forks(parent):
+    run("remember w v", executor=parent)
+    parent.fork()
+    run("say v", executor=parent)  # v is copied up, w is not yet
+    child = parent.fork()
+    _, out = run("remember w[0] 42\nsay v", executor=parent)
+    assert out == "[42, 2, 3]\n"
+    _, out = run("say v\nsay w", executor=child)
+    assert out == "[1, 2, 3]\n[1, 2, 3]\n"
+
+
+def test_fork_refuses_during_a_call(parent):
+    parent.memory.push_frame()
+    with pytest.raises(RuntimeError):
+        parent.memory.fork()
+    parent.memory.pop_frame()
+
+
+def test_cowdict_tombstones_and_flattening():
+    d = CowDict({"a": 1, "b": 2})
+    child = d.fork()
+    del child["a"]
+    assert "a" in d and "a" not in child
+    assert dict(child) == {"b": 2}
+    for i in range(MAX_LAYERS + 5):
+        d[f"k{i}"] = [i]
+        d = d.fork()
+    assert len(d._layers) <= MAX_LAYERS
+    assert d["k0"] == [0] and d["a"] == 1
+
+
+def test_cowdict_aliases_in_lists():
+    shared = [1, 2]
+    d = CowDict({"a": shared, "b": shared}, copy=_branch_copy)
+    child = d.fork()
+    child["a"].append(3)
+    assert child["b"] == [1, 2, 3]
+    assert d["a"] == [1, 2] and d["a"] is d["b"]
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_branches_run_in_isolation(parent, mode):
+    results = run_branches(parent, {"a": "remember n n + 1\nremember v[2] 0\nsay sq(n)",
+                                    "b": "remember n n * 3\nsay n",
+                                    "bad": "say ("}, mode=mode, collect=("n", "v"))
+    assert [r["output"] for r in results[:2]] == ["121\n", "30\n"]
+    assert results[2]["error"].startswith("Parse error")
+    _, out = run("say n\nsay v", executor=parent)
+    assert out == "10\n[1, 2, 3]\n"
+    merge_branches(parent, results)
+    _, out = run("say n", executor=parent)
+    assert out == "30\n"
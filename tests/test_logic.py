@@ -0,0 +1,50 @@
+from language.logic import InferenceEngine
+
+
+def test_multi_step_forward_chaining():
+    engine = InferenceEngine()
+    engine.add_rule("rain -> wet")
+    engine.add_rule("wet & cold -> ice")
+    engine.add_rule("ice -> slippery")
+    engine.add_belief("rain")
+    assert not engine.exists("ice")
+    engine.add_belief("cold")
+    assert engine.derived() == ["wet", "ice", "slippery"]
+
+
+def test_rule_added_after_its_premises_fires():
+    engine = InferenceEngine()
+    engine.add_belief("a")
+    engine.add_rule("b -> c")
+    engine.add_rule("a -> b")
+    assert engine.exists("c") and engine.exists(lambda p: p.startswith("b"))
+
+
+def test_explain_walks_every_step():
+    engine = InferenceEngine()
+    for rule in ("a -> b", "b & x -> c"):
+        engine.add_rule(rule)
+    engine.add_belief("a")
+    engine.add_belief("x")
+    assert engine.explain("c") == ("'c' is inferred from 'b' and 'x' via rule. "
+                                   "'b' is inferred from 'a' via rule.")
+    assert engine.explain("a") == "Belief 'a' is directly asserted."
+    assert engine.explain("z") == "No explanation found for 'z'."
+
+
+def test_asserting_a_derived_belief_makes_it_asserted():
+    engine = InferenceEngine()
+    engine.add_rule("a -> b")
+    engine.add_belief("a")
+    engine.add_belief("b")
+    assert engine.explain("b") == "Belief 'b' is directly asserted."
+    assert engine.derived() == []
+
+
+def test_malformed_rules_are_kept_but_never_fire():
+    engine = InferenceEngine()
+    engine.add_rule("no arrow here")
+    engine.add_rule("a => b")
+    engine.add_belief("a")
+    assert engine.rules == ["no arrow here", "a => b"]
+    assert engine.derived() == []
@@ -0,0 +1,116 @@
+import pytest
+
+from conftest import make_executor, run
+from language.memo import MemoCache, memo_key
+from language.numeric import make_list
+
+
+@pytest.fixture
+def memoized(settings):
+    settings["memoize"] = True
+    settings["memo_capacity"] = 64
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_pure_function_is_cached(memoized, engine):
+    executor, out = run("""
+define fib(n) as:
+    if n < 2 as:
+        return n
+    end if
+    return fib(n - 1) + fib(n - 2)
+end define
+say fib(25)
+""", engine)
+    assert out == "75025\n"
+    assert executor.memo.hits > 0
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_effects_are_not_cached(memoized, engine):
+    _, out = run("""
+define noisy(n) as:
+    say n
+    return n * 2
+end define
+say noisy(3)
+say noisy(3)
+""", engine)
+    assert out == "3\n6\n3\n6\n"
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_redefinition_invalidates(memoized, engine):
+    _, out = run("""
+define f(n) as:
+    return n + 1
+end define
+say f(1)
+define f(n) as:
+    return n + 100
+end define
+say f(1)
+""", engine)
+    assert out == "2\n101\n"
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_cached_vectors_are_not_aliased(memoized, engine):
+    _, out = run("""
+define vec(n) as:
+    return zeros(n)
+end define
+remember v vec(3)
+remember v[0] 5
+say vec(3)
+say v
+""", engine)
+    assert out == "[0.0, 0.0, 0.0]\n[5.0, 0.0, 0.0]\n"
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_returned_argument_is_not_aliased(memoized, engine):
+    # The cached result must not be the caller's own Vector
+    executor, out = run("""
+define ident(v) as:
+    return v
+end define
+remember a [1, 2, 3]
+remember r ident(a)
+remember a[0] 99
+remember b [1, 2, 3]
+say ident(b)
+say r
+""", engine)
+    assert out == "[1, 2, 3]\n[1, 2, 3]\n"
+    assert executor.memo.hits == 1
+
+
+def test_free_variables_are_not_cached(memoized):
+    executor = make_executor()
+    _, out = run("""
+define scaled(n) as:
+    return n * k
+end define
+remember k 2
+say scaled(3)
+remember k 10
+say scaled(3)
+""", executor=executor)
+    assert out == "6\n30\n"
+
+
+def test_memo_key_separates_types():
+    assert memo_key("f", [1]) != memo_key("f", [1.0])
+    assert memo_key("f", [make_list([1, 2])]) == memo_key("f", [make_list([1, 2])])
+    assert memo_key("f", [["a"]]) is None
+
+
+def test_memo_cache_is_lru():
+    cache = MemoCache(capacity=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
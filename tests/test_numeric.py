@@ -0,0 +1,29 @@
+import pickle
+import subprocess
+import sys
+
+from conftest import ROOT
+from language.numeric import make_vector
+
+
+def _python(code, data=None):
+    result = subprocess.run([sys.executable, "-c", code], input=data, cwd=ROOT,
+                            capture_output=True, check=True)
+    return result.stdout.decode().strip()
+
+
+def test_numpy_is_not_imported_until_a_vector_is_made():
+    out = _python("import sys, language.executor\n"
+                  "print('numpy' in sys.modules)\n"
+                  "language.executor.make_list([1, 2])\n"
+                  "print('numpy' in sys.modules)")
+    assert out == "False\nTrue"
+
+
+def test_unpickled_vectors_work_in_a_fresh_process():
+    data = pickle.dumps(make_vector([1, 2, 3]))
+    out = _python("import pickle, sys\n"
+                  "v = pickle.loads(sys.stdin.buffer.read())\n"
+                  "v.append(4)\n"
+                  "print(v.tolist())", data)
+    assert out == "[1, 2, 3, 4]"
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from conftest import make_executor
+from interpreter.runner import _run_lines
+from language.executor import Executor
+from language.memory import Memory
+from language.output import CaptureSink, NullSink, StdoutSink, make_sink
+from language.parser import parse_source
+
+
+@pytest.mark.parametrize("name, cls", [("null", NullSink), ("capture", CaptureSink), ("stdout", StdoutSink)])
+def test_switching_only_the_sink_keeps_buffer_options_valid(settings, name, cls):
+    settings["output"] = {"sink": name, "policy": "size", "buffer_size": 65536}
+    assert isinstance(Executor(Memory()).output, cls)
+
+
+def test_bad_sink_specs_raise_clear_errors(tmp_path):
+    with pytest.raises(ValueError, match="needs 'path'"):
+        make_sink({"sink": "jsonl", "policy": "size"})
+    with pytest.raises(ValueError, match="Unknown option"):
+        make_sink({"sink": "stdout", "colour": True})
+    with pytest.raises(ValueError, match="Unknown output sink"):
+        make_sink({"sink": "printer"})
+
+
+def test_jsonl_sink_records_kinds(tmp_path):
+    path = tmp_path / "run.jsonl"
+    sink = make_sink({"sink": "jsonl", "path": str(path), "policy": "always"})
+    executor = Executor(Memory(), output=sink)
+    executor.run(parse_source("say 1\nreturn 2"))
+    sink.close()
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["kind"], r["text"]) for r in records] == [
+        ("say", "1"), ("warn", "[WARN] 'return' outside function ignored")]
+
+
+def test_buffered_sink_flushes_by_size():
+    written = []
+
+    class Stream:
+        def write(self, data):
+            written.append(data)
+
+        def flush(self):
+            pass
+
+    sink = StdoutSink(Stream(), policy="size", buffer_size=6)
+    sink.emit("ab")
+    assert written == []
+    sink.emit("cd")
+    assert written == ["ab\ncd\n"]
+
+
+def test_parse_errors_go_to_the_sink(capsys):
+    executor = make_executor()
+    _run_lines(executor, ["say 1", "say (", "say 2"], print_outputs=True)
+    assert capsys.readouterr().out == ""
+    assert executor.output.lines(("say",)) == ["1", "2"]
+    errors = executor.output.lines(("error",))
+    assert errors[0].startswith("[ERROR] Parse error:")
+    assert errors[1] == "[ERROR] Failed to parse line: say ("
+
+
+def test_blank_and_comment_lines_are_skipped_quietly():
+    executor = make_executor()
+    _run_lines(executor, ["say 1", "", "# note", "say (", "say 2"], print_outputs=True)
+    assert executor.output.lines(("say",)) == ["1", "2"]
+    assert len(executor.output.lines(("error",))) == 2
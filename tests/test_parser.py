@@ -0,0 +1,30 @@
+from language.parser import parse_line, parse_source
+from language.resolve import Node
+
+SOURCE = """remember i 0
+while i < 3 as:
+    remember i i + 1
+    if i == 2 as:
+        say i
+    end if
+end while
+"""
+
+
+def test_positions_mark_statement_lines():
+    loop = parse_source(SOURCE, strict=True, positions=True)[1]
+    assert type(loop) is Node and loop.line == 2
+    step, branch = loop[2]
+    assert (step.line, branch.line, branch[2][0].line) == (3, 4, 5)
+
+
+def test_statements_are_plain_lists_without_positions():
+    nodes = parse_source(SOURCE, strict=True)
+    assert all(type(node) is list for node in nodes)
+
+
+def test_blank_and_comment_lines_parse_to_nothing(capsys):
+    for line in ["", "   ", "# just a note"]:
+        assert parse_line(line) is None
+    assert capsys.readouterr().out == ""
+    assert repr(parse_line("say 1  # trailing note")) == repr(parse_line("say 1"))
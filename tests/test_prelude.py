@@ -0,0 +1,61 @@
+import pytest
+
+from interpreter import prelude
+from language.output import CaptureSink
+
+
+@pytest.fixture
+def setup(settings, tmp_path, monkeypatch):
+    # A one-file prelude with its image in tmp_path; counts the builds
+    source = tmp_path / "prelude.elan"
+    source.write_text("define double(x) as:\n    return x * 2\nend define\nremember base 10\n")
+    image = tmp_path / "prelude.snap"
+    settings["prelude"] = {"load": True, "sources": [str(source)], "image": str(image)}
+    monkeypatch.setattr(prelude, "_base", None)
+    builds = []
+    build = prelude._build
+    monkeypatch.setattr(prelude, "_build", lambda sources: builds.append(1) or build(sources))
+    return source, image, builds
+
+
+def reload():
+    prelude._base = None
+    executor = prelude.new_executor(output=CaptureSink())
+    executor.run(prelude.parse_source("say double(base)", strict=True))
+    return executor.output.getvalue()
+
+
+def test_image_is_built_then_reused(setup):
+    _, image, builds = setup
+    assert reload() == "20\n"
+    assert image.exists() and len(builds) == 1
+    assert reload() == "20\n"
+    assert len(builds) == 1
+
+
+def test_edited_source_rebuilds(setup):
+    source, _, builds = setup
+    reload()
+    source.write_text(source.read_text().replace("base 10", "base 21"))
+    assert reload() == "42\n"
+    assert len(builds) == 2
+
+
+@pytest.mark.parametrize("name, value", [("grammar_version", lambda: "other"), ("CACHE_FORMAT", -1)])
+def test_grammar_or_node_format_change_rebuilds(setup, monkeypatch, name, value):
+    _, _, builds = setup
+    reload()
+    monkeypatch.setattr(prelude, name, value)
+    assert reload() == "20\n"
+    assert len(builds) == 2
+    reload()
+    assert len(builds) == 2  # the rebuilt image carries the new key
+
+
+def test_unreadable_image_rebuilds(setup):
+    _, image, builds = setup
+    reload()
+    data = image.read_bytes()
+    image.write_bytes(data[:len(data) // 2])
+    assert reload() == "20\n"
+    assert len(builds) == 2
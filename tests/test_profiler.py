@@ -0,0 +1,51 @@
+import pytest
+
+from conftest import make_executor
+from interpreter.profile import profile_file
+from language.parser import parse_source
+
+SOURCE = """define fib(n) as:
+    if n < 2 as:
+        return n
+    end if
+    return fib(n - 1) + fib(n - 2)
+end define
+define g(x) as:
+    return fib(x) + 0
+end define
+remember i 0
+while i < 3 as:
+    remember r g(10)
+    remember i i + 1
+end while
+say r
+"""
+
+
+def test_profiling_is_off_by_default():
+    executor = make_executor()
+    assert executor.profiler is None
+    assert "execute" not in vars(executor)
+    executor.enable_profiling()
+    executor.disable_profiling()
+    assert executor.profiler is None and "execute" not in vars(executor)
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_function_call_counts(engine):
+    executor = make_executor(engine)
+    profiler = executor.enable_profiling()
+    executor.run(parse_source(SOURCE, strict=True, positions=True))
+    assert executor.output.getvalue() == "55\n"
+    assert profiler.functions["g"].calls == 3
+    assert profiler.functions["fib"].calls == 3 * 177
+    assert profiler.lines[12].calls == 3  # remember r g(10)
+    assert any(line.startswith("<main>;g;fib;fib ") for line in profiler.folded_lines())
+
+
+def test_profile_file(tmp_path):
+    path = tmp_path / "prog.elan"
+    path.write_text(SOURCE)
+    profiler = profile_file(str(path))
+    assert profiler.functions["fib"].calls == 3 * 177
+    assert "== Functions (top 10 by exclusive) ==" in profiler.summary()
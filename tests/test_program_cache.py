@@ -0,0 +1,78 @@
+import os
+import pickle
+
+import pytest
+
+from interpreter.runner import run_elan_file
+from language import program_cache
+from language.program_cache import MAGIC, cache_path, load_program
+
+SOURCE = "remember v [1, 2.5, 3]\nsay v[1:]\nsay -2 * 3 < 0\nsay \"hi\"\n"
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = str(tmp_path / "prog.elan")
+    with open(path, "w") as f:
+        f.write(SOURCE)
+    return path
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    # Count the parses load_program falls back to
+    calls = []
+    parse = program_cache.parse_source
+    monkeypatch.setattr(program_cache, "parse_source",
+                        lambda *args, **kwargs: calls.append(1) or parse(*args, **kwargs))
+    return calls
+
+
+def test_second_load_comes_from_the_cache(script, parses):
+    first = load_program(script)
+    second = load_program(script)
+    assert len(parses) == 1
+    assert repr(second) == repr(first)
+    assert os.path.exists(cache_path(script))
+
+
+def test_cached_program_runs_the_same(script, capsys):
+    run_elan_file(script, use_cache=False)
+    expected = capsys.readouterr().out
+    for _ in range(2):
+        run_elan_file(script)
+        assert capsys.readouterr().out == expected
+
+
+def test_edited_source_invalidates(script, parses):
+    load_program(script)
+    with open(script, "a") as f:
+        f.write("say 4\n")
+    nodes = load_program(script)
+    assert len(parses) == 2 and len(nodes) == 5
+    load_program(script)
+    assert len(parses) == 2
+
+
+def test_new_interpreter_version_invalidates(script, parses, monkeypatch):
+    load_program(script)
+    monkeypatch.setattr(program_cache, "interpreter_version", lambda: "next")
+    load_program(script)
+    assert len(parses) == 2
+
+
+class Payload:
+    def __reduce__(self):
+        return (os.system, ("touch pwned",))
+
+
+@pytest.mark.parametrize("junk", [b"", b"garbage", MAGIC + b"{\"key\": [", MAGIC + b"[]",
+                                  b"ELANC\x00" + pickle.dumps(Payload())])
+def test_bad_files_are_rebuilt_and_never_unpickled(script, parses, junk, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open(cache_path(script), "wb") as f:
+        f.write(junk)
+    load_program(script)
+    assert not os.path.exists("pwned")
+    load_program(script)
+    assert len(parses) == 1  # the bad file was overwritten with a good entry
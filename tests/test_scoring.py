@@ -0,0 +1,111 @@
+import json
+import random
+
+import pytest
+
+from conftest import run
+from language import scoring
+from language.numeric import make_vector
+from language.scoring import score
+
+PROGRAM = """
+label_output a
+say 1 + 2
+label_output b
+say 0.1 + 0.2
+label_output v
+say [1, 2, 3]
+label_output s
+say "hi"
+expect a = 3
+expect b = 0.3
+expect v = [1, 2, 4]
+expect s = "hi"
+expect gone = 1
+score_thoughts
+"""
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_score_thoughts_keeps_its_format(engine):
+    _, out = run(PROGRAM, engine)
+    # The pre-vectorized format; only 0.1 + 0.2 now passes, within rtol
+    assert out.split("=== Thought Evaluation ===\n")[1].splitlines() == [
+        "a: expected 3 → OK",
+        "b: expected 0.3 → OK",
+        "v: expected [1, 2, 4] → FAIL (got [1, 2, 3])",
+        "s: expected hi → OK",
+        "gone: expected 1 → FAIL (got None)",
+    ]
+
+
+def test_tolerances_come_from_settings(settings):
+    settings["scoring"] = {"rtol": 0, "atol": 0}
+    _, out = run(PROGRAM)
+    assert "b: expected 0.3 → FAIL (got 0.30000000000000004)" in out
+
+
+def test_scores_report():
+    scores = score({"a": 1.0, "v": make_vector([1, 2]), "m": 2}, {"a": 1.0 + 1e-12, "v": make_vector([1, 2.5])})
+    assert [row["status"] for row in scores.rows()] == ["pass", "fail", "missing"]
+    assert scores.summary() == {"total": 3, "passed": 1, "failed": 1, "missing": 1, "rtol": 1e-9, "atol": 1e-12}
+    assert scores.failures() == ["v", "m"]
+    report = json.loads(scores.to_json(failures_only=True))
+    assert [r["label"] for r in report["results"]] == ["v", "m"]
+    assert report["results"][0]["actual"] == [1, 2.5] and report["results"][0]["error"] == 0.5
+    assert scores.table().splitlines()[-1] == "1/3 passed, 1 failed, 1 missing (rtol=1e-09, atol=1e-12)"
+
+
+def _random_case(rng, n):
+    expectations, outputs = {}, {}
+    for i in range(n):
+        kind = rng.randrange(4)
+        if kind == 0:
+            value = rng.uniform(-1e3, 1e3)
+            expectations[i] = value
+            outputs[i] = value * (1 + rng.choice([0, 1e-12, 1e-6]))
+        elif kind == 1:
+            values = [rng.uniform(-1, 1) for _ in range(rng.randrange(1, 6))]
+            expectations[i] = make_vector(values)
+            outputs[i] = make_vector([v + rng.choice([0, 0, 1e-3]) for v in values])
+        elif kind == 2:
+            expectations[i] = rng.choice(["x", "y"])
+            outputs[i] = rng.choice(["x", "y"])
+        else:
+            expectations[i] = 1.0  # never labelled
+    return expectations, outputs
+
+
+def _expected_status(e, a, rtol, atol):
+    if a is None:
+        return "missing"
+    if isinstance(e, str):
+        return "pass" if a == e else "fail"
+    pairs = zip(e.tolist(), a.tolist()) if hasattr(e, "tolist") else [(e, a)]
+    return "pass" if all(abs(y - x) <= atol + rtol * abs(x) for x, y in pairs) else "fail"
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_vectorized_matches_per_label_checks(numpy, monkeypatch):
+    if not numpy:
+        monkeypatch.setattr(scoring, "load_numpy", lambda: None)
+    expectations, outputs = _random_case(random.Random(7), 2000)
+    scores = score(expectations, outputs, rtol=1e-9, atol=1e-12)
+    assert scores.status == [_expected_status(expectations[i], outputs.get(i), 1e-9, 1e-12)
+                             for i in range(2000)]
+    assert 0 < scores.failed and 0 < scores.missing and 0 < scores.passed
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_integers_compare_exactly(numpy, monkeypatch):
+    if not numpy:
+        monkeypatch.setattr(scoring, "load_numpy", lambda: None)
+    big = 10 ** 12
+    expectations = {"i": big, "f": float(big), "v": make_vector([big, 1]), "w": make_vector([big, 1.0]),
+                    "same": big, "vsame": make_vector([big, 2])}
+    outputs = {"i": big + 1, "f": big + 1, "v": make_vector([big + 1, 1]), "w": make_vector([big + 1, 1]),
+               "same": big, "vsame": make_vector([big, 2])}
+    scores = score(expectations, outputs, rtol=1e-9, atol=1e-12)
+    assert dict(zip(scores.labels, scores.status)) == {
+        "i": "fail", "f": "pass", "v": "fail", "w": "pass", "same": "pass", "vsame": "pass"}
+    assert scores.errors[0] == 1.0 and scores.errors[2] == 1.0
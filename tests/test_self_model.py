@@ -0,0 +1,50 @@
+import pytest
+
+from language.self_core import BoundedStore, SelfModel
+
+
+def lru_model(capacity=3):
+    return SelfModel({"beliefs": {"capacity": capacity, "policy": "lru"}})
+
+
+def test_readding_refreshes_the_cached_answer():
+    model = lru_model()
+    for belief in ("a", "b", "c"):
+        model.add_belief(belief)
+    assert model.ask_self("belief") == ["I believe: a", "I believe: b", "I believe: c"]
+    model.add_belief("a")
+    assert model.ask_self("belief") == ["I believe: b", "I believe: c", "I believe: a"]
+    model.add_belief("d")  # evicts b, the least recently used
+    assert model.ask_self("belief") == ["I believe: c", "I believe: a", "I believe: d"]
+
+
+def test_touch_refreshes_the_cached_answer():
+    model = lru_model()
+    for belief in ("a", "b"):
+        model.add_belief(belief)
+    model.ask_self("belief")
+    assert model.beliefs.touch("a")
+    assert model.ask_self("belief") == ["I believe: b", "I believe: a"]
+
+
+@pytest.mark.parametrize("policy, change", [
+    ("lru", lambda store: store.add("x")),
+    ("lru", lambda store: store.touch("x")),
+    ("priority", lambda store: store.add("x", priority=5)),
+])
+def test_recency_and_priority_changes_bump_the_version(policy, change):
+    store = BoundedStore(capacity=2, policy=policy)
+    store.add("x")
+    store.add("y")
+    version = store.version
+    change(store)
+    assert store.version > version
+
+
+def test_unchanged_store_keeps_its_version():
+    store = BoundedStore(policy="fifo")
+    store.add("x")
+    version = store.version
+    store.add("x")
+    store.touch("x")
+    assert store.version == version
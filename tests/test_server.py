@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from interpreter.server import ElanServer
+
+LONG = "remember i 0\nwhile i < 5000 as:\n    remember i i + 1\nend while\nsay i"
+
+
+async def _exchange(server, requests):
+    # Send all requests at once and return the responses in arrival order
+    listener = await asyncio.start_server(server.handle_client, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for request in requests:
+        writer.write((json.dumps(request) + "\n").encode("utf-8"))
+    await writer.drain()
+    responses = [json.loads(await asyncio.wait_for(reader.readline(), 60)) for _ in requests]
+    writer.close()
+    listener.close()
+    return responses
+
+
+def exchange(server, requests):
+    return asyncio.run(_exchange(server, requests))
+
+
+def test_short_session_is_not_blocked_by_a_long_loop():
+    # A single while statement is preempted, so the short request finishes first
+    responses = exchange(ElanServer(budget=100), [
+        {"id": 1, "session": "long", "source": LONG},
+        {"id": 2, "session": "short", "source": "say 5"},
+    ])
+    assert [r["id"] for r in responses] == [2, 1]
+    assert responses[1]["output"] == "5000\n"
+    assert responses[0]["output"] == "5\n"
+
+
+def test_sessions_keep_state_and_stay_isolated():
+    responses = exchange(ElanServer(), [
+        {"id": 1, "session": "a", "source": "remember x 1"},
+        {"id": 2, "session": "b", "source": "remember x 2"},
+        {"id": 3, "session": "a", "source": "say x"},
+        {"id": 4, "session": "b", "source": "say x"},
+    ])
+    outputs = {r["id"]: r["output"] for r in responses}
+    assert outputs[3] == "1\n" and outputs[4] == "2\n"
+
+
+def test_runaway_program_is_stopped(settings):
+    settings["limits"] = dict(settings.get("limits", {}), instructions=2000)
+    responses = exchange(ElanServer(budget=500), [
+        {"id": 1, "session": "a", "source": "define f(n) as:\n    return f(n + 1)\nend define\nsay f(0)"},
+        {"id": 2, "session": "a", "source": "say 1"},
+    ])
+    assert responses[0]["error"] == "Instruction budget of 2000 exceeded"
+    assert responses[1]["output"] == "1\n" and responses[1]["error"] is None
+
+
+def test_parse_errors_are_reported():
+    response, = exchange(ElanServer(), [{"id": 1, "session": "a", "source": "say ("}])
+    assert response["error"].startswith("Parse error")
@@ -0,0 +1,70 @@
+import pytest
+
+from conftest import make_executor, run
+from language import snapshot
+from language.snapshot import SnapshotError
+
+STATE = """
+remember v [1, 2, 3]
+remember n 7
+define sq(x) as:
+    return x * x
+end define
+belief "snapshots work"
+goal "warm starts"
+trace t
+trace_step t 4
+label_output out
+say sq(n)
+expect out = 49
+"""
+
+CHECK = 'say v\nsay sq(n)\nask_self "belief"\nask_self "goal"\nscore_thoughts'
+
+
+@pytest.fixture
+def trace_log(settings, tmp_path):
+    settings["trace_log_path"] = str(tmp_path / "trace")
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_round_trip(trace_log, tmp_path, engine):
+    source, _ = run(STATE, engine)
+    path = str(tmp_path / "state.snap")
+    source.snapshot(path)
+    _, expected = run(CHECK, executor=source)
+    source.self_model.traces.close()  # hand the trace log to the restored one
+
+    restored = make_executor(engine)
+    restored.restore(path)
+    _, out = run(CHECK, executor=restored)
+    assert out == expected
+    assert "I believe: snapshots work" in out and "out: expected 49 → OK" in out
+    assert restored.self_model.get_trace("t") == [4.0]
+    restored.self_model.traces.close()
+
+
+def test_restore_selected_sections(tmp_path):
+    source, _ = run(STATE)
+    path = str(tmp_path / "state.snap")
+    source.snapshot(path)
+    restored = make_executor()
+    restored.restore(path, sections=["memory"])
+    _, out = run('say n\nask_self "belief"', executor=restored)
+    assert out == "7\n"  # globals only: no beliefs came back
+
+
+def test_other_interpreter_version_is_rejected(tmp_path, monkeypatch):
+    source, _ = run(STATE)
+    path = str(tmp_path / "state.snap")
+    source.snapshot(path)
+    monkeypatch.setattr(snapshot, "interpreter_version", lambda: "0.0-other")
+    with pytest.raises(SnapshotError, match="written by interpreter"):
+        make_executor().restore(path)
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "junk.snap"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(SnapshotError, match="Not an ELAN snapshot"):
+        make_executor().restore(str(path))
@@ -0,0 +1,57 @@
+import pytest
+
+from conftest import make_executor
+from interpreter.runner import stream_elan
+
+SCRIPT = """say 1
+# a comment
+
+define twice(x) as:
+    return x * 2
+end define
+if 1 < 2 as:
+    say twice(4)
+end if
+say ("""
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_stream_yields_records_per_statement(engine):
+    records = list(stream_elan(SCRIPT, engine=engine))
+    assert records[:2] == [("say", "1"), ("say", "8")]
+    kind, text = records[2]
+    assert kind == "error" and text.startswith("[ERROR] Failed to parse line 10: say (")
+
+
+def test_output_arrives_before_later_lines_are_read():
+    read = []
+
+    def lines():
+        for line in ["say 1", "say 2"]:
+            read.append(line)
+            yield line
+    stream = stream_elan(lines())
+    assert next(stream) == ("say", "1")
+    assert read == ["say 1"]
+    assert list(stream) == [("say", "2")]
+
+
+def test_unterminated_block_is_reported():
+    records = list(stream_elan("say 0\nwhile 1 < 2 as:\n    say 1"))
+    assert records == [("say", "0"),
+                       ("error", "[ERROR] Unterminated block starting at line 2: while 1 < 2 as:")]
+
+
+def test_callers_sink_is_restored():
+    executor = make_executor()
+    sink = executor.output
+    assert list(stream_elan("remember x 5\nsay x", executor=executor)) == [("say", "5")]
+    assert executor.output is sink
+
+    stream = stream_elan("say 1\nsay 2", executor=executor)
+    next(stream)
+    stream.close()  # abandoned part-way
+    assert executor.output is sink
+    executor.emit("after")
+    assert sink.lines() == ["after"]
+    assert executor.memory.recall("x") == 5
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from conftest import make_executor, run
+from language.tracelog import MAGIC, TraceLog, TraceLogLocked
+
+
+@pytest.fixture
+def shared_log(settings, tmp_path):
+    path = str(tmp_path / "trace")
+    settings["trace_log_path"] = path
+    return path
+
+
+def test_steps_persist_across_reopen(tmp_path):
+    path = str(tmp_path / "trace")
+    log = TraceLog(path)
+    log.start("t")
+    log.append("t", {"x": 1})
+    log.append("t", [1, 2])
+    log.close()
+
+    log = TraceLog(path)
+    assert log.steps("t") == [{"x": 1}, [1, 2]]
+    log.append("t", "three")
+    log.close()
+    assert TraceLog(path).steps("t") == [{"x": 1}, [1, 2], "three"]
+
+
+def test_second_writer_is_refused(tmp_path):
+    path = str(tmp_path / "trace")
+    log = TraceLog(path)
+    with pytest.raises(TraceLogLocked):
+        TraceLog(path)
+    log.close()
+    TraceLog(path).close()  # free again once closed
+
+
+def test_empty_and_torn_segments_are_ignored(tmp_path):
+    path = str(tmp_path / "trace")
+    open(path + ".00000", "wb").close()
+    log = TraceLog(path)
+    assert log.trace_names() == []
+    log.start("t")
+    log.append("t", 1)
+    log.close()
+
+    # A record cut off mid-write is dropped and later appends stay readable
+    with open(path + ".00000", "ab") as f:
+        f.write(b"\x02\x00\x00")
+    log = TraceLog(path)
+    assert log.steps("t") == [1]
+    log.append("t", 2)
+    log.close()
+    assert TraceLog(path).steps("t") == [1, 2]
+
+    # So is a segment whose header was cut off
+    with open(path + ".00000", "wb") as f:
+        f.write(MAGIC[:3])
+    log = TraceLog(path)
+    log.start("u")
+    log.append("u", "ok")
+    log.close()
+    assert TraceLog(path).steps("u") == ["ok"]
+
+
+@pytest.mark.parametrize("engine", ["tree", "compiled"])
+def test_sessions_do_not_share_traces(shared_log, engine):
+    source = "trace {name}\ntrace_step {name} 1"
+    first, out1 = run(source.format(name="t"), engine)
+    second, out2 = run(source.format(name="u"), engine)
+    assert "[EXCEPTION]" not in out1 + out2
+    assert first.self_model.get_trace("t") == [1.0]
+    assert second.self_model.get_trace("u") == [1.0]
+    assert second.self_model.get_trace("t") == ["<no trace found>"]
+    assert first.self_model.get_trace("u") == ["<no trace found>"]
+
+    # The shared log only ever holds the owner's traces
+    first.self_model.traces.close()
+    third = make_executor(engine)
+    assert third.self_model.get_trace("t") == [1.0]
+    assert third.self_model.get_trace("u") == ["<no trace found>"]
+    third.self_model.traces.close()
+    assert os.path.exists(shared_log + ".00000")
+
+
+def test_compact_right_after_a_rotation(tmp_path):
+    path = str(tmp_path / "trace")
+    log = TraceLog(path, max_bytes=200)
+    log.start("t")
+    for i in range(20):
+        log.append("t", "x" * 40 + str(i))  # each append past 200 bytes rotates
+    log.start("u")
+    log.append("u", 1)
+    log.append("u", "y" * 300)  # crosses max_bytes: the next segment is pending
+    log.compact()
+    assert log.steps("u") == [1, "y" * 300]
+    assert log.steps("t")[-1] == "x" * 40 + "19"
+    log.append("u", 2)
+    log.close()
+    segments = [name for name in os.listdir(tmp_path) if not name.endswith(".lock")]
+    assert len(segments) == 1  # the old segments are gone
+    log = TraceLog(path)
+    assert log.steps("u") == [1, "y" * 300, 2]
+    assert len(log.steps("t")) == 20
+    log.close()
@@ -0,0 +1,93 @@
+import pytest
+
+from conftest import run
+from language.compiler import Compiler
+from language.parser import parse_source
+from language.typecheck import TypeEngine
+
+
+def facts_before_last(source):
+    nodes = parse_source(source, strict=True)
+    facts, _ = TypeEngine(mismatch_limit=10).analyze(nodes)
+    return facts[id(nodes[-1])]
+
+
+def test_numeric_names_are_proven():
+    facts = facts_before_last("remember x 1\nremember y 2.5\nremember z x * 2\nremember w x * y\nsay z")
+    assert facts == {"x": "int", "y": "float", "z": "int"}  # int * float may overflow
+
+
+def test_name_rebound_on_one_branch_is_not_proven():
+    facts = facts_before_last('remember x 1\nremember c 0\nif c > 0 as:\n    remember x "s"\nend if\nsay x')
+    assert "x" not in facts and facts["c"] == "int"
+
+
+def test_conditionally_bound_name_is_not_proven():
+    facts = facts_before_last("remember c 1\nif c > 0 as:\n    remember z 1\nend if\nsay z")
+    assert "z" not in facts
+
+
+def test_names_bound_in_a_loop_body_are_dropped():
+    facts = facts_before_last("remember i 0\nwhile i < 3 as:\n    remember i i + 1\n    remember k 2\nend while\nsay i")
+    assert "k" not in facts
+
+
+@pytest.fixture
+def fused(monkeypatch):
+    # Sources of the binary operations the compiler fused
+    seen = []
+    original = Compiler._fused_binop
+
+    def record(self, op, left, right):
+        result = original(self, op, left, right)
+        if result is not None:
+            seen.append(f"{left!r} {op.__name__} {right!r}")
+        return result
+    monkeypatch.setattr(Compiler, "_fused_binop", record)
+    return seen
+
+
+def test_proven_numeric_names_are_fused(fused):
+    _, out = run("""
+define f(n) as:
+    remember a 2
+    remember b a * 3
+    return b + 1
+end define
+say f(1)
+""", "compiled")
+    assert out == "7\n"
+    assert fused == ["'a' mul 3.0", "'b' add 1.0"]
+
+
+def test_branch_rebinding_is_not_fused(fused):
+    source = """
+define g(c) as:
+    remember a 2
+    if c > 0 as:
+        remember a "s"
+    end if
+    return a * 3
+end define
+say g(1)
+say g(0)
+"""
+    _, out = run(source, "compiled")
+    assert not fused
+    assert out == run(source, "tree")[1] == "sss\n6\n"
+
+
+def test_conditional_binding_is_not_fused(fused):
+    source = """
+define h(c) as:
+    remember z 1
+    if c > 0 as:
+        remember w 5
+    end if
+    return w + z
+end define
+say h(1)
+"""
+    _, out = run(source, "compiled")
+    assert not any(entry.startswith("'w'") for entry in fused)
+    assert out == run(source, "tree")[1] == "6\n"